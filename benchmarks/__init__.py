@@ -0,0 +1,9 @@
+"""
+Benchmarks for the gender*render reference implementation.
+Run them from the root of the repository: `python3 -m benchmarks.run` runs the whole suite and emits its results as
+json (see `benchmarks.run`), while modules like `benchmarks.bench_parse_pronoun_data` compare individual
+optimizations to the code they replaced.
+`python3 -m benchmarks.compare` compares two result files and fails on regressions; `build_and_push.py` runs the suite
+and compares it to `benchmarks/results/baseline.json` before every implementation release, if that file exists
+(create it with `python3 -m benchmarks.run --output benchmarks/results/baseline.json`).
+"""
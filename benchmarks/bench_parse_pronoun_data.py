@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Compares the fused pronoun data parser (`GRPDParser.validate_and_canonicalize`) to the three pipeline steps it replaces,
+for gender*render pronoun data with many ids.
+"""
+
+import timeit
+
+from src import warnings
+from src.parse_pronoun_data import GRPDParser
+from benchmarks.generators import make_grpd
+
+
+def staged_pipeline(pd: dict) -> dict:
+    """The pronoun data parsing pipeline as it was before its steps were fused."""
+    pd = GRPDParser.return_pd_if_it_is_valid(pd)
+    pd = GRPDParser.pd_dict_to_grpd_dict(pd)
+    return GRPDParser.grpd_dict_to_canonical_grpd_dict(pd)
+
+
+def main():
+    warnings.WarningManager.set_warning_settings(warnings.DISABLE_ALL_WARNINGS)
+    for number_of_ids in (1, 100, 10000):
+        grpd = make_grpd(number_of_ids)
+        number = max(1, 10000 // number_of_ids)
+        assert staged_pipeline(grpd) == GRPDParser.validate_and_canonicalize(grpd)
+        for name, f in (("staged", staged_pipeline), ("fused", GRPDParser.validate_and_canonicalize)):
+            best = min(timeit.repeat(lambda: f(grpd), number=number, repeat=5)) / number
+            print("{:>6} ids, {:>6}: {:10.1f} us per grpd".format(number_of_ids, name, best * 1e6))
+
+
+if __name__ == "__main__":
+    main()
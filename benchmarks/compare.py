@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compares two result files of `benchmarks.run` and fails if any scenario got slower or uses more memory than allowed.
+
+Usage (from the root of the repository):
+
+    python3 -m benchmarks.compare baseline.json current.json [--time-threshold 0.1] [--memory-threshold 0.1]
+
+A scenario regresses if its median time or its peak memory usage grew by more than the given threshold (a fraction of
+the baseline value, so 0.1 allows 10% growth). Scenarios that only exist in one of both files are listed, but never
+count as regressions. The exit code is 1 if there are regressions and 0 otherwise.
+"""
+
+import argparse
+import json
+import sys
+import typing
+
+from benchmarks import run
+
+METRICS = (("median", "time"), ("peak_memory", "memory"))
+"""The metrics that are compared, as pairs of their key in the results and the name of their threshold."""
+
+
+def load_results(file_name: str) -> dict:
+    """Loads the results of a benchmark run from the given file, raising a ValueError if it is not a result file of
+    the format written by `benchmarks.run`."""
+    with open(file_name, "r") as f:
+        results = json.load(f)
+    if results.get("meta", dict()).get("format-version") != run.RESULTS_FORMAT_VERSION:
+        raise ValueError("\"" + file_name + "\" is not a benchmark result file of format version "
+                         + str(run.RESULTS_FORMAT_VERSION) + ".")
+    return results
+
+
+def compare(baseline: dict, current: dict, thresholds: typing.Dict[str, float]) -> typing.List[dict]:
+    """Compares every scenario that exists in both results, and returns one comparison per scenario and metric, with the
+    scenario name, the metric, both values, their ratio and whether the difference is a regression (as defined by
+    the threshold of the metric in `thresholds`)."""
+    comparisons = list()
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        for metric, threshold_name in METRICS:
+            old = baseline["results"][name][metric]
+            new = current["results"][name][metric]
+            ratio = new / old if old else (1.0 if not new else float("inf"))
+            comparisons.append({"scenario": name, "metric": metric, "baseline": old, "current": new, "ratio": ratio,
+                                "regression": ratio > 1 + thresholds[threshold_name]})
+    return comparisons
+
+
+def format_report(baseline: dict, current: dict, comparisons: typing.List[dict]) -> str:
+    """Returns a human-readable report of the given comparisons."""
+    lines = ["baseline: " + str(baseline["meta"].get("commit")) + " (" + str(baseline["meta"].get("python")) + ")",
+             "current:  " + str(current["meta"].get("commit")) + " (" + str(current["meta"].get("python")) + ")", ""]
+    for c in comparisons:
+        lines.append("{} {:<55} {:<12} {:>14.6g} -> {:<14.6g} {:+8.1%}".format(
+            "REGRESSION" if c["regression"] else "          ", c["scenario"], c["metric"], c["baseline"],
+            c["current"], c["ratio"] - 1))
+    for name in sorted(set(baseline["results"]) - set(current["results"])):
+        lines.append("only in baseline: " + name)
+    for name in sorted(set(current["results"]) - set(baseline["results"])):
+        lines.append("only in current: " + name)
+
+    regressions = [c for c in comparisons if c["regression"]]
+    lines.append("")
+    lines.append(str(len(regressions)) + " regression(s) in " + str(len(comparisons)) + " comparison(s).")
+    return "\n".join(lines)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compares two gender*render benchmark result files.")
+    parser.add_argument("baseline", help="the result file to compare against")
+    parser.add_argument("current", help="the result file to check for regressions")
+    parser.add_argument("--time-threshold", type=float, default=0.1,
+                        help="allowed relative growth of the median time per scenario (default: 0.1)")
+    parser.add_argument("--memory-threshold", type=float, default=0.1,
+                        help="allowed relative growth of the peak memory per scenario (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+    comparisons = compare(baseline, current, {"time": args.time_threshold, "memory": args.memory_threshold})
+    print(format_report(baseline, current, comparisons))
+    return 1 if any(c["regression"] for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Generators for synthetic gender*render templates and pronoun data of configurable size.
+All generators are deterministic, so that results of different runs (and different commits) can be compared.
+"""
+
+import random
+
+# building blocks for templates:
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore et dolore "
+         "magna aliqua").split()
+
+TAGS = ("they", "They", "them", "their", "theirs", "themself", "Mr_s", "Doe", "first-name", "THEY", "_pet")
+"""Context values (with capitalization) that can be rendered with the pronoun data from `make_idpd`."""
+
+NOUNS = ("actor", "waiter", "carpenter", "sibling", "king", "priest", "Actor", "WAITER")
+"""Gendered nouns (with capitalization) used by noun-heavy templates."""
+
+
+def prose(rng: random.Random, number_of_words: int) -> str:
+    """Returns `number_of_words` random words, separated by spaces."""
+    return " ".join(rng.choice(WORDS) for _ in range(number_of_words))
+
+
+def make_template(number_of_tags: int, words_between_tags: int, tags=TAGS, ids=None, seed: int = 0) -> str:
+    """Returns a template with `number_of_tags` tags, which are picked from `tags` and separated by
+    `words_between_tags` words of prose. If `ids` is given, every tag is assigned one of these ids."""
+    rng = random.Random(seed)
+    sections = [prose(rng, words_between_tags)]
+    for i in range(number_of_tags):
+        tag = rng.choice(tags)
+        if ids:
+            tag = "id:" + ids[i % len(ids)] + "*" + tag
+        sections.append(" {" + tag + "} " + prose(rng, words_between_tags))
+    return "".join(sections)
+
+
+def prose_heavy_template(number_of_tags: int) -> str:
+    """Returns a template that consists mostly of text, with a tag every fifty words."""
+    return make_template(number_of_tags, 50)
+
+
+def tag_heavy_template(number_of_tags: int) -> str:
+    """Returns a template that consists mostly of tags, with a single word between them."""
+    return make_template(number_of_tags, 1)
+
+
+def multi_id_template(number_of_tags: int, number_of_ids: int = 10) -> str:
+    """Returns a template whose tags refer to `number_of_ids` different ids, which match the ids of `make_grpd`."""
+    return make_template(number_of_tags, 5, ids=["id" + str(i) for i in range(number_of_ids)])
+
+
+def noun_heavy_template(number_of_tags: int) -> str:
+    """Returns a template whose tags are all gendered nouns."""
+    return make_template(number_of_tags, 5, tags=NOUNS)
+
+
+def make_rendered_template(number_of_tags: int) -> list:
+    """Returns a parsed template with `number_of_tags` tags, which are already rendered (as they are passed to the last
+    stage of the rendering pipeline, `GRenderer.convert_to_string`), separated by five words each."""
+    rng = random.Random(0)
+    result = [prose(rng, 5)]
+    for _ in range(number_of_tags):
+        result += [{"context": rng.choice(WORDS), "capitalization": "lower-case"}, " " + prose(rng, 5) + " "]
+    return result
+
+# pronoun data:
+
+
+def make_idpd(i: int = 0) -> dict:
+    """Returns a piece of individual pronoun data that can render all tags from `TAGS` and `NOUNS`, using a mixture of
+    canonical, non-canonical and custom properties."""
+    return {
+        "they": "xe", "them": "xem", "dposs": "xyr", "ipossessive": "xyrs", "reflexive": "xemself",
+        "mr_s": "Mx", "name": "Doe" + str(i), "first-name": "Avery", "gender-nouns": "neutral", "_pet": "cat"
+    }
+
+
+def make_grpd(number_of_ids: int) -> dict:
+    """Returns a piece of gender*render pronoun data with `number_of_ids` ids ("id0", "id1", ...), each one of which
+    is described by `make_idpd`."""
+    return {"id" + str(i): make_idpd(i) for i in range(number_of_ids)}
+
+
+def make_columns(number_of_rows: int, number_of_distinct_rows: int) -> dict:
+    """Returns a table of `number_of_rows` pieces of individual pronoun data as described by `make_idpd`, as one column
+    per property (as accepted by `columnar.render_columns`), with `number_of_distinct_rows` distinct rows."""
+    rows = [make_idpd(i % number_of_distinct_rows) for i in range(number_of_rows)]
+    return {p: [row[p] for row in rows] for p in rows[0]}
+
+# gendered noun data:
+
+
+def make_gendered_noun_graph(gender_dict: dict, share_of_links: float = 0.5, seed: int = 0) -> dict:
+    """Returns gendered noun data in the format returned by `GenderNounDataHandler.load_from_web`, with the words of the
+    given (complete) gendered noun data, but only the given share of their links (and none of their warnings), so that
+    `GenderNounDataHandler.complete_graph` has to fill in the rest again."""
+    rng = random.Random(seed)
+    return {word: {"gender": word_data["gender"],
+                   "gender_map": {gender: link for gender, link in word_data["gender_map"].items()
+                                  if link != word and rng.random() < share_of_links}}
+            for word, word_data in gender_dict.items()}
+
+
+def make_noun_overlay(number_of_nouns: int, name: str = "overlay") -> dict:
+    """Returns custom gendered noun data (as accepted by `LayeredNounData.add_overlay`) with `number_of_nouns` neutral
+    nouns, each one of which has a female and a male version that are described by the data as well."""
+    overlay = dict()
+    for i in range(number_of_nouns):
+        noun = name + "_title" + str(i)
+        versions = {"neutral": noun, "female": noun + "_woman", "male": noun + "_man"}
+        for gender, version in versions.items():
+            overlay[version] = {"gender": gender,
+                                "gender_map": {g: v for g, v in versions.items() if g != gender}}
+    return overlay
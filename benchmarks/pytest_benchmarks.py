@@ -0,0 +1,22 @@
+"""
+The scenarios of `benchmarks.run` as pytest-benchmark benchmarks, for those who have pytest-benchmark installed:
+
+    python3 -m pytest benchmarks/pytest_benchmarks.py --benchmark-json=results.json
+
+This file is deliberately not named `test_*.py`, so that it is not collected together with the unit tests.
+"""
+
+import pytest
+
+from src import warnings
+from benchmarks import run
+
+pytest.importorskip("pytest_benchmark")
+
+SCENARIOS = run.template_scenarios((10, 100)) + run.pronoun_data_scenarios((10, 100, 1000))
+
+
+@pytest.mark.parametrize("name,prepare", SCENARIOS, ids=[name for name, _ in SCENARIOS])
+def test_scenario(benchmark, name, prepare):
+    warnings.WarningManager.set_warning_settings(warnings.DISABLE_ALL_WARNINGS)
+    benchmark(prepare())
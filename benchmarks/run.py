@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Runs the benchmark suite and emits its results as json, so that they can be compared between commits.
+
+Usage (from the root of the repository):
+
+    python3 -m benchmarks.run [--output results.json] [--repeat 5] [--quick] [--filter substring]
+
+Every scenario is timed with `timeit` (reporting the median, minimum and maximum time per call over all repetitions)
+and run once more under `tracemalloc` to measure its peak memory usage. The import scenario is measured in fresh
+interpreters, since the module cache would otherwise make every import after the first one free.
+"""
+
+import argparse
+import contextlib
+import copy
+import functools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import timeit
+import tracemalloc
+import typing
+
+import src as gr
+from src import warnings
+from src import errors
+from src.parse_templates import GRParser
+from src.parse_pronoun_data import GRPDParser
+from src.render_pipeline import GRenderer
+from src.columnar import render_columns
+from src.gender_nouns import GenderNounDataHandler, GENDER_DICT, LayeredNounData
+from benchmarks import generators
+
+RESULTS_FORMAT_VERSION = 1
+
+Scenario = typing.Tuple[str, typing.Callable[[], typing.Callable[[], typing.Any]]]
+"""A benchmark scenario: its name and a function that prepares the scenario and returns a function without arguments
+that runs it once (so that scenarios that are filtered out are not prepared)."""
+
+# scenarios:
+
+
+def template_scenarios(sizes: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the parsing and rendering scenarios for all template generators, with the given numbers of tags."""
+    no_warnings = warnings.DISABLE_ALL_WARNINGS
+    scenarios = list()
+    for size in sizes:
+        for kind, template_str, pd in (
+                ("prose-heavy", generators.prose_heavy_template(size), generators.make_idpd()),
+                ("tag-heavy", generators.tag_heavy_template(size), generators.make_idpd()),
+                ("multi-id", generators.multi_id_template(size), generators.make_grpd(10)),
+                ("noun-heavy", generators.noun_heavy_template(size), generators.make_idpd())
+        ):
+            scenarios += [
+                ("GRParser.full_parsing_pipeline/" + kind + "/" + str(size),
+                 lambda t=template_str: lambda: GRParser.full_parsing_pipeline(t)),
+                ("Template.render/" + kind + "/" + str(size),
+                 lambda t=template_str, p=pd: functools.partial(gr.Template(t, warning_settings=no_warnings).render,
+                                                                p, warning_settings=no_warnings)),
+                ("render_template/" + kind + "/" + str(size),
+                 lambda t=template_str, p=pd: lambda: gr.render_template(t, p, warning_settings=no_warnings)),
+                ("render_template-uncached/" + kind + "/" + str(size),
+                 lambda t=template_str, p=pd: lambda: gr.render_template(t, p, warning_settings=no_warnings,
+                                                                         use_cache=False))
+            ]
+    return scenarios
+
+
+def pronoun_data_scenarios(sizes: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the pronoun data parsing scenarios, for individual pronoun data and for pronoun data with the given
+    numbers of ids."""
+    scenarios = [("GRPDParser.full_parsing_pipeline/idpd",
+                  lambda: functools.partial(GRPDParser.full_parsing_pipeline, generators.make_idpd()))]
+    for size in sizes:
+        scenarios.append(("GRPDParser.full_parsing_pipeline/grpd/" + str(size),
+                          lambda s=size: functools.partial(GRPDParser.full_parsing_pipeline,
+                                                           generators.make_grpd(s))))
+    return scenarios
+
+
+def disabled_warning_scenarios() -> typing.List[Scenario]:
+    """Returns scenarios that would raise a warning for every tag or every property if warnings were enabled, and run
+    them with all warnings disabled."""
+    no_warnings = warnings.DISABLE_ALL_WARNINGS
+    return [
+        ("Template.render-default-values/noun-heavy/100",
+         lambda: functools.partial(gr.Template(generators.noun_heavy_template(100),
+                                               warning_settings=no_warnings).render,
+                                   {"subject": "xe"}, warning_settings=no_warnings)),
+        ("GRPDParser.full_parsing_pipeline/unknown-properties/100",
+         lambda: functools.partial(GRPDParser.full_parsing_pipeline,
+                                   {"id" + str(i): {"subject": "xe", "pet": "cat"} for i in range(100)}))
+    ]
+
+
+def enabled_warning_scenarios() -> typing.List[Scenario]:
+    """Returns scenarios that raise a warning for every tag, with all warnings enabled, both raised with Python's
+    `warnings` module and collected with `WarningManager.collecting`."""
+    return [
+        ("Template.render-default-values-warned/noun-heavy/100",
+         lambda: functools.partial(render_with_warnings, gr.Template(generators.noun_heavy_template(100)), False)),
+        ("Template.render-default-values-collected/noun-heavy/100",
+         lambda: functools.partial(render_with_warnings, gr.Template(generators.noun_heavy_template(100)), True))
+    ]
+
+
+def render_with_warnings(template: gr.Template, collect: bool):
+    """Renders the given template with pronoun data that lacks most properties, with all warnings enabled and either
+    collected or raised."""
+    with contextlib.ExitStack() as stack:
+        if collect:
+            stack.enter_context(warnings.WarningManager.collecting())
+        template.render({"subject": "xe"}, warning_settings=warnings.ENABLE_DEFAULT_WARNINGS)
+    warnings.WarningManager.set_warning_settings(warnings.DISABLE_ALL_WARNINGS)
+
+
+def convert_to_string_scenarios(sizes: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the scenarios for the last stage of the rendering pipeline, for rendered templates with the given
+    numbers of tags, both joined into a string and returned as a list of parts."""
+    scenarios = list()
+    for size in sizes:
+        scenarios += [
+            ("GRenderer.convert_to_string/" + str(size),
+             lambda s=size: functools.partial(GRenderer.convert_to_string, generators.make_rendered_template(s),
+                                              dict())),
+            ("GRenderer.convert_to_string-parts/" + str(size),
+             lambda s=size: functools.partial(GRenderer.convert_to_string, generators.make_rendered_template(s),
+                                              dict(), return_parts=True))
+        ]
+    return scenarios
+
+
+def columnar_scenarios(sizes: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the scenarios that render a tag-heavy template for tables with the given numbers of rows and 100
+    distinct rows, both column-oriented and row by row."""
+    no_warnings = warnings.DISABLE_ALL_WARNINGS
+    scenarios = list()
+    for size in sizes:
+        scenarios += [
+            ("render_columns/" + str(size),
+             lambda s=size: functools.partial(render_columns, gr.Template(generators.tag_heavy_template(10)),
+                                              generators.make_columns(s, 100), no_warnings)),
+            ("render_columns-row-by-row/" + str(size),
+             lambda s=size: functools.partial(render_rows, gr.Template(generators.tag_heavy_template(10)),
+                                              generators.make_columns(s, 100)))
+        ]
+    return scenarios
+
+
+def check_scenarios(sizes: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the scenarios that check whether a multi-id template with the given numbers of tags can be rendered
+    with already parsed pronoun data, both with `Template.check` and by rendering it."""
+    no_warnings = warnings.DISABLE_ALL_WARNINGS
+    scenarios = list()
+    for size in sizes:
+        scenarios += [
+            ("Template.check/multi-id/" + str(size),
+             lambda s=size: functools.partial(gr.Template(generators.multi_id_template(s)).check,
+                                              gr.PronounData(generators.make_grpd(10)), warning_settings=no_warnings)),
+            ("Template.check-by-rendering/multi-id/" + str(size),
+             lambda s=size: functools.partial(gr.Template(generators.multi_id_template(s)).render,
+                                              gr.PronounData(generators.make_grpd(10)), warning_settings=no_warnings))
+        ]
+    return scenarios
+
+
+def batch_scenarios(error_rates: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the scenarios that render a multi-id template for 1000 pieces of pronoun data, of which the given
+    percentages lack a property the template needs, both with `Template.render_batch` and by catching the errors of
+    `Template.render`."""
+    scenarios = list()
+    for error_rate in error_rates:
+        pronoun_data = [gr.PronounData(generators.make_grpd(10) if i % 100 >= error_rate
+                                       else dict(generators.make_grpd(10), id0={"subject": "xe"}))
+                        for i in range(1000)]
+        scenarios += [
+            ("Template.render_batch/" + str(error_rate) + "%-errors",
+             lambda p=pronoun_data: functools.partial(render_batch, gr.Template(generators.multi_id_template(10)), p)),
+            ("Template.render-catching-errors/" + str(error_rate) + "%-errors",
+             lambda p=pronoun_data: functools.partial(render_catching_errors,
+                                                      gr.Template(generators.multi_id_template(10)), p))
+        ]
+    return scenarios
+
+
+def render_batch(template: gr.Template, pronoun_data: list) -> list:
+    """Renders the given template with all given pronoun data using `Template.render_batch`."""
+    return [result.output for result in template.render_batch(pronoun_data, warnings.DISABLE_ALL_WARNINGS)]
+
+
+def render_catching_errors(template: gr.Template, pronoun_data: list) -> list:
+    """Renders the given template with all given pronoun data one after another, catching rendering errors, for
+    comparison with `Template.render_batch`."""
+    outputs = list()
+    for pd in pronoun_data:
+        try:
+            outputs.append(template.render(pd, warning_settings=warnings.DISABLE_ALL_WARNINGS))
+        except errors.RenderingError:
+            outputs.append(None)
+    return outputs
+
+
+def render_rows(template: gr.Template, columns: dict) -> list:
+    """Renders the given template for every row of the given columns one after another, for comparison with
+    `render_columns`."""
+    return [template.render(dict(zip(columns.keys(), row)), warning_settings=warnings.DISABLE_ALL_WARNINGS)
+            for row in zip(*columns.values())]
+
+
+def gendered_noun_scenarios() -> typing.List[Scenario]:
+    """Returns the scenarios that build the gendered noun data from a graph with all words of the installed gendered
+    noun data, but only half of their links (including the time it takes to copy the graph, since it is modified
+    in-place)."""
+    return [
+        ("GenderNounDataHandler.make_all_links_two_sided/full",
+         lambda: functools.partial(build_gendered_noun_graph, GenderNounDataHandler.make_all_links_two_sided,
+                                   GenderNounDataHandler.make_sure_all_referenced_words_exist(
+                                       generators.make_gendered_noun_graph(GENDER_DICT)))),
+        ("GenderNounDataHandler.complete_graph/full",
+         lambda: functools.partial(build_gendered_noun_graph, GenderNounDataHandler.complete_graph,
+                                   generators.make_gendered_noun_graph(GENDER_DICT)))
+    ]
+
+
+def noun_overlay_scenarios() -> typing.List[Scenario]:
+    """Returns the scenarios that replace the topmost of ten overlays of 1000 nouns (3000 words) each on top of the
+    installed gendered noun data, and that render 1000 words from both the overlays and the installed data with them.
+    They use their own `LayeredNounData`, so the overlays do not affect other scenarios."""
+    return [
+        ("LayeredNounData.add_overlay/10x1000",
+         lambda: functools.partial(make_layered_noun_data(10, 1000).add_overlay, "overlay9",
+                                   generators.make_noun_overlay(1000, "overlay9"))),
+        ("LayeredNounData.render/10x1000",
+         lambda: functools.partial(render_nouns, make_layered_noun_data(10, 1000),
+                                   [word for i, word in zip(range(500), GENDER_DICT)]
+                                   + ["overlay" + str(i % 10) + "_title" + str(i) for i in range(500)]))
+    ]
+
+
+def make_layered_noun_data(number_of_overlays: int, number_of_nouns: int) -> LayeredNounData:
+    """Returns the installed gendered noun data with the given number of overlays from `make_noun_overlay`."""
+    layered_noun_data = LayeredNounData(GENDER_DICT)
+    for i in range(number_of_overlays):
+        name = "overlay" + str(i)
+        layered_noun_data.add_overlay(name, generators.make_noun_overlay(number_of_nouns, name))
+    return layered_noun_data
+
+
+def render_nouns(layered_noun_data: LayeredNounData, words: typing.List[str]):
+    """Renders the female version of all given words."""
+    for word in words:
+        layered_noun_data.render(word, "female")
+
+
+def build_gendered_noun_graph(build: typing.Callable[[dict], dict], graph: dict):
+    """Applies the given pipeline (stage) to a copy of the given gendered noun data."""
+    return build(copy.deepcopy(graph))
+
+
+def threaded_scenarios(thread_counts: typing.Iterable[int]) -> typing.List[Scenario]:
+    """Returns the scenarios that render one shared template 1600 times with 16 different pieces of pronoun data, split
+    evenly across the given numbers of threads. Their times only decrease with more threads on Python builds without a
+    global interpreter lock (free-threaded builds)."""
+    no_warnings = warnings.DISABLE_ALL_WARNINGS
+    return [("Template.render-threads/" + str(count),
+             lambda c=count: functools.partial(
+                 render_in_threads, c, gr.Template(generators.tag_heavy_template(10), warning_settings=no_warnings),
+                 [gr.PronounData(generators.make_idpd(i), warning_settings=no_warnings) for i in range(16)]))
+            for count in thread_counts]
+
+
+def render_in_threads(thread_count: int, template: gr.Template, pronoun_data: typing.List[gr.PronounData]):
+    """Renders the given template 100 times with every given piece of pronoun data, split evenly across the given
+    number of threads."""
+
+    def render_share():
+        for _ in range(100 // thread_count):
+            for pd in pronoun_data:
+                template.render(pd, warning_settings=warnings.DISABLE_ALL_WARNINGS)
+
+    threads = [threading.Thread(target=render_share) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+# measuring:
+
+
+def measure(function: typing.Callable[[], typing.Any], repeat: int) -> dict:
+    """Times the given function and measures its peak memory usage, and returns the results."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    tracemalloc.start()
+    function()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"median": statistics.median(times), "min": min(times), "max": max(times), "number": number,
+            "repeat": repeat, "peak_memory": peak_memory}
+
+
+IMPORT_CODE = """
+import time, tracemalloc
+tracemalloc.start()
+t = time.perf_counter()
+import src
+t = time.perf_counter() - t
+print(t, tracemalloc.get_traced_memory()[1])
+"""
+
+
+def measure_import(repeat: int) -> dict:
+    """Measures the time and peak memory it takes to import gender*render in a fresh interpreter, `repeat` times.
+    gender*render is imported as `src`, so that the code in the working tree is measured rather than an installed
+    version."""
+    times = list()
+    peak_memory = 0
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-W", "ignore", "-c", IMPORT_CODE], universal_newlines=True)
+        t, memory = output.split()
+        times.append(float(t))
+        peak_memory = max(peak_memory, int(memory))
+    return {"median": statistics.median(times), "min": min(times), "max": max(times), "number": 1, "repeat": repeat,
+            "peak_memory": peak_memory}
+
+
+def get_meta_data() -> dict:
+    """Returns information about the environment the benchmarks run in."""
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL,
+                                         universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"format-version": RESULTS_FORMAT_VERSION, "gender-render-version": gr.__version__, "commit": commit,
+            "python": platform.python_implementation() + " " + platform.python_version(),
+            "platform": platform.platform(), "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+
+def run(repeat: int = 5, quick: bool = False, name_filter: str = "") -> dict:
+    """Runs all scenarios whose name contains `name_filter` and returns the results, keyed by scenario name."""
+    warnings.WarningManager.set_warning_settings(warnings.DISABLE_ALL_WARNINGS)
+    template_sizes = (10,) if quick else (10, 100, 1000)
+    grpd_sizes = (10,) if quick else (10, 100, 1000)
+    table_sizes = (1000,) if quick else (1000, 100000)
+    # (rendered templates are generated directly, so they are not limited by the speed of the parser):
+    rendered_template_sizes = (10, 1000) if quick else (10, 1000, 100000)
+
+    scenarios = template_scenarios(template_sizes) + pronoun_data_scenarios(grpd_sizes)
+    scenarios += columnar_scenarios(table_sizes) + convert_to_string_scenarios(rendered_template_sizes)
+    scenarios += threaded_scenarios((1, 4) if quick else (1, 2, 4, 8)) + disabled_warning_scenarios()
+    scenarios += enabled_warning_scenarios() + check_scenarios(template_sizes) + batch_scenarios((0, 50))
+    scenarios += gendered_noun_scenarios() + noun_overlay_scenarios()
+    scenarios.append(("import gender_render", None))
+
+    results = dict()
+    for name, prepare in scenarios:
+        if name_filter not in name:
+            continue
+        results[name] = measure_import(repeat) if prepare is None else measure(prepare(), repeat)
+        print("{:<55} {:12.1f} us {:12d} B".format(name, results[name]["median"] * 1e6, results[name]["peak_memory"]),
+              file=sys.stderr)
+    return {"meta": get_meta_data(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the gender*render benchmark suite.")
+    parser.add_argument("--output", "-o", help="file to write the json results to (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed repetitions per scenario")
+    parser.add_argument("--quick", action="store_true", help="only run the smaller sizes of every scenario")
+    parser.add_argument("--filter", default="", help="only run scenarios whose name contains this string")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.quick, args.filter)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=4, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
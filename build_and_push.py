@@ -231,6 +231,19 @@ def number_of_things_without_unittest() -> int:  # <-- returns # of untested fun
     return len(not_whitelisted_and_not_tested) + len(whitelisted_and_tested)
 
 
+BENCHMARK_BASELINE_FILE = "benchmarks/results/baseline.json"
+BENCHMARK_RESULTS_FILE = "benchmarks/results/latest.json"
+
+
+def check_performance(baseline_file: str, results_file: str) -> bool:
+    # compares two benchmark result files (see benchmarks/compare.py), prints the report and returns whether there
+    #  were no regressions:
+    p = subprocess.Popen(["python3", "-m", "benchmarks.compare", baseline_file, results_file], stdout=subprocess.PIPE)
+    output, error = p.communicate()
+    print(output.decode("utf-8").rstrip())
+    return p.returncode == 0
+
+
 def main():
     # helper function to increase a version number
 
@@ -309,6 +322,14 @@ def main():
                             ["./build_and_push.py", "check-test-coverage"]
                         ]:
                             subprocess.check_output(command)
+                        # make sure performance did not regress, if there is a local baseline to compare against:
+                        if os.path.exists(BENCHMARK_BASELINE_FILE):
+                            subprocess.check_output(["python3", "-m", "benchmarks.run", "--output",
+                                                     BENCHMARK_RESULTS_FILE])
+                            if not check_performance(BENCHMARK_BASELINE_FILE, BENCHMARK_RESULTS_FILE):
+                                sys.exit(1)
+                            # the next release is compared against this one:
+                            shutil.copyfile(BENCHMARK_RESULTS_FILE, BENCHMARK_BASELINE_FILE)
                         # make a new release tag:
                         subprocess.check_output(("git tag -a v1.1.0 -m " + text).split())
 
@@ -414,5 +435,10 @@ if __name__ == "__main__":
         if number_of_things_without_unittest() > 0:
             # Apparently, not all methods and functions have their own testing equivalent.
             sys.exit(1)
+    elif "check-performance" in sys.argv:
+        # usage: ./build_and_push.py check-performance [<baseline file> [<results file>]]
+        files = sys.argv[sys.argv.index("check-performance") + 1:]
+        if not check_performance(*(files + [BENCHMARK_BASELINE_FILE, BENCHMARK_RESULTS_FILE][len(files):2])):
+            sys.exit(1)
     else:
         main()
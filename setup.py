@@ -24,6 +24,12 @@ the correct pronouns of all people involved.",
     ],
     package_data={'gender_render': ['*', 'src/*']},
     include_package_data=True,
+    entry_points={
+        "console_scripts": ["gender-render=gender_render.cli:main",
+                            "gender-render-server=gender_render.server:main",
+                            "gender-render-lint=gender_render.lint:main",
+                            "gender-render-build-nouns=gender_render.build_nouns:main"]
+    },
     install_requires=[
         "requests~=2.25.1"
     ],
@@ -33,10 +39,11 @@ the correct pronouns of all people involved.",
  definition of what is covered by this license and what is not.)",
     extras_require={
         'more_warnings': ["nltk"],
+        'columnar': ["numpy"],
         'testing': ["typing_extensions"]
     },
     classifiers=[
         "Programming Language :: Python :: 3",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
 )
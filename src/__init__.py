@@ -16,27 +16,60 @@ The interfaces defined by the main specification can be found as `gender_render.
 `gender_render.render_template`.
 
 To find out how to enable and disable warnings, refer to the documentation of `gender_render.warnings`.
+
+Features beyond the specification are listed in the section "Beyond the Specification" of the Quick Start above.
+Importing `gender_render` only imports what is needed to parse and render templates; everything else is imported the
+first time it is accessed as an attribute of `gender_render`.
 """
 
 __author__ = "phseiff"
 __version__ = "1.1.0"
 
+import importlib
 import typing
 from .handle_context_values import GRPD, IDPD
 
 from . import warnings
+from . import instrumentation
 from .pronoun_data_interface import PronounData
 from .template_interface import Template
 
+# submodules and classes that are only imported once they are used:
+
+LAZY_SUBMODULES = ("bound_renderer", "template_bundle", "columnar", "lint", "cli", "server", "build_nouns")
+"""Submodules that are not imported by `import gender_render`, but the first time they are accessed."""
+
+LAZY_ATTRIBUTES = {"BoundRenderer": "bound_renderer", "TemplateBundle": "template_bundle"}
+"""Attributes of `gender_render` that are imported from the given submodules the first time they are accessed."""
+
+
+def __getattr__(name: str):
+    """Imports the lazily imported submodules and attributes (see `LAZY_SUBMODULES` and `LAZY_ATTRIBUTES`) when they
+    are accessed for the first time."""
+    if name in LAZY_SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    if name in LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module("." + LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+
+
+def __dir__():
+    """Lists the lazily imported submodules and attributes along with everything that is already imported."""
+    return sorted(set(globals()) | set(LAZY_SUBMODULES) | set(LAZY_ATTRIBUTES))
+
 # the render_template function from the specification:
 
 
 def render_template(template, pronoun_data: typing.Union[str, GRPD, IDPD], takes_file_path=False,
-                    warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
+                    warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS, use_cache=True):
     """Accepts a gender*render template as a string and a string or dict of pronoun data or, if `takes_file_path` is
     True, two file paths to both, and returns the template rendered with the given pronoun data.
-    Serves as a shortcut for Template(...).render(PronounData(...), ...)"""
+    Serves as a shortcut for Template(...).render(PronounData(...), ...); unless `use_cache` is False, the parsed
+    template is cached (see `gender_render.parse_cache`), so rendering the same template again does not parse it
+    again."""
 
     pd = PronounData(pronoun_data, takes_file_path, warning_settings)
-    tr = Template(template, takes_file_path, warning_settings)
+    tr = Template(template, takes_file_path, warning_settings, use_cache)
     return tr.render(pd, warning_settings=warning_settings)
@@ -0,0 +1,113 @@
+"""
+Partial evaluation of the rendering pipeline for one fixed piece of pronoun data.
+
+This is meant for situations where many templates are rendered with the same pronoun data (for example, all emails
+sent to one user), and is not part of the specification.
+"""
+
+import threading
+import typing
+
+from . import warnings
+from . import gender_nouns
+from . import global_capitalization_system
+from .render_pipeline import GRenderer
+from .handle_context_values import ContextValues
+from .pronoun_data_interface import PronounData
+from .template_interface import Template
+
+# a renderer with baked-in pronoun data:
+
+
+class BoundRenderer:
+    """Renders templates with one fixed piece of pronoun data.
+
+    The value a tag with a given id, context value and capitalization value renders to is resolved (with addressing,
+    default values and capitalization applied) the first time a tag needs it and re-used afterwards, so rendering a
+    template with a `BoundRenderer` consists of id resolution and concatenation only.
+    Warnings that regard the pronoun data rather than the template are therefore only raised the first time a value is
+    resolved; in particular, a `warnings.DefaultValueUsedWarning` is raised about every default value only once.
+    Since values are resolved lazily, a lock guards everything a renderer changes after its creation, so one renderer
+    may be shared between threads."""
+
+    def __init__(self, pronoun_data: typing.Union[str, dict, PronounData], takes_file_path=False,
+                 warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
+        """Returns a renderer for the given pronoun data, which may be given in any form `PronounData` accepts."""
+
+        warnings.WarningManager.set_warning_settings(warning_settings)
+        pronoun_data = PronounData(pronoun_data, takes_file_path, warning_settings)
+        self.grpd = pronoun_data.get_resolved_pd()
+        self.defaulted_properties = pronoun_data.defaulted_properties
+        self.rendered_values: typing.Dict[typing.Tuple[str, typing.Union[str, gender_nouns.GenderedNoun], str], str]\
+            = dict()
+        self.lock = threading.Lock()
+
+    def get_rendered_value(self, id_value: str, pd_id: str, context_value: typing.Union[str, gender_nouns.GenderedNoun],
+                           capitalization: str) -> str:
+        """Returns the fully rendered value of a tag with the given context value and capitalization value, assigned to
+        `id_value` by id resolution, whose individual pronoun data is stored under `pd_id` in the renderer's pronoun
+        data (these only differ for individual pronoun data)."""
+        key = (pd_id, context_value, capitalization)
+        rendered_value = self.rendered_values.get(key)
+        if rendered_value is None:
+            with self.lock:
+                if key not in self.rendered_values:
+                    grpd = {id_value: self.grpd[pd_id]}
+                    context_value = GRenderer.resolve_addressing_of_context_value(context_value, grpd, id_value)
+                    value = GRenderer.render_context_value(context_value, grpd, id_value)
+                    self.rendered_values[key] = global_capitalization_system.apply_capitalization(value,
+                                                                                                  capitalization)
+                rendered_value = self.rendered_values[key]
+        return rendered_value
+
+    def render(self, template: Template,
+               warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS) -> str:
+        """Returns the given template rendered with the renderer's pronoun data, just like `template.render` would."""
+
+        warnings.WarningManager.set_warning_settings(warning_settings)
+        id_for_tags_without_id = GRenderer.resolve_ids(template.used_ids, template.contains_unspecified_ids, self.grpd)
+        grpd_is_actually_idpd = "" in self.grpd
+
+        compact_template = template.compact_template
+        result = list(compact_template)
+        for i in range(1, len(result), 2):
+            tag = compact_template[i]
+            id_value = tag.id if tag.id is not None else id_for_tags_without_id
+            result[i] = self.get_rendered_value(id_value, "" if grpd_is_actually_idpd else id_value, tag.context,
+                                                tag.capitalization)
+        if self.defaulted_properties:
+            with self.lock:
+                used_defaults = ContextValues.warn_about_default_values(self.defaulted_properties,
+                                                                        template.required_properties)
+                self.defaulted_properties = {id: properties - used_defaults.get(id, frozenset())
+                                             for id, properties in self.defaulted_properties.items()
+                                             if properties - used_defaults.get(id, frozenset())}
+        return "".join(result)
+
+    def specialize(self, template: Template,
+                   warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS)\
+            -> "SpecializedTemplate":
+        """Returns a `SpecializedTemplate` of the given template with the renderer's pronoun data baked into it."""
+        return SpecializedTemplate(self.render(template, warning_settings))
+
+# a template with baked-in pronoun data:
+
+
+class SpecializedTemplate:
+    """A template specialized to one fixed piece of pronoun data, which therefore always renders to the same string.
+    Objects of this class are immutable."""
+
+    __slots__ = ("rendered_template",)
+
+    def __init__(self, rendered_template: str):
+        """Returns a specialized template that renders to `rendered_template`; use `BoundRenderer.specialize` to create
+        one from a template."""
+        object.__setattr__(self, "rendered_template", rendered_template)
+
+    def __setattr__(self, name, value):
+        """Prevents specialized templates from being modified."""
+        raise AttributeError("SpecializedTemplate objects are immutable.")
+
+    def render(self) -> str:
+        """Returns the rendered template."""
+        return self.rendered_template
@@ -0,0 +1,187 @@
+"""
+The `gender-render-build-nouns` command, which builds the gendered noun data (`data/gendered-nouns.gdn`) from a local
+copy of its source file, `gendered_words.json` (see `gender_nouns.SOURCE_URL`), without any network access. Run
+`gender-render-build-nouns --help` for its usage.
+
+The result of converting the source file and of every stage of `GenderNounDataHandler.complete_graph` is saved as a
+checkpoint in a cache directory. Every checkpoint is identified by a hash of the source file and of the code of its
+stage and of all stages before it, so running the command again after changing one stage only runs this stage and the
+stages after it again. Changes to code that stages call (rather than to the stages themselves) are not detected, so
+use `--rebuild` after changing it.
+
+The data is written exactly like `gender_nouns` used to write it when it downloaded the source file itself. Note that
+`gender_nouns.GENDER_DICT` is only read when `gender_nouns` is imported, so processes that are already running do not
+see the new data.
+
+This is not part of the specification.
+"""
+
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+import typing
+
+from . import warnings
+from . import gender_nouns
+from .gender_nouns import GenderNounDataHandler, GeneratedGenderNounData
+
+CHECKPOINT_FORMAT_VERSION = 1
+"""Part of the key of every checkpoint, so that checkpoints of different formats never mix."""
+
+Stage = typing.Tuple[str, typing.Callable[[GeneratedGenderNounData], GeneratedGenderNounData]]
+"""A stage of the pipeline, as returned by `GenderNounDataHandler.get_pipeline_stages`."""
+
+# checkpoints:
+
+
+def get_default_cache_dir() -> str:
+    """Returns the directory checkpoints are saved in by default: `gender-render/gdn` in `$XDG_CACHE_HOME` (or
+    `~/.cache`)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "gender-render", "gdn")
+
+
+def get_code(function: typing.Callable) -> str:
+    """Returns the source code of the given function (including the arguments of partially applied functions), or its
+    byte code if its source code is not available."""
+    if isinstance(function, functools.partial):
+        return get_code(function.func) + repr(function.args) + repr(sorted(function.keywords.items()))
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return repr(function.__code__.co_code)
+
+
+def get_checkpoint_keys(source_file: str, stages: typing.List[Stage]) -> typing.List[str]:
+    """Returns the keys of the checkpoints of converting the given source file and of the given stages: the first key
+    belongs to the converted source file, and every following key to the result of the corresponding stage."""
+    key = hashlib.sha256()
+    with open(source_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            key.update(chunk)
+    # (whether nltk is installed changes which words are considered nouns):
+    key.update((str(CHECKPOINT_FORMAT_VERSION) + "\n" + str(gender_nouns.is_a_noun("wuwuwu")) + "\n"
+                + get_code(GenderNounDataHandler.convert_original_data)).encode("utf-8"))
+    keys = [key.hexdigest()]
+    for stage_name, stage in stages:
+        key.update(("\n" + stage_name + "\n" + get_code(stage)).encode("utf-8"))
+        keys.append(key.hexdigest())
+    return keys
+
+
+def save_checkpoint(graph: GeneratedGenderNounData, file_name: str):
+    """Saves the given gendered noun data to the given file, keeping the order of its words (which later stages depend
+    on). The file is replaced atomically, so that builds that are interrupted never leave broken checkpoints."""
+    data = {word: dict(word_data, warning=sorted(word_data["warning"])) if "warning" in word_data else word_data
+            for word, word_data in graph.items()}
+    directory = os.path.dirname(file_name)
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+        json.dump(data, f)
+    os.replace(f.name, file_name)
+
+
+def load_checkpoint(file_name: str) -> GeneratedGenderNounData:
+    """Loads gendered noun data saved with `save_checkpoint`."""
+    with open(file_name, "r") as f:
+        graph = json.load(f)
+    for word_data in graph.values():
+        if "warning" in word_data:
+            word_data["warning"] = set(word_data["warning"])
+    return graph
+
+# building the data:
+
+
+def build_noun_data(source_file: str, output_file: str, cache_dir: typing.Optional[str] = None,
+                    use_checkpoints: bool = True) -> typing.List[str]:
+    """Builds the gendered noun data from the given local copy of `gendered_words.json` and writes it to `output_file`.
+    If a cache directory is given, new checkpoints are saved in it, and (unless `use_checkpoints` is False) the
+    checkpoints in it are used.
+    Returns the names of the stages that were run (rather than loaded from checkpoints), starting with
+    "load_from_source_file" if the source file had to be converted. Raises a ValueError if the source file is not in
+    the format of `gendered_words.json`."""
+    stages = GenderNounDataHandler.get_pipeline_stages()
+    keys = get_checkpoint_keys(source_file, stages)
+    checkpoint_files = [os.path.join(cache_dir, key + ".json") if cache_dir is not None else None for key in keys]
+
+    # continue after the last stage that has a checkpoint:
+    graph = None
+    first_stage = 0
+    for i in reversed(range(len(keys))):
+        if use_checkpoints and checkpoint_files[i] is not None and os.path.isfile(checkpoint_files[i]):
+            graph = load_checkpoint(checkpoint_files[i])
+            first_stage = i + 1
+            break
+
+    stages_run = list()
+    if graph is None:
+        try:
+            graph = GenderNounDataHandler.load_from_source_file(source_file)
+        except (KeyError, TypeError) as e:
+            # (the source file is valid JSON, but not in the format of gendered_words.json):
+            raise ValueError(source_file + " is not in the format of gendered_words.json (" + type(e).__name__ + ": "
+                             + str(e) + ").") from e
+        stages_run.append("load_from_source_file")
+        if cache_dir is not None:
+            save_checkpoint(graph, checkpoint_files[0])
+        first_stage = 1
+    for i in range(first_stage, len(keys)):
+        stage_name, stage = stages[i - 1]
+        gender_nouns.lwarn("")
+        graph = stage(graph)
+        stages_run.append(stage_name)
+        if cache_dir is not None:
+            save_checkpoint(graph, checkpoint_files[i])
+
+    GenderNounDataHandler.save_to_disk(graph, output_file, **gender_nouns.GDN_META_DATA)
+    return stages_run
+
+# the command:
+
+
+def make_argument_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser of the `gender-render-build-nouns` command."""
+    parser = argparse.ArgumentParser(
+        prog="gender-render-build-nouns",
+        description="Builds the gendered noun data of gender*render from a local copy of gendered_words.json, without "
+                    + "network access.")
+    parser.add_argument("source", metavar="GENDERED_WORDS_JSON", help="a local copy of " + gender_nouns.SOURCE_URL)
+    parser.add_argument("-o", "--output", default=gender_nouns.noun_data_location,
+                        help="the file to write the data to (default: the data file of this installation)")
+    parser.add_argument("--cache-dir", default=get_default_cache_dir(),
+                        help="the directory to save the results of every stage in (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="neither use nor save the results of stages")
+    parser.add_argument("--rebuild", action="store_true", help="run all stages again, and save their new results")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log what every stage does")
+    return parser
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Runs the `gender-render-build-nouns` command with the given arguments (defaulting to `sys.argv`) and returns its
+    exit code: 0 if the data was built, and 2 if the source file could not be read or is malformed, or if the data could
+    not be written."""
+    args = make_argument_parser().parse_args(argv)
+    warning_settings = warnings.ENABLE_DEFAULT_WARNINGS
+    if args.verbose:
+        warning_settings = warning_settings | {warnings.BuildingGenderedNounDataLogging}
+    warnings.WarningManager.set_warning_settings(warning_settings)
+
+    try:
+        stages_run = build_noun_data(args.source, args.output, None if args.no_cache else args.cache_dir,
+                                     not args.rebuild)
+    except (OSError, ValueError) as e:
+        print("gender-render-build-nouns: error: " + type(e).__name__ + ": " + str(e), file=sys.stderr)
+        return 2
+    print("gender-render-build-nouns: ran " + (", ".join(stages_run) if stages_run else "no stages")
+          + "; wrote " + args.output, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
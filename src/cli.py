@@ -0,0 +1,229 @@
+"""
+The `gender-render` command, which renders templates with a stream of pronoun data, one piece of pronoun data per line
+(JSON Lines). Run `gender-render --help` for its usage.
+
+Every template is parsed once, and every piece of pronoun data is parsed once and rendered with all templates using a
+`BoundRenderer`. Results are written either as JSON Lines, one object per rendered template and piece of pronoun data:
+
+    {"record": 1, "template": "welcome.gr", "output": "..."}
+    {"record": 2, "error": "InvalidPDError", "message": "..."}
+
+With `--collect-warnings`, the warnings raised while rendering a record are not printed, but collected and written as
+one more object per record (if there are any), with identical warnings merged:
+
+    {"record": 1, "warnings": [{"warning": "DefaultValueUsedWarning", "message": "...", "count": 2}]}
+
+or, with `--output-dir`, as one file per rendered template and piece of pronoun data, at
+`<output-dir>/<record>/<template file name without .gr>` (so the file names of all templates must differ). Records are
+numbered by their line in the input.
+
+This is not part of the specification.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import typing
+
+from . import errors
+from . import warnings
+from .template_interface import Template
+from .bound_renderer import BoundRenderer
+from .instrumentation import percentile
+
+# rendering records (also in worker processes):
+
+RecordResult = typing.Tuple[int, typing.List[dict], float]
+"""The result of rendering one record: its number, the json objects describing its results (as described in the
+documentation of this module) and the time it took to render it, in seconds."""
+
+templates: typing.List[typing.Tuple[str, Template]] = list()
+"""The templates records are rendered with, as pairs of their file path and their parsed template; set by
+`load_templates`."""
+
+warning_settings_for_records: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS
+
+collect_warnings_of_records = False
+
+
+def load_templates(template_paths: typing.List[str], warning_settings: warnings.WarningSettingType,
+                   collect_warnings: bool = False):
+    """Parses the templates at the given paths for all following calls of `render_record` in the current process."""
+    global templates, warning_settings_for_records, collect_warnings_of_records
+    warning_settings_for_records = warning_settings
+    collect_warnings_of_records = collect_warnings
+    templates = [(path, Template(path, takes_file_path=True, warning_settings=warning_settings))
+                 for path in template_paths]
+
+
+def render_record(numbered_line: typing.Tuple[int, str]) -> RecordResult:
+    """Renders all loaded templates with the pronoun data in the given line of input, which is given together with its
+    line number."""
+    record, line = numbered_line
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        collector = stack.enter_context(warnings.WarningManager.collecting()) if collect_warnings_of_records else None
+        try:
+            renderer = BoundRenderer(line, warning_settings=warning_settings_for_records)
+        except errors.InvalidPDError as e:
+            results = [{"record": record, "error": type(e).__name__, "message": str(e)}]
+        else:
+            results = list()
+            for path, template in templates:
+                try:
+                    results.append({"record": record, "template": path,
+                                    "output": renderer.render(template, warning_settings_for_records)})
+                except errors.RenderingError as e:
+                    results.append({"record": record, "template": path, "error": type(e).__name__,
+                                    "message": str(e)})
+    if collector is not None and len(collector):
+        results.append({"record": record, "warnings": collector.get_warnings()})
+    return record, results, time.perf_counter() - start
+
+# writing results:
+
+
+def get_output_file_name(template_path: str) -> str:
+    """Returns the name of the files the given template is rendered to with `--output-dir`: its file name without the
+    `.gr`-extension."""
+    file_name = os.path.basename(template_path)
+    return file_name[:-len(".gr")] if file_name.endswith(".gr") else file_name
+
+
+def write_results_to_directory(output_dir: str, results: typing.List[dict]):
+    """Writes every successfully rendered template in the given results to its own file in `output_dir`, and reports
+    errors on stderr."""
+    for result in results:
+        if "output" in result:
+            record_dir = os.path.join(output_dir, str(result["record"]))
+            os.makedirs(record_dir, exist_ok=True)
+            with open(os.path.join(record_dir, get_output_file_name(result["template"])), "w") as f:
+                f.write(result["output"])
+        elif "warnings" in result:
+            for warning in result["warnings"]:
+                print("gender-render: record " + str(result["record"]) + ": " + warning["warning"] + " (x"
+                      + str(warning["count"]) + "): " + warning["message"], file=sys.stderr)
+        else:
+            print("gender-render: record " + str(result["record"])
+                  + ((", template " + result["template"]) if "template" in result else "") + ": " + result["error"]
+                  + ": " + result["message"], file=sys.stderr)
+
+
+def write_buffer(buffer: typing.List[dict], f_out: typing.Optional[typing.TextIO], output_dir: typing.Optional[str]):
+    """Writes the given results either as JSON Lines to `f_out` or to files in `output_dir`."""
+    if output_dir is not None:
+        write_results_to_directory(output_dir, buffer)
+    elif buffer:
+        f_out.write("".join(json.dumps(result) + "\n" for result in buffer))
+        f_out.flush()
+
+
+def format_stats(latencies: typing.List[float], elapsed: float) -> str:
+    """Returns the statistics printed by `--stats`, given the rendering latencies of all records and the total time."""
+    if not latencies:
+        return "0 records in {:.3f} s".format(elapsed)
+    latencies = sorted(latencies)
+    return "{} records in {:.3f} s ({:.1f} records/s); latency in ms: p50 {:.3f}, p90 {:.3f}, p99 {:.3f}, max {:.3f}"\
+        .format(len(latencies), elapsed, len(latencies) / elapsed if elapsed else float("inf"),
+                *(percentile(latencies, p) * 1e3 for p in (50, 90, 99, 100)))
+
+# the command itself:
+
+
+def make_argument_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser of the `gender-render` command."""
+    parser = argparse.ArgumentParser(
+        prog="gender-render",
+        description="Renders gender*render templates with pronoun data given as JSON Lines (one piece of pronoun data "
+                    + "per line).")
+    parser.add_argument("templates", nargs="+", metavar="TEMPLATE", help="a .gr-file to render")
+    parser.add_argument("-p", "--pronoun-data", default="-",
+                        help="a JSON Lines file of pronoun data (default: read from stdin)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("-o", "--output", default="-", help="the JSON Lines file to write to (default: stdout)")
+    output.add_argument("-d", "--output-dir", help="write every result to its own file in this directory instead")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="the number of worker processes to render with (default: 1, meaning no worker processes)")
+    parser.add_argument("--buffer-size", type=int, default=1000,
+                        help="the number of records whose results are collected before they are written "
+                             + "(default: 1000)")
+    parser.add_argument("--stats", action="store_true",
+                        help="print records per second and latency percentiles to stderr when done")
+    parser.add_argument("--no-warnings", action="store_true", help="disable all gender*render warnings")
+    parser.add_argument("--collect-warnings", action="store_true",
+                        help="write the warnings of every record to the output (or, with --output-dir, to stderr), "
+                             + "merging identical ones, instead of printing every warning")
+    return parser
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Runs the `gender-render` command with the given arguments (defaulting to `sys.argv`) and returns its exit code:
+    0 if everything was rendered, 1 if any record could not be rendered, and 2 for invalid arguments or templates, or if
+    a file could not be opened."""
+    args = make_argument_parser().parse_args(argv)
+    warning_settings = warnings.DISABLE_ALL_WARNINGS if args.no_warnings else warnings.ENABLE_DEFAULT_WARNINGS
+    if args.jobs < 1 or args.buffer_size < 1:
+        print("gender-render: error: --jobs and --buffer-size must be positive.", file=sys.stderr)
+        return 2
+    if args.output_dir is not None and len(set(map(get_output_file_name, args.templates))) < len(args.templates):
+        print("gender-render: error: --output-dir requires the file names of all templates to differ.", file=sys.stderr)
+        return 2
+
+    try:
+        load_templates(args.templates, warning_settings, args.collect_warnings)
+    except (OSError, errors.SyntaxError) as e:
+        print("gender-render: error: " + type(e).__name__ + ": " + str(e), file=sys.stderr)
+        return 2
+
+    f_in = f_out = None
+    try:
+        f_in = sys.stdin if args.pronoun_data == "-" else open(args.pronoun_data, "r")
+        if args.output_dir is None:
+            f_out = sys.stdout if args.output == "-" else open(args.output, "w")
+    except OSError as e:
+        if f_in is not None and f_in is not sys.stdin:
+            f_in.close()
+        print("gender-render: error: " + type(e).__name__ + ": " + str(e), file=sys.stderr)
+        return 2
+    pool = None
+    try:
+        numbered_lines = ((number, line) for number, line in enumerate(f_in, 1) if line.strip())
+        if args.jobs == 1:
+            record_results = map(render_record, numbered_lines)
+        else:
+            pool = multiprocessing.Pool(args.jobs, load_templates,
+                                        (args.templates, warning_settings, args.collect_warnings))
+            record_results = pool.imap(render_record, numbered_lines, chunksize=max(1, args.buffer_size // args.jobs))
+
+        start = time.perf_counter()
+        latencies = list()
+        failed = False
+        buffer = list()
+        for i, (record, results, latency) in enumerate(record_results, 1):
+            latencies.append(latency)
+            failed = failed or any("error" in result for result in results)
+            buffer += results
+            if i % args.buffer_size == 0:
+                write_buffer(buffer, f_out, args.output_dir)
+                buffer = list()
+        write_buffer(buffer, f_out, args.output_dir)
+        elapsed = time.perf_counter() - start
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if f_in is not sys.stdin:
+            f_in.close()
+        if f_out is not None and f_out is not sys.stdout:
+            f_out.close()
+
+    if args.stats:
+        print(format_stats(latencies, elapsed), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
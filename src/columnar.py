@@ -0,0 +1,84 @@
+"""
+Column-oriented rendering of one template for a large table of people, e.g. the recipients of a mail merge.
+
+The table is given as one column per property of individual pronoun data (e.g. `{"subject": [...], "object": [...],
+"personal-name": [...]}`), where every row describes one person. If an additional column of ids is given, every row is
+rendered with gender*render pronoun data that assigns its individual pronoun data to its id (so templates may refer to
+the person by id), and with individual pronoun data otherwise. Rows with the same values are rendered only once, so
+rendering a table takes time proportional to the number of distinct rows times the number of tags plus the number of
+rows, rather than the number of rows times the number of tags.
+
+Columns may be any sequences, including NumPy object arrays if NumPy is installed; if any column is a NumPy array, the
+rendered rows are returned as a NumPy object array as well.
+
+This is not part of the specification.
+"""
+
+import typing
+
+from . import warnings
+from .template_interface import Template
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Column = typing.Sequence[typing.Optional[str]]
+"""The values of one property for all rows. None means that the row does not specify the property (so its default
+value is used, if it has one)."""
+
+# grouping rows:
+
+
+def group_rows(columns: typing.Dict[str, Column], ids: typing.Optional[typing.Sequence[str]] = None)\
+        -> typing.Tuple[typing.List[typing.Dict[str, typing.Any]], typing.List[int]]:
+    """Returns the pronoun data of every distinct row of the given columns, along with a list that maps every row to the
+    index of its pronoun data. The pronoun data of a row is its individual pronoun data, or, if `ids` is given,
+    gender*render pronoun data that assigns it to the row's id. Raises a ValueError if the columns (including `ids`)
+    differ in length."""
+    properties = list(columns.keys())
+    lengths = set(len(column) for column in columns.values())
+    if ids is not None:
+        lengths.add(len(ids))
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length, but they have lengths " + str(sorted(lengths)) + ".")
+
+    indices: typing.Dict[tuple, int] = dict()
+    unique_rows = list()
+    row_indices = list()
+    number_of_rows = next(iter(lengths)) if lengths else 0
+    id_column = ids if ids is not None else [None] * number_of_rows
+    for id_value, *row in zip(id_column, *(columns[p] for p in properties)):
+        key = (id_value, *row)
+        if key not in indices:
+            indices[key] = len(unique_rows)
+            # (strings from NumPy arrays are converted to plain strings):
+            idpd = {p: str(value) if isinstance(value, str) else value
+                    for p, value in zip(properties, row) if value is not None}
+            unique_rows.append(idpd if ids is None else {str(id_value): idpd})
+        row_indices.append(indices[key])
+    return unique_rows, row_indices
+
+# rendering columns:
+
+
+def render_columns(template: Template, columns: typing.Dict[str, Column],
+                   warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS,
+                   ids: typing.Optional[typing.Sequence[str]] = None)\
+        -> typing.Union[typing.List[str], "numpy.ndarray"]:
+    """Renders the given template once for every row of the given columns (with the ids of `ids` if given, see
+    `group_rows`), and returns the rendered rows in the order of the columns (as a NumPy object array if any column is
+    one, and as a list otherwise).
+    Every distinct row is rendered only once, so warnings are raised once per distinct row, and errors are raised for
+    the first row that cannot be rendered."""
+
+    unique_rows, row_indices = group_rows(columns, ids)
+    rendered_rows = [template.render(pronoun_data, warning_settings=warning_settings) for pronoun_data in unique_rows]
+
+    if numpy is not None and any(isinstance(column, numpy.ndarray) for column in [*columns.values(), ids]):
+        # scatter the rendered rows with a single fancy-indexing operation:
+        rendered_array = numpy.empty(len(rendered_rows), dtype=object)
+        rendered_array[:] = rendered_rows
+        return rendered_array[numpy.asarray(row_indices, dtype=numpy.intp)]
+    return [rendered_rows[i] for i in row_indices]
@@ -9,7 +9,10 @@ necessarily be relied on."""
 
 class SyntaxError(SyntaxError):
     """Raised when an error occurs whilst parsing a gender*render template."""
-    pass
+
+    details = None
+    """What exactly is wrong (e.g. which character was not expected where), if the message of the error does not say so
+    already; otherwise None."""
 
 
 class SyntaxPostprocessingError(SyntaxError):
@@ -4,12 +4,14 @@ Functions to gender nouns with gender bias correctly.
 Please note that you need to have `nltk` installed for this to work completely, e.g. to include all types of warnings.
 """
 
-import requests
 import json
 import copy
+import functools
 import warnings as builtin_warnings
 import os
-from typing import Set, Optional, Dict, List, Callable, Tuple, Union
+import threading
+from collections import OrderedDict
+from typing import Set, Optional, Dict, List, Callable, Tuple
 try:
     from typing_extensions import TypedDict, Literal
 except ImportError:
@@ -118,13 +120,20 @@ except ImportError:
         """Checks whether the given word is a valid english person noun."""
         return True
 
+# the source of the gendered noun data:
+
+SOURCE_URL = "https://raw.githubusercontent.com/phseiff/gendered_words/master/gendered_words.json"
+"""The file `GenderNounDataHandler.load_from_web` builds the gendered noun data from."""
+
 # a helper function for logging:
 
 
 def lwarn(*text, sep=" ", end="\n"):
     """Prints the given text, but only if the "BuildingGenderedNounDataLogging"-warning is enabled.
-    The name "lwarn" is supposed to stand for "log warning"."""
-    warnings.WarningManager.raise_warning(sep.join([str(t) for t in text]) + end,
+    The name "lwarn" is supposed to stand for "log warning".
+    Every part of the text may also be a function that returns it, so that texts which are logged for every word are
+    only built if they are actually logged."""
+    warnings.WarningManager.raise_warning(lambda: sep.join([str(t() if callable(t) else t) for t in text]) + end,
                                           warnings.BuildingGenderedNounDataLogging)
 
 # a pipeline for creating files that describe differently gendered versions of gendered nouns:
@@ -147,13 +156,26 @@ class GenderNounDataHandler:
         The data used for this is taken from https://github.com/ecmonsen/gendered_words
         (which is not by me; see the repository for the license)."""
 
-        grammatical_genders = {"m": "male", "f": "female", "n": "neutral"}
+        # (requests is imported here, since it is slow to import and only needed when building the data from the web):
+        import requests
 
         # load from the web, in a completely wrong format that we have yet to change:
-        raw_json: OriginalGenderNounData = json.loads(requests.get(
-            "https://raw.githubusercontent.com/phseiff/gendered_words/master/gendered_words.json").text)
+        return GenderNounDataHandler.convert_original_data(json.loads(requests.get(SOURCE_URL).text))
+
+    @staticmethod
+    def load_from_source_file(file_name: str) -> GeneratedGenderNounData:
+        """Works like `load_from_web`, but reads the data from a local copy of the file `load_from_web` downloads
+        (`gendered_words.json`), so that the gendered noun data can be built without network access."""
+        with open(file_name, "r") as f:
+            return GenderNounDataHandler.convert_original_data(json.load(f))
+
+    @staticmethod
+    def convert_original_data(raw_json: OriginalGenderNounData) -> GeneratedGenderNounData:
+        """Converts the data `load_from_web` downloads into the format used throughout all the other methods of this
+        class (see `load_from_web`)."""
+
+        grammatical_genders = {"m": "male", "f": "female", "n": "neutral"}
 
-        # change the format:
         result = dict()
         for word in raw_json:
             if "wordnet_senseno" in word:
@@ -164,13 +186,13 @@ class GenderNounDataHandler:
                             result[word["word"]]["gender_map"][long] = word["gender_map"][short][0]["word"].replace(
                                 " ", "_")
                 if word["gender"] == "o":
-                    lwarn("Found an \"other\"-word! It's \"" + word["word"] + "\".")
+                    lwarn(lambda: "Found an \"other\"-word! It's \"" + word["word"] + "\".")
                     result[word["word"]]["gender"] = "neutral"
                 else:
                     result[word["word"]]["gender"] = grammatical_genders[word["gender"]]
             else:
-                lwarn("\"" + word["word"] + "\" ignored because it is not part of wordnet and therefore not a hyponyms "
-                      + "for a person.")
+                lwarn(lambda: "\"" + word["word"] + "\" ignored because it is not part of wordnet and therefore not a "
+                      + "hyponyms for a person.")
 
         lwarn(len(result), "words found.")
         return result
@@ -237,7 +259,7 @@ class GenderNounDataHandler:
                 if grammatical_gender in word_data["gender_map"]:
                     is_noun = is_noun or is_a_noun(word_data["gender_map"][grammatical_gender])
             if not is_noun:
-                lwarn("Deleting \"" + word_name + "\", since it is not a noun!")
+                lwarn(lambda: "Deleting \"" + word_name + "\", since it is not a noun!")
                 count += 1
                 del graph[word_name]
 
@@ -252,8 +274,8 @@ class GenderNounDataHandler:
         for word_name, word_data in list(graph.items()):
             for gender_name, link_name in word_data["gender_map"].items():
                 if link_name not in graph:
-                    lwarn("\"" + word_name + "\" lists \"" + link_name + "\" as its " + gender_name + " version, but \""
-                          + link_name + "\" does not exist in the word data file.")
+                    lwarn(lambda: "\"" + word_name + "\" lists \"" + link_name + "\" as its " + gender_name
+                          + " version, but \"" + link_name + "\" does not exist in the word data file.")
                     count += 1
                     graph[link_name] = {"gender": gender_name, "gender_map": {word_data["gender"]: word_name}}
                 # # Commented out, since it is already covered by create_extra_links_to_gender_ambiguous_words():
@@ -293,6 +315,39 @@ class GenderNounDataHandler:
             lwarn("Had to alphabetically decide between", option1, "and", option2)
         return sorted([option1, option2])[0]
 
+    @staticmethod
+    def get_groups_of_linked_words(graph: GeneratedGenderNounData) -> List[List[str]]:
+        """Returns the groups of words that are directly or indirectly linked to each other (regardless of the direction
+        of the links), i.e. the connected components of the graph. They are found with a union-find structure in a
+        single pass over all links, rather than by following the links of every word recursively.
+        Groups are ordered by their first word, and the words of every group are in the order of the graph.
+        Every linked word must exist in the graph (see `make_sure_all_referenced_words_exist`)."""
+
+        parents: Dict[str, str] = {word_name: word_name for word_name in graph}
+        sizes: Dict[str, int] = {word_name: 1 for word_name in graph}
+
+        def find(word_name: str) -> str:
+            """Returns the representative of the group of the given word, halving the path to it on the way."""
+            while parents[word_name] != word_name:
+                parents[word_name] = parents[parents[word_name]]
+                word_name = parents[word_name]
+            return word_name
+
+        for word_name, word_data in graph.items():
+            for link_name in word_data["gender_map"].values():
+                root1, root2 = find(word_name), find(link_name)
+                if root1 != root2:
+                    # attach the smaller group to the larger one:
+                    if sizes[root1] < sizes[root2]:
+                        root1, root2 = root2, root1
+                    parents[root2] = root1
+                    sizes[root1] += sizes[root2]
+
+        groups: Dict[str, List[str]] = dict()
+        for word_name in graph:
+            groups.setdefault(find(word_name), []).append(word_name)
+        return list(groups.values())
+
     @staticmethod
     def make_all_links_two_sided(graph: GeneratedGenderNounData, log_clashs=False)\
             -> GeneratedGenderNounData:
@@ -327,10 +382,11 @@ class GenderNounDataHandler:
             algorithmic choose between two options."""
             if gender in gender_dict and gender_dict[gender] != value:
                 # log the clash if it wasn't logged yet:
-                clash_report = value + " clashes with " + gender_dict[gender]
-                if log_clashs and clash_report not in already_reported_clashes:
-                    lwarn(clash_report)
-                    already_reported_clashes.add(clash_report)
+                if log_clashs:
+                    clash_report = value + " clashes with " + gender_dict[gender]
+                    if clash_report not in already_reported_clashes:
+                        lwarn(clash_report)
+                        already_reported_clashes.add(clash_report)
 
                 # choose the better of both options (keep the old word or rather use the new one):
                 chosen_option = GenderNounDataHandler.choose_better_word(value, gender_dict[gender], log=log_clashs)
@@ -340,98 +396,64 @@ class GenderNounDataHandler:
             gender_dict[gender] = chosen_option
             gender_dict_alts[gender] |= {chosen_option, value}
 
-        def get_all_connected_words(word_name, data: Union[Set[str], None] = None):
-            """Returns a set of all words that are indirectly or directly linked to the given word."""
-            if not data:
-                data = {word_name}
-            for link_name in graph[word_name]["gender_map"].values():
-                if link_name not in data:
-                    data.add(link_name)
-                    get_all_connected_words(link_name, data)
-                if link_name in link_groups:
-                    data |= link_groups[link_name]
-            return data
-
-        link_groups: Dict[str, Set[str]] = dict()
-        words_we_already_visited: Set[str] = set()
-        # first iteration is to make FULL links groups of connected words before we start linking words to each other:
-        for word_name, word_data in graph.items():
-            if word_name not in words_we_already_visited:
+        # make FULL link groups of connected words before we start linking words to each other, then do the linking
+        # group by group:
+        for link_group in GenderNounDataHandler.get_groups_of_linked_words(graph):
+            # create a gender-dict for all of them:
+            genders_we_are_very_sure_about: Set[GeneratedDataGender] = set()
+            gender_dict: Dict[GeneratedDataGender, str] = dict()
+            gender_dict_alts: Dict[GeneratedDataGender, Set[str]] = {"female": set(), "male": set(),
+                                                                     "neutral": set()}
+            for link_name in link_group:
+                # add gender of the individual...
+                gender = graph[link_name]["gender"]
+                if gender in genders_we_are_very_sure_about:
+                    assign_value_or_use_old_one(gender_dict, gender, link_name)
+                else:
+                    gender_dict_alts[gender] = {link_name}
+                    gender_dict[gender] = link_name
+                genders_we_are_very_sure_about.add(gender)
+
+                # ...as well as genders it specifies in its gender_map, but only if we couldn't find these otherwise
+                for gender, link_name2 in graph[link_name]["gender_map"].items():
+                    if gender not in genders_we_are_very_sure_about:
+                        assign_value_or_use_old_one(gender_dict, gender, link_name2)
+
+            # link words with each other, so each word gets the full gender dict to call its own,
+            # but only for genders it does not have in its own original gender dict yet, so manual links in the
+            # already given data take precedence:
+            for link_name in link_group:
+                for gender, link_name2 in gender_dict.items():
+                    if gender not in graph[link_name]["gender_map"] and gender != graph[link_name]["gender"]:
+                        graph[link_name]["gender_map"][gender] = link_name2
+                        lwarn(lambda: "\"" + link_name + "\" is (indirectly) linked to \"" + link_name2
+                              + "\", which is " + graph[link_name2]["gender"],
+                              lambda: " but \"" + link_name + "\" has no " + graph[link_name2]["gender"] + " version.")
+                        count += 1
 
-                # create group of all words that are linked to this word (including those that are once removed):
-                link_group = get_all_connected_words(word_name)
-                for link_name in link_group:
-                    if link_name in link_groups:
-                        link_groups[link_name] |= link_group
-                    else:
-                        link_groups[link_name] = link_group
-
-                # add these words to the visited words now:
-                words_we_already_visited |= link_group
-
-        # second iteration is to actually do the linking:
-        words_we_already_visited: Set[str] = set()
-        for word_name in graph.keys():
-            # if we did not visit this word yet:
-            if word_name not in words_we_already_visited:
-                link_group = link_groups[word_name]
-                words_we_already_visited |= link_group
-
-                # create a gender-dict for all of them:
-                genders_we_are_very_sure_about: Set[GeneratedDataGender] = set()
-                gender_dict: Dict[GeneratedDataGender, str] = dict()
-                gender_dict_alts: Dict[GeneratedDataGender, Set[str]] = {"female": set(), "male": set(),
-                                                                         "neutral": set()}
-                for link_name in link_group:
-                    # add gender of the individual...
-                    gender = graph[link_name]["gender"]
-                    if gender in genders_we_are_very_sure_about:
-                        assign_value_or_use_old_one(gender_dict, gender, link_name)
-                    else:
-                        gender_dict_alts[gender] = {link_name}
-                        gender_dict[gender] = link_name
-                    genders_we_are_very_sure_about.add(gender)
-
-                    # ...as well as genders it specifies in its gender_map, but only if we couldn't find these otherwise
-                    for gender, link_name2 in graph[link_name]["gender_map"].items():
-                        if gender not in genders_we_are_very_sure_about:
-                            assign_value_or_use_old_one(gender_dict, gender, link_name2)
-
-                # link words with each other, so each word gets the full gender dict to call its own,
-                # but only for genders it does not have in its own original gender dict yet, so manual links in the
-                # already given data take precedence:
-                for link_name in link_group:
-                    for gender, link_name2 in gender_dict.items():
-                        if gender not in graph[link_name]["gender_map"] and gender != graph[link_name]["gender"]:
-                            graph[link_name]["gender_map"][gender] = link_name2
-                            lwarn("\"" + link_name + "\" is (indirectly) linked to \"" + link_name2
-                                  + "\", which is " + graph[link_name2]["gender"], " but \"" + link_name
-                                  + "\" has no " + graph[link_name2]["gender"] + " version.")
-                            count += 1
-
-                            # if the newly added link was chosen between two possible words algorithmically, add this as
-                            # a warning:
-                            if gender_dict_alts[gender] != {link_name2}:
-                                if "warning" not in graph[link_name]:
-                                    graph[link_name]["warning"] = set()
-                                alt_values = sorted(list(gender_dict_alts[gender]))
-                                alt_values_str = ", ".join(alt_values[:-1]) + " and " + alt_values[-1]
-                                new_warning = (alt_values_str + " would've all been good values for the " + gender + " "
-                                               + "version of \"" + link_name + "\", but \"" + link_name2
-                                               + "\" was automatically chosen based on an algorithm.")
-                                lwarn(new_warning)
-                                graph[link_name]["warning"].add(new_warning)
-
-                # infect linked words with the warnings of the words they're linked to:
-                link_group_warnings = set()
+                        # if the newly added link was chosen between two possible words algorithmically, add this as
+                        # a warning:
+                        if gender_dict_alts[gender] != {link_name2}:
+                            if "warning" not in graph[link_name]:
+                                graph[link_name]["warning"] = set()
+                            alt_values = sorted(list(gender_dict_alts[gender]))
+                            alt_values_str = ", ".join(alt_values[:-1]) + " and " + alt_values[-1]
+                            new_warning = (alt_values_str + " would've all been good values for the " + gender + " "
+                                           + "version of \"" + link_name + "\", but \"" + link_name2
+                                           + "\" was automatically chosen based on an algorithm.")
+                            lwarn(new_warning)
+                            graph[link_name]["warning"].add(new_warning)
+
+            # infect linked words with the warnings of the words they're linked to:
+            link_group_warnings = set()
+            for link_name in link_group:
+                if "warning" in graph[link_name]:
+                    link_group_warnings |= graph[link_name]["warning"]
+            if link_group_warnings:
                 for link_name in link_group:
-                    if "warning" in graph[link_name]:
-                        link_group_warnings |= graph[link_name]["warning"]
-                if link_group_warnings:
-                    for link_name in link_group:
-                        if "warning" not in graph[link_name]:
-                            graph[link_name]["warning"] = set()
-                        graph[link_name]["warning"] |= link_group_warnings
+                    if "warning" not in graph[link_name]:
+                        graph[link_name]["warning"] = set()
+                    graph[link_name]["warning"] |= link_group_warnings
 
         lwarn(count, "links created.")
         return graph
@@ -448,9 +470,9 @@ class GenderNounDataHandler:
                 if graph[link_name]["gender"] not in word_data["gender_map"]:
                     if graph[link_name]["gender"] != word_data["gender"]:
                         word_data["gender_map"][graph[link_name]["gender"]] = link_name
-                        lwarn("\"" + word_name + "\" does not have a " + graph[link_name]["gender"] + " version, but a "
-                              + "word it links to as its " + gender_name + " version is " + graph[link_name]["gender"]
-                              + ".")
+                        lwarn(lambda: "\"" + word_name + "\" does not have a " + graph[link_name]["gender"]
+                              + " version, but a word it links to as its " + gender_name + " version is "
+                              + graph[link_name]["gender"] + ".")
                         count += 1
 
         lwarn(count, "links created.")
@@ -499,9 +521,19 @@ class GenderNounDataHandler:
             ("start", [("female", "queen"),    ("male", "king"),       ("neutral", "monarch")])
         ]
 
+        # (words that neither start nor end with any gender indicator are skipped without looking at the table):
+        all_gender_indicators = {
+            end_or_start: tuple(gender_indicator for e_or_s, gender_indicator_tuples in gender_indicator_tuples_table
+                                for gender, gender_indicator in gender_indicator_tuples
+                                if e_or_s == end_or_start and gender_indicator)
+            for end_or_start in ("start", "end")}
+
         words_created = 0
         links_created = 0
         for word_name, word_data in list(graph.items()):
+            if not (word_name.startswith(all_gender_indicators["start"])
+                    or word_name.endswith(all_gender_indicators["end"])):
+                continue
             for end_or_start, gender_indicator_tuples in gender_indicator_tuples_table:
                 created_corresponding_gendered_versions = False
                 for gender, gender_indicator in gender_indicator_tuples:
@@ -526,12 +558,12 @@ class GenderNounDataHandler:
                                         not_applicable = True
                                         continue
                                     # create the new word or link to it:
-                                    lwarn("\"" + word_name + "\" ends with \"-" + gender_indicator
+                                    lwarn(lambda: "\"" + word_name + "\" ends with \"-" + gender_indicator
                                           + "\", but it has no " + other_gender + " version. ", end="")
                                     word_data["gender_map"][other_gender] = new_gendered_version
                                     links_created += 1
                                     if new_gendered_version not in graph:
-                                        lwarn("Creating one as \"" + new_gendered_version + "\"!")
+                                        lwarn(lambda: "Creating one as \"" + new_gendered_version + "\"!")
                                         words_created += 1
                                         graph[new_gendered_version] = {
                                             "gender": other_gender,
@@ -543,7 +575,7 @@ class GenderNounDataHandler:
                                                         + " of said " + "word."}
                                         }
                                     else:
-                                        lwarn("Linking to \"" + new_gendered_version + "\".")
+                                        lwarn(lambda: "Linking to \"" + new_gendered_version + "\".")
                                     # Add a new warning that a link was created between those two:
                                     if "warning" not in word_data:
                                         word_data["warning"] = set()
@@ -576,7 +608,7 @@ class GenderNounDataHandler:
         for word_name, word_data in list(graph.items()):
             if word_data["gender"] != "neutral":
                 if "neutral" not in word_data["gender_map"]:
-                    lwarn("\"" + word_name + "\" is neither neutral, nor does it link to a neutral version.")
+                    lwarn(lambda: "\"" + word_name + "\" is neither neutral, nor does it link to a neutral version.")
                     count += 1
                     if word_data["gender"] == "male":
                         word_data["gender_map"]["neutral"] = word_name
@@ -619,29 +651,36 @@ class GenderNounDataHandler:
         """A pipeline that combines all methods of this method collection to pull a graph of gendered words from the web
         and automatically fill all holes this graph has left open."""
 
-        graph = GenderNounDataHandler.load_from_web()
-        lwarn("")
-        graph = GenderNounDataHandler.remove_words_that_are_not_nouns(graph)
-
-        lwarn("")
-        graph = GenderNounDataHandler.make_sure_all_referenced_words_exist(graph)
-        lwarn("")
-        graph = GenderNounDataHandler.make_all_links_two_sided(graph)
+        return GenderNounDataHandler.complete_graph(GenderNounDataHandler.load_from_web())
 
-        lwarn("")
-        graph = GenderNounDataHandler.create_extra_links_to_gender_ambiguous_words(graph)
-        lwarn("")
-        graph = GenderNounDataHandler.make_all_links_two_sided(graph, log_clashs=True)
-
-        lwarn("")
-        graph = GenderNounDataHandler.create_gendered_versions_for_words_that_end_with_gender_indicators(graph)
-        lwarn("")
-        graph = GenderNounDataHandler.make_all_links_two_sided(graph)
+    @staticmethod
+    def complete_graph(graph: GeneratedGenderNounData) -> GeneratedGenderNounData:
+        """The part of `create_full_graph_from_web` that follows `load_from_web`: automatically fills all holes the
+        given graph (in the format returned by `load_from_web`) has left open, and returns the result."""
 
-        lwarn("")
-        graph = GenderNounDataHandler.find_words_with_no_neutral_form(graph)
+        for stage_name, stage in GenderNounDataHandler.get_pipeline_stages():
+            lwarn("")
+            graph = stage(graph)
         return graph
 
+    @staticmethod
+    def get_pipeline_stages() -> List[Tuple[str, Callable[[GeneratedGenderNounData], GeneratedGenderNounData]]]:
+        """Returns the stages `complete_graph` applies to a graph, in order, as pairs of a name that is unique among the
+        stages and the function that applies the stage."""
+        return [
+            ("remove_words_that_are_not_nouns", GenderNounDataHandler.remove_words_that_are_not_nouns),
+            ("make_sure_all_referenced_words_exist", GenderNounDataHandler.make_sure_all_referenced_words_exist),
+            ("make_all_links_two_sided", GenderNounDataHandler.make_all_links_two_sided),
+            ("create_extra_links_to_gender_ambiguous_words",
+             GenderNounDataHandler.create_extra_links_to_gender_ambiguous_words),
+            ("make_all_links_two_sided-log_clashs",
+             functools.partial(GenderNounDataHandler.make_all_links_two_sided, log_clashs=True)),
+            ("create_gendered_versions_for_words_that_end_with_gender_indicators",
+             GenderNounDataHandler.create_gendered_versions_for_words_that_end_with_gender_indicators),
+            ("make_all_links_two_sided-again", GenderNounDataHandler.make_all_links_two_sided),
+            ("find_words_with_no_neutral_form", GenderNounDataHandler.find_words_with_no_neutral_form)
+        ]
+
 
 # the final dict:
 
@@ -662,14 +701,132 @@ Most parts of the contents of this file were created based on WordNet content, w
  Contributions by phseiff are licensed under Creative Commons Attribution 3.0 as well.'
 }
 noun_data_location = os.path.join(__file__.rsplit(os.sep, 1)[0], "data/gendered-nouns.gdn")
-GENDER_DICT: GeneratedGenderNounData
-try:
-    GENDER_DICT, _ = GenderNounDataHandler.load_from_disk(noun_data_location)
-except FileNotFoundError:
-    warnings.WarningManager.raise_warning(None, warnings.GenderedNounsBuildFromWebWarning)
-    g = GenderNounDataHandler.create_full_graph_from_web()
-    GenderNounDataHandler.save_to_disk(g, noun_data_location, **GDN_META_DATA)
-    GENDER_DICT, _ = GenderNounDataHandler.load_from_disk(noun_data_location)
+
+
+def load_noun_data(file_name: str) -> GeneratedGenderNounData:
+    """Returns the gendered noun data in the given file, or no data at all (raising a `GenderedNounsMissingWarning`) if
+    the file does not exist. The data is never built here, since building it from the web would need network access
+    while importing this module; see `gender_render.build_nouns` for building it."""
+    try:
+        return GenderNounDataHandler.load_from_disk(file_name)[0]
+    except FileNotFoundError:
+        warnings.WarningManager.raise_warning(None, warnings.GenderedNounsMissingWarning)
+        return dict()
+
+
+GENDER_DICT: GeneratedGenderNounData = load_noun_data(noun_data_location)
+
+# custom gendered nouns on top of the final dict:
+
+GENDERS: Tuple[GeneratedDataGender, ...] = ("female", "male", "neutral")
+
+
+class LayeredNounData:
+    """Gendered noun data made of base data (usually `GENDER_DICT`) and any number of overlays: custom gendered noun
+    data (e.g. domain-specific job titles) registered by applications, in the format of the base data. Later overlays
+    take precedence over earlier ones, and all overlays take precedence over the base data.
+
+    Lookups are chained: a word is looked up in a merged table of all overlays first, and in the base data only if no
+    overlay defines it, so the base data is never copied. When an overlay is added or removed, only the words of this
+    overlay are updated in the merged table, as well as in the table of the rendered versions of every word (which are
+    computed once per word, and only stored for words that the base data or an overlay defines, so that the table never
+    grows larger than the noun data, however many unknown words are rendered). Overlays may be changed from any thread,
+    but renderers that store rendered values themselves (`BoundRenderer` and its specialized templates) keep the
+    versions they already rendered."""
+
+    def __init__(self, base: GeneratedGenderNounData):
+        """Returns layered noun data without any overlays on top of the given base data."""
+        self.base = base
+        self.overlays: Dict[str, GeneratedGenderNounData] = OrderedDict()
+        self.merged: GeneratedGenderNounData = dict()
+        self.rendered_versions: Dict[str, Dict[GeneratedDataGender, str]] = dict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def check_overlay(data: GeneratedGenderNounData):
+        """Raises a ValueError if the given overlay is not valid gendered noun data, or if it contains a word without a
+        neutral version (which is what nouns are rendered as if the pronoun data wants a gender they don't have)."""
+        for word, word_data in data.items():
+            if not isinstance(word_data, dict) or word_data.get("gender") not in GENDERS\
+                    or not isinstance(word_data.get("gender_map"), dict)\
+                    or not all(gender in GENDERS and isinstance(version, str)
+                               for gender, version in word_data["gender_map"].items()):
+                raise ValueError("\"" + str(word) + "\" must be described by a dict with a \"gender\" (one of "
+                                 + ", ".join(GENDERS) + ") and a \"gender_map\" of genders to words.")
+            if word_data["gender"] != "neutral" and "neutral" not in word_data["gender_map"]:
+                raise ValueError("\"" + word + "\" is neither neutral, nor does it have a neutral version.")
+
+    def add_overlay(self, name: str, data: GeneratedGenderNounData):
+        """Adds the given gendered noun data as an overlay with the given name, on top of all other overlays. An overlay
+        that already exists under this name is replaced. Words are written like in the base data, i.e. in lowercase
+        with "_" instead of spaces, and every version of a word that templates may contain needs its own entry (see
+        `GenderNounDataHandler.make_all_links_two_sided`)."""
+        LayeredNounData.check_overlay(data)
+        with self.lock:
+            old_data = self.overlays.pop(name, dict())
+            self.overlays[name] = dict(data)
+            self.update_words(set(old_data) | set(data))
+
+    def remove_overlay(self, name: str):
+        """Removes the overlay with the given name; raises a KeyError if there is none."""
+        with self.lock:
+            self.update_words(set(self.overlays.pop(name)))
+
+    def get_overlay_names(self) -> List[str]:
+        """Returns the names of all overlays, from the bottom to the top."""
+        return list(self.overlays.keys())
+
+    def update_words(self, words: Set[str]):
+        """Updates the given words in the merged table of all overlays, and their rendered versions. The lock must be
+        held."""
+        overlays = list(reversed(self.overlays.values()))
+        for word in words:
+            for overlay in overlays:
+                if word in overlay:
+                    self.merged[word] = overlay[word]
+                    break
+            else:
+                self.merged.pop(word, None)
+            if self.get(word) is None:
+                self.rendered_versions.pop(word, None)
+            else:
+                self.rendered_versions[word] = self.render_versions(word)
+
+    def get(self, word: str) -> Optional[GeneratedDataWord]:
+        """Returns the data of the given word from the topmost overlay that defines it or, if no overlay does, from the
+        base data; None if neither does."""
+        word_data = self.merged.get(word)
+        return word_data if word_data is not None else self.base.get(word)
+
+    def render_versions(self, word: str) -> Dict[GeneratedDataGender, str]:
+        """Returns the version of the given word for every gender, as it is rendered."""
+        word_data = self.get(word)
+        rendered_versions = dict()
+        for gender in GENDERS:
+            if word_data is None or gender == word_data["gender"]:
+                result = word
+            else:
+                result = word_data["gender_map"].get(gender)
+                # look for the neutral version if there is no version of the given gender:
+                if result is None:
+                    result = word if word_data["gender"] == "neutral" else word_data["gender_map"]["neutral"]
+            rendered_versions[gender] = result.replace("_", " ")
+        return rendered_versions
+
+    def render(self, word: str, gender: GeneratedDataGender) -> str:
+        """Returns the version of the given word for the given gender, as it is rendered."""
+        rendered_versions = self.rendered_versions.get(word)
+        if rendered_versions is None:
+            if self.get(word) is None:
+                # (words that are not in the noun data are rendered as they are, and not stored):
+                return self.render_versions(word)[gender]
+            with self.lock:
+                rendered_versions = self.rendered_versions[word] = self.render_versions(word)
+        return rendered_versions[gender]
+
+
+noun_data = LayeredNounData(GENDER_DICT)
+"""The gendered noun data `GenderedNoun` uses: `GENDER_DICT` and the overlays applications add to it."""
 
 
 # Representation of a not-yet correctly gendered noun:
@@ -683,21 +840,26 @@ class GenderedNoun:
         # save the full word, but lookup the word in lowercase:
         self.word = word
 
-        # raise warnings if the word is not a word/ noun/ person noun:
-        if word not in GENDER_DICT:
-            if not is_a_word(word):
-                warnings.WarningManager.raise_warning("\"" + word + "\" is not a known word, so gender*render might not"
-                                                      + " be able to gender it correctly.", warnings.NotAWordWarning)
-            elif not is_a_noun(word):
-                warnings.WarningManager.raise_warning("\"" + word + "\" is not a known noun, so gender*render might not"
-                                                      + " be able to gender it correctly.", warnings.NotANounWarning)
-            else:
-                warnings.WarningManager.raise_warning("\"" + word + "\" is not a hyponym for person, so gender*render "
-                                                      + "might not be able to gender it correctly.",
-                                                      warnings.NotAPersonNounWarning)
-        elif "warning" in GENDER_DICT[word]:
-            warnings.WarningManager.raise_warning("warnings for \"" + word + "\":\n"
-                                                  + "\n".join(list(GENDER_DICT[word]["warning"])),
+        # raise warnings if the word is not a word/ noun/ person noun (without looking it up if they are disabled):
+        word_data = noun_data.get(word)
+        if word_data is None:
+            if any(warnings.WarningManager.is_enabled(w) for w in (
+                    warnings.NotAWordWarning, warnings.NotANounWarning, warnings.NotAPersonNounWarning)):
+                if not is_a_word(word):
+                    warnings.WarningManager.raise_warning(lambda: "\"" + word + "\" is not a known word, so "
+                                                          + "gender*render might not be able to gender it correctly.",
+                                                          warnings.NotAWordWarning)
+                elif not is_a_noun(word):
+                    warnings.WarningManager.raise_warning(lambda: "\"" + word + "\" is not a known noun, so "
+                                                          + "gender*render might not be able to gender it correctly.",
+                                                          warnings.NotANounWarning)
+                else:
+                    warnings.WarningManager.raise_warning(lambda: "\"" + word + "\" is not a hyponym for person, so "
+                                                          + "gender*render might not be able to gender it correctly.",
+                                                          warnings.NotAPersonNounWarning)
+        elif "warning" in word_data:
+            warnings.WarningManager.raise_warning(lambda: "warnings for \"" + word + "\":\n"
+                                                  + "\n".join(list(word_data["warning"])),
                                                   warnings.NounGenderingGuessingsWarning)
             # ToDo: Maybe only print those warnings that contain `"\"" + word + "\""` in them? This would require
             #  reviewing all warnings attached to words by this modules code, to be sure this actually prints all
@@ -707,24 +869,9 @@ class GenderedNoun:
 
     def render_noun(self, gender: GeneratedDataGender) -> str:
         """Returns the correctly gendered version of itself as a string. gender must be either "male", "female" or
-        "neutral"."""  # ToDo: Re-test this since capitalization is no longer supported.
-
-        # return the correctly gendered version of the word:
-        word = self.word
-        if word in GENDER_DICT:
-            word_data = GENDER_DICT[word]
-            # look for the neutral version if there is no version of the given gender:
-            if gender not in set(word_data["gender_map"].keys()) | {word_data["gender"]}:
-                gender = "neutral"
-            # return the word if it is the right gender:
-            if GENDER_DICT[word]["gender"] == gender:
-                result = word
-            # otherwise, return the correctly gendered version from the gender_map:
-            else:
-                result = word_data["gender_map"][gender]
-        else:
-            result = self.word
-        return result.replace("_", " ")
+        "neutral". Overlays of `noun_data` take precedence over `GENDER_DICT`."""
+        # ToDo: Re-test this since capitalization is no longer supported.
+        return noun_data.render(self.word, gender)
 
     def __eq__(self, other) -> bool:
         """Checks whether two GenderedNoun-representations are identical, based on what noun they represent."""
@@ -732,3 +879,7 @@ class GenderedNoun:
             return self.word == other.word
         else:
             return False
+
+    def __hash__(self) -> int:
+        """Hashes GenderedNoun-representations based on what noun they represent, in accordance to `__eq__`."""
+        return hash(self.word)
@@ -14,6 +14,7 @@ studly-caps     | FoObAR
 alt-studly-caps | fOoBaR
 """
 
+import functools
 from collections import namedtuple, OrderedDict
 from typing import Dict, NamedTuple, Callable, Union, List
 
@@ -23,13 +24,25 @@ from . import errors
 # Helper functions
 # - these functions are tolerant versions of str.isupper() and str.islower(), in that they don't return False if there
 #   are no cased characters, and evaluate to True for empty strings.
+# - `map` is used rather than generator expressions so the iteration over the characters happens in C.
 
 def isupper(s: str) -> bool:
-    return all((not c.islower()) for c in s)
+    return not any(map(str.islower, s))
 
 
 def islower(s: str) -> bool:
-    return all((not c.isupper()) for c in s)
+    return not any(map(str.isupper, s))
+
+
+def studly_caps(s: str, first_char_is_upper: bool) -> str:
+    """Returns s with every second character upper-cased and every other character lower-cased, starting with an
+    upper-cased first character if `first_char_is_upper` is True, and with a lower-cased one otherwise.
+    Every character is cased on its own (rather than using `str.upper` on the whole string) so that characters whose
+    case mapping depends on their neighbours or changes their length are treated the same way as by a per-character
+    loop."""
+    chars = list(map(str.lower, s))
+    chars[(0 if first_char_is_upper else 1)::2] = map(str.upper, s[(0 if first_char_is_upper else 1)::2])
+    return "".join(chars)
 
 
 # Define types for capitalization methods:
@@ -62,12 +75,12 @@ CAPITALIZATION_TABLE: CapitalizationMethodTable = OrderedDict([
         is_applied=lambda s: isupper(s)
     )),
     ("studly-caps", CapitalizationMethod(
-        apply=lambda s: "".join([(s[i].lower() if i % 2 else s[i].upper()) for i in range(len(s))]),
-        is_applied=lambda s: all((islower(s[i]) if i % 2 else isupper(s[i])) for i in range(len(s)))
+        apply=lambda s: studly_caps(s, first_char_is_upper=True),
+        is_applied=lambda s: isupper(s[::2]) and islower(s[1::2])
     )),
     ("alt-studly-caps", CapitalizationMethod(
-        apply=lambda s: "".join([(s[i].upper() if i % 2 else s[i].lower()) for i in range(len(s))]),
-        is_applied=lambda s: all((isupper(s[i]) if i % 2 else islower(s[i])) for i in range(len(s)))
+        apply=lambda s: studly_caps(s, first_char_is_upper=False),
+        is_applied=lambda s: islower(s[::2]) and isupper(s[1::2])
     )),
 ])
 
@@ -75,11 +88,32 @@ CAPITALIZATION_TABLE: CapitalizationMethodTable = OrderedDict([
 # Funktionen:
 
 
+@functools.lru_cache(maxsize=4096)
 def get_capitalization_from_context_value(context_value: str) -> str:
-    """Returns the capitalization type of a context value, and raises an error if it matches none."""
-    for capitalization_type_name, capitalization_method in CAPITALIZATION_TABLE.items():
-        if capitalization_method.is_applied(context_value):
-            return capitalization_type_name
+    """Returns the capitalization type of a context value, and raises an error if it matches none.
+    This gives the same result as trying the `is_applied`-functions of `CAPITALIZATION_TABLE` in order, but finds out
+    which parts of the context value contain upper- or lower-case letters only once rather than once per capitalization
+    type. Results are cached, since the same context values tend to be used in many tags."""
+    if context_value == "":
+        return "lower-case"
+
+    # which parts of the context value contain lower- and upper-case characters; studly-caps upper-cases the first,
+    # third, fifth... character, and lower-cases the second, fourth, sixth... character:
+    first_is_lower, first_is_upper = context_value[0].islower(), context_value[0].isupper()
+    other_odd_chars, even_chars = context_value[2::2], context_value[1::2]
+    odd_has_lower, odd_has_upper = any(map(str.islower, other_odd_chars)), any(map(str.isupper, other_odd_chars))
+    even_has_lower, even_has_upper = any(map(str.islower, even_chars)), any(map(str.isupper, even_chars))
+
+    if not (first_is_upper or odd_has_upper or even_has_upper):
+        return "lower-case"
+    elif not (first_is_lower or odd_has_upper or even_has_upper):
+        return "capitalized"
+    elif not (first_is_lower or odd_has_lower or even_has_lower):
+        return "all-caps"
+    elif not (first_is_lower or odd_has_lower or even_has_upper):
+        return "studly-caps"
+    elif not (first_is_upper or odd_has_upper or even_has_lower):
+        return "alt-studly-caps"
     raise errors.InvalidCapitalizationError("A tag has the context value '" + context_value + "'.\n"
                                             + "This does not fit any allowed capitalization type.\n"
                                             + "Refer to the specification to learn how to use capitalization in tags.")
@@ -122,4 +156,12 @@ def apply_capitalization_to_tag(tag: Dict[str, Union[str, List[str]]]) -> str:
     This is supposed to be called during the rendering process when the tag has its rendered value, minus proper
     capitalization, already stored in its context value (a design decision that isn't made by the spec, but by this
     implementation since it comes in handy)."""
-    return CAPITALIZATION_TABLE[tag["capitalization"]].apply(tag["context"])
+    return apply_capitalization(tag["context"], tag["capitalization"])
+
+
+@functools.lru_cache(maxsize=4096)
+def apply_capitalization(value: str, capitalization: str) -> str:
+    """Returns `value` with the capitalization method named `capitalization` applied to it.
+    Results are cached, since the values tags are rendered to are mostly taken from a small vocabulary of pronouns
+    and nouns."""
+    return CAPITALIZATION_TABLE[capitalization].apply(value)
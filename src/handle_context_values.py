@@ -3,7 +3,9 @@ Functions that regard gender*render pronoun data's properties and attributes and
 context-values of tags.
 """
 
-from typing import Dict, Union
+import functools
+from collections import namedtuple
+from typing import Dict, Union, FrozenSet, Optional
 
 from . import errors
 from . import warnings
@@ -15,6 +17,22 @@ from . import gender_nouns
 IDPD = Dict[str, str]
 GRPD = Dict[str, IDPD]
 
+# a classification of a property name:
+
+
+PropertyDescriptor = namedtuple("PropertyDescriptor", [
+    "canonical", "is_custom", "uses_special_custom_value_syntax", "is_custom_property_defined_in_a_tag",
+    "maps_directly_between_template_and_pronoun_data", "allowed_values"
+])
+"""Describes everything `ContextValues` knows about a property name: its canonical (assuming it is used in pronoun data,
+which makes unknown names custom properties), whether it is a custom property, whether it uses the special syntax for
+custom properties in pronoun data and in tags, whether it maps directly between template and pronoun data, and a frozen
+set of the values it allows in pronoun data (or None if it allows any value)."""
+
+MAX_CACHED_CUSTOM_PROPERTIES = 1024
+"""The maximum number of custom property descriptors cached by `ContextValues.classify_custom_property`. The cache is
+created when this module is imported, so changing this value later has no effect."""
+
 
 # values for context sections:
 
@@ -53,6 +71,14 @@ class ContextValues:
     ]
     """A list of canonical properties that map directly between template and individual pronoun data."""
 
+    canonical_properties_that_directly_map_between_template_and_pronoun_data_set: FrozenSet[str] = frozenset()
+    """A frozen set of the values in `canonical_properties_that_directly_map_between_template_and_pronoun_data`.
+    Filled by `initialize`."""
+
+    property_descriptors: Dict[str, PropertyDescriptor] = dict()
+    """Maps every property that is not a custom property to its `PropertyDescriptor`. Filled by `initialize`;
+    descriptors of custom properties are created by `classify_custom_property` instead."""
+
     properties_that_allow_only_some_values_in_pd = {
         "gender-addressing": {"false", "true", "f", "t"},
         "gender-nouns": {"female", "male", "neutral"}
@@ -81,20 +107,59 @@ class ContextValues:
                                                      + "\"-attribute of individual \"" + id + "\", but their "
                                                      + "individual pronoun data does not define this attribute.")
             else:
-                warnings.WarningManager.raise_warning("Rendering a template requires the default value of the \""
-                                                      + property_name + "\"-property of individuum \"" + id + "\", but "
-                                                      + "this individuum has this value undefined, so its default had "
-                                                      + "to be used.", warnings.DefaultValueUsedWarning)
+                warnings.WarningManager.raise_warning(lambda: "Rendering a template requires the default value of the "
+                                                      + "\"" + property_name + "\"-property of individuum \"" + id
+                                                      + "\", but this individuum has this value undefined, so its "
+                                                      + "default had to be used.", warnings.DefaultValueUsedWarning)
                 return ContextValues.default_values[property_name]
 
+    @staticmethod
+    def resolve_default_values(grpd: GRPD) -> (GRPD, Dict[str, FrozenSet[str]]):
+        """Returns a copy of the given grpd in which every property with a default value that is missing from a piece of
+        individual pronoun data is set to its default value, so that `get_value` never needs to fall back to default
+        values for it. Also returns the properties that were set this way, for every id that has any."""
+        resolved_grpd = dict()
+        defaulted_properties = dict()
+        for id, idpd in grpd.items():
+            missing_properties = [p for p in ContextValues.default_values if p not in idpd]
+            if missing_properties:
+                idpd = dict(idpd)
+                for p in missing_properties:
+                    idpd[p] = ContextValues.default_values[p]
+                defaulted_properties[id] = frozenset(missing_properties)
+            resolved_grpd[id] = idpd
+        return resolved_grpd, defaulted_properties
+
+    @staticmethod
+    def warn_about_default_values(defaulted_properties: Dict[str, FrozenSet[str]],
+                                  required_properties: Dict[Optional[str], FrozenSet[str]])\
+            -> Dict[str, FrozenSet[str]]:
+        """Raises a single `DefaultValueUsedWarning` about all properties set by `resolve_default_values` (as given by
+        `defaulted_properties`) that a template with the given required properties (as returned by
+        `GRParser.get_required_properties`) may need, if there are any, and returns them (by id)."""
+        used_defaults = dict()
+        # (tags without an id may refer to any id, and individual pronoun data is referred to by all tags):
+        properties_of_any_id = required_properties.get(None, frozenset())
+        if "" in defaulted_properties:
+            properties_of_any_id = properties_of_any_id.union(*required_properties.values())
+        for id, properties in defaulted_properties.items():
+            properties = properties & (required_properties.get(id, frozenset()) | properties_of_any_id)
+            if properties:
+                used_defaults[id] = properties
+        if used_defaults:
+            warnings.WarningManager.raise_warning(
+                lambda: "Rendering a template requires the default value of the "
+                + ", ".join("\"" + p + "\"-property of individuum \"" + id + "\"" for id in sorted(used_defaults)
+                            for p in sorted(used_defaults[id]))
+                + ", but this value is undefined, so its default had to be used.", warnings.DefaultValueUsedWarning)
+        return used_defaults
+
     @staticmethod
     def value_is_allowed(canonical_property_name: str, value: str) -> bool:
         """Returns whether the given canonical property name allows the given value (in the individual pronoun data;
         this is not about the templates)"""
-        if canonical_property_name in ContextValues.properties_that_allow_only_some_values_in_pd:
-            if value not in ContextValues.properties_that_allow_only_some_values_in_pd[canonical_property_name]:
-                return False
-        return True
+        allowed_values = ContextValues.classify(canonical_property_name).allowed_values
+        return allowed_values is None or value in allowed_values
 
     @staticmethod
     def initialize():
@@ -102,6 +167,44 @@ class ContextValues:
         for property_list in ContextValues.properties:
             for p in property_list:
                 ContextValues.properties_to_canonical_property[p] = property_list[0]
+        ContextValues.canonical_properties_that_directly_map_between_template_and_pronoun_data_set = frozenset(
+            ContextValues.canonical_properties_that_directly_map_between_template_and_pronoun_data)
+        for p, canonical in ContextValues.properties_to_canonical_property.items():
+            allowed_values = ContextValues.properties_that_allow_only_some_values_in_pd.get(canonical)
+            ContextValues.property_descriptors[p] = PropertyDescriptor(
+                canonical=canonical,
+                is_custom=False,
+                uses_special_custom_value_syntax=False,
+                is_custom_property_defined_in_a_tag=False,
+                maps_directly_between_template_and_pronoun_data=(
+                    p in ContextValues.canonical_properties_that_directly_map_between_template_and_pronoun_data_set),
+                allowed_values=frozenset(allowed_values) if allowed_values is not None else None
+            )
+        ContextValues.classify_custom_property.cache_clear()
+
+    @staticmethod
+    def classify(property_name: str) -> PropertyDescriptor:
+        """Returns the `PropertyDescriptor` of the given (not necessarily canonical) property name.
+        Descriptors of properties that are not custom properties are precomputed, while those of custom properties are
+        computed on demand and cached."""
+        if property_name in ContextValues.property_descriptors:
+            return ContextValues.property_descriptors[property_name]
+        return ContextValues.classify_custom_property(property_name)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=MAX_CACHED_CUSTOM_PROPERTIES)
+    def classify_custom_property(property_name: str) -> PropertyDescriptor:
+        """Returns the `PropertyDescriptor` of a custom property. The results of this are cached for the
+        `MAX_CACHED_CUSTOM_PROPERTIES` most recently used custom properties."""
+        is_defined_in_a_tag = ContextValues.is_a_custom_property_defined_in_a_tag(property_name)
+        return PropertyDescriptor(
+            canonical=ContextValues.get_canonical_of_custom_property(property_name),
+            is_custom=True,
+            uses_special_custom_value_syntax=is_defined_in_a_tag or property_name.startswith("_"),
+            is_custom_property_defined_in_a_tag=is_defined_in_a_tag,
+            maps_directly_between_template_and_pronoun_data=is_defined_in_a_tag,
+            allowed_values=None
+        )
 
     @staticmethod
     def property_maps_directly_between_template_and_pronoun_data(property_name: str) -> bool:
@@ -109,22 +212,19 @@ class ContextValues:
         directly without any additional calculations whatsoever."""
         if type(property_name) is not str:
             return False
-        return (
-                property_name in ContextValues.canonical_properties_that_directly_map_between_template_and_pronoun_data
-                or (property_name.startswith("<") and property_name.endswith(">"))
-        )
+        return ContextValues.classify(property_name).maps_directly_between_template_and_pronoun_data
 
     @staticmethod
     def is_a_custom_value(property_name: str) -> bool:
         """Returns whether the (not necessarily canonical) property is a custom property.
         This function is made for pronoun data analysis, not tag analysis."""
-        return property_name not in ContextValues.properties_to_canonical_property
+        return ContextValues.classify(property_name).is_custom
 
     @staticmethod
     def uses_special_custom_value_syntax(property_name: str) -> bool:
         """Returns whether the property uses the special syntax for making custom properties in individual pronoun data
         to be distinguishable from standard attributes."""
-        return property_name.startswith("<") and property_name.endswith(">") or property_name.startswith("_")
+        return ContextValues.classify(property_name).uses_special_custom_value_syntax
 
     @staticmethod
     def is_a_custom_property_defined_in_a_tag(property_name: str) -> bool:
@@ -148,16 +248,10 @@ class ContextValues:
         If is_from_tag is True, the method assumes that the value is from a context section (unknown names are nouns).
         Otherwise, it assumes unknown names are custom attributes.
         The canonical version of custom attributes is the "<property_name>"-syntax."""
-        if property_name in ContextValues.properties_to_canonical_property:
-            return ContextValues.properties_to_canonical_property[property_name]
-        else:
-            if is_from_tag:
-                if ContextValues.is_a_custom_property_defined_in_a_tag(property_name):
-                    return ContextValues.get_canonical_of_custom_property(property_name)
-                else:
-                    return gender_nouns.GenderedNoun(property_name)
-            else:
-                return ContextValues.get_canonical_of_custom_property(property_name)
+        descriptor = ContextValues.classify(property_name)
+        if is_from_tag and descriptor.is_custom and not descriptor.is_custom_property_defined_in_a_tag:
+            return gender_nouns.GenderedNoun(property_name)
+        return descriptor.canonical
 
 # initialize all derived data generated in this submodule:
 
@@ -0,0 +1,136 @@
+"""
+Opt-in timing instrumentation for the stages of the template parsing pipeline (`GRParser.full_parsing_pipeline`) and
+the rendering pipeline (`GRenderer.render_with_full_rendering_pipeline`).
+
+A hook is any callable that accepts a `StageTiming`; once it is registered with `InstrumentationManager.add_hook` (or
+temporarily, with `InstrumentationManager.hooked`), it is called after every stage of both pipelines, in the thread that
+ran the stage. As long as no hook is registered, the pipelines run exactly as they would without instrumentation.
+Note that `Template` looks templates up in `parse_cache.template_cache`, so the parsing stages are only reported when a
+template is not cached yet, unless it is created with `use_cache=False`.
+`StageHistogram` is a hook that aggregates the durations of all stages into histograms, and `percentile` is shared by
+everything else in gender*render that reports latencies.
+
+This is not part of the specification.
+"""
+
+import bisect
+import contextlib
+import threading
+import time
+import typing
+from collections import namedtuple
+
+# what hooks are told about a stage:
+
+
+StageTiming = namedtuple("StageTiming", ["pipeline", "stage", "duration", "template_size", "tag_count"])
+"""Describes one run of one stage: the pipeline it belongs to ("parse" or "render"), the name of the stage (which is the
+name of the `GRParser`/`GRenderer` method that implements it), its duration in seconds, the size of the template given
+to the pipeline (its number of characters when parsing, and its number of sections, text and tags alike, when
+rendering) and the number of tags in the template after the stage."""
+
+Hook = typing.Callable[[StageTiming], typing.Any]
+
+# statistics:
+
+
+def percentile(sorted_values: typing.List[float], p: float) -> float:
+    """Returns the p-th percentile (nearest rank) of the given sorted, non-empty list of values."""
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))]
+
+# InstrumentationManager:
+
+
+class InstrumentationManager:
+    """A bundle of functions to register hooks and to report stage timings to them."""
+    hooks: typing.Tuple[Hook, ...] = tuple()
+    """All registered hooks. This is replaced rather than modified when hooks are (un-)registered, so that pipelines
+    running in other threads can iterate over it safely."""
+
+    lock = threading.Lock()
+
+    @staticmethod
+    def add_hook(hook: Hook):
+        """Registers the given hook for all threads."""
+        with InstrumentationManager.lock:
+            InstrumentationManager.hooks = InstrumentationManager.hooks + (hook,)
+
+    @staticmethod
+    def remove_hook(hook: Hook):
+        """Unregisters the given hook, raising a ValueError if it is not registered."""
+        with InstrumentationManager.lock:
+            hooks = list(InstrumentationManager.hooks)
+            hooks.remove(hook)
+            InstrumentationManager.hooks = tuple(hooks)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def hooked(hook: Hook):
+        """A context manager that registers the given hook for the duration of the `with`-block."""
+        InstrumentationManager.add_hook(hook)
+        try:
+            yield hook
+        finally:
+            InstrumentationManager.remove_hook(hook)
+
+    @staticmethod
+    def run_stage(pipeline: str, template_size: int, tag_count: typing.Optional[int], stage: typing.Callable, *args):
+        """Runs `stage` with the given arguments, reports its duration to all registered hooks, and returns its result.
+        If `tag_count` is None, the number of tags is taken from the parsed template the stage returned."""
+        start = time.perf_counter()
+        result = stage(*args)
+        duration = time.perf_counter() - start
+
+        if tag_count is None:
+            tag_count = len(result) // 2
+        timing = StageTiming(pipeline, stage.__name__, duration, template_size, tag_count)
+        for hook in InstrumentationManager.hooks:
+            hook(timing)
+        return result
+
+# aggregating stage timings:
+
+
+class StageHistogram:
+    """A hook that aggregates the durations of every stage (of every pipeline) into a histogram.
+    It can be used from several threads at once."""
+
+    default_bucket_bounds = tuple(10 ** (e / 2) for e in range(-14, 1))
+    """The default upper bounds (in seconds) of all but the last bucket: half-decades from 100 nanoseconds to 1 second.
+    The last bucket contains all durations greater than the last bound."""
+
+    def __init__(self, bucket_bounds: typing.Sequence[float] = default_bucket_bounds):
+        """Returns an empty histogram with the given (ascending) bucket bounds."""
+        self.bucket_bounds = tuple(bucket_bounds)
+        self.histograms: typing.Dict[typing.Tuple[str, str], dict] = dict()
+        self.lock = threading.Lock()
+
+    def __call__(self, timing: StageTiming):
+        """Adds the given stage timing to the histogram of its stage."""
+        bucket = bisect.bisect_left(self.bucket_bounds, timing.duration)
+        with self.lock:
+            key = (timing.pipeline, timing.stage)
+            if key not in self.histograms:
+                self.histograms[key] = {"count": 0, "total": 0.0, "max": 0.0, "tags": 0,
+                                        "buckets": [0] * (len(self.bucket_bounds) + 1)}
+            histogram = self.histograms[key]
+            histogram["count"] += 1
+            histogram["total"] += timing.duration
+            histogram["max"] = max(histogram["max"], timing.duration)
+            histogram["tags"] += timing.tag_count
+            histogram["buckets"][bucket] += 1
+
+    def get_histogram(self, pipeline: str, stage: str) -> dict:
+        """Returns a copy of the histogram of the given stage: its number of runs ("count"), their total and maximum
+        duration ("total", "max"), the total number of tags they processed ("tags") and the number of runs in every
+        bucket ("buckets")."""
+        with self.lock:
+            histogram = dict(self.histograms[(pipeline, stage)])
+            histogram["buckets"] = list(histogram["buckets"])
+            return histogram
+
+    def summary(self) -> typing.Dict[str, dict]:
+        """Returns copies of all histograms, keyed by "<pipeline>/<stage>"."""
+        with self.lock:
+            keys = list(self.histograms.keys())
+        return {pipeline + "/" + stage: self.get_histogram(pipeline, stage) for pipeline, stage in keys}
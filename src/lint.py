@@ -0,0 +1,184 @@
+"""
+Linting of gender*render templates, which reports all syntax errors and post-processing errors of a template (or of a
+whole directory of templates) at once, along with the warnings raised while parsing it, instead of stopping at the first
+error like `GRParser.full_parsing_pipeline` does.
+
+Every tag is parsed on its own: after a syntax error, the linter resumes with the next tag, which starts at the next
+unescaped "{" (so tags that are not closed before the next tag opens are reported, too). Lines and columns (both
+starting at 1) are looked up with a `parse_templates.LineIndex` that is computed once per template. Messages are
+printed like compiler messages:
+
+    templates/welcome.gr:3:17: SyntaxPostprocessingError: Section type "foo" does not exist.
+
+Run `gender-render-lint --help` for the usage of the `gender-render-lint` command.
+
+This is not part of the specification.
+"""
+
+import argparse
+import concurrent.futures
+import os
+import re
+import sys
+import typing
+from collections import namedtuple
+
+from . import errors
+from . import warnings
+from .parse_templates import GRParser, LineIndex
+from .template_bundle import find_template_files
+
+# lint messages:
+
+LintMessage = namedtuple("LintMessage", ["file", "line", "column", "error", "message"])
+"""A problem found in a template: the file it was found in, its line and column, the name of the type of the error or
+warning (e.g. "SyntaxError" or "NotAPersonNounWarning") and its message."""
+
+
+def format_message(message: LintMessage) -> str:
+    """Returns the given lint message as it is printed by the `gender-render-lint` command."""
+    return (message.file + ":" + str(message.line) + ":" + str(message.column) + ": " + message.error + ": "
+            + message.message)
+
+
+def is_error(message: LintMessage) -> bool:
+    """Returns whether the given lint message describes an error (rather than a warning)."""
+    return not message.error.endswith("Warning")
+
+# linting templates:
+
+BRACES_AND_ESCAPED_CHARS = re.compile(r"\\[\s\S]|[{}]")
+"""Matches every unescaped brace and every escaped character, so that escaped braces are skipped."""
+
+POSTPROCESSING_STAGES = (
+    GRParser.assign_types_to_all_sections,
+    GRParser.split_tags_with_multiple_context_values,
+    GRParser.make_sure_that_sections_dont_exceed_allowed_amount_of_values,
+    GRParser.convert_tags_to_indexable_dicts,
+    GRParser.set_capitalization_value_for_all_tags,
+    GRParser.convert_context_values_to_canonicals
+)
+"""The stages of `GRParser.full_parsing_pipeline` that follow `GRParser.parse_gr_template_from_str`."""
+
+
+def lint_tag(tag: str) -> typing.List[typing.Tuple[int, str, str]]:
+    """Parses the given tag (or, generally, part of a template) on its own, and returns the errors and warnings that
+    occur as tuples of the index (in the tag) they occur at, the name of their type and their message (which includes
+    the details of syntax errors). Post-processing errors and warnings are reported at the start of the tag."""
+    problems = list()
+    with warnings.WarningManager.collecting() as collector:
+        parsed_template, error_message, error_index, error_details = GRParser.try_to_parse_gr_template_from_str(tag)
+        if error_message is not None:
+            problems.append((error_index, "SyntaxError", error_message if error_details is None
+                             else error_message[:-1] + " (" + error_details + ")."))
+        else:
+            try:
+                for stage in POSTPROCESSING_STAGES:
+                    parsed_template = stage(parsed_template)
+            except errors.SyntaxError as e:
+                problems.append((0, type(e).__name__, e.msg))
+    for warning in collector.get_warnings():
+        problems.append((0, warning["warning"], warning["message"]))
+    return problems
+
+
+def lint_template(template: str, file_name: str = "unknown file",
+                  warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS)\
+        -> typing.List[LintMessage]:
+    """Returns all errors in the given template, as well as the warnings raised while parsing it (as far as the warning
+    settings enable them), in the order in which they occur in the template."""
+    warnings.WarningManager.set_warning_settings(warning_settings)
+    line_index = LineIndex(template)
+    messages = list()
+
+    def lint_part(start: int, end: int):
+        for index, error, message in lint_tag(template[start:end]):
+            line, column = line_index.get_position(start + index)
+            messages.append(LintMessage(file_name, line, column, error, message))
+
+    tag_start = None
+    for match in BRACES_AND_ESCAPED_CHARS.finditer(template):
+        if match.group() == "{":
+            if tag_start is not None:
+                # the previous tag was not closed, so it ends where the next one starts:
+                lint_part(tag_start, match.start())
+            tag_start = match.start()
+        elif match.group() == "}":
+            # (a "}" outside of a tag is linted on its own, which reports it):
+            lint_part(match.start() if tag_start is None else tag_start, match.end())
+            tag_start = None
+    if tag_start is not None:
+        lint_part(tag_start, len(template))
+    elif (len(template) - len(template.rstrip("\\"))) % 2:
+        # the template ends with an unescaped escape character outside of a tag:
+        lint_part(len(template) - 1, len(template))
+    return messages
+
+
+def lint_file(file_path: str, warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS)\
+        -> typing.List[LintMessage]:
+    """Returns the lint messages of the template in the given file (see `lint_template`).
+    This is what the worker processes of `lint_directory` execute."""
+    with open(file_path, "r") as f_template:
+        return lint_template(f_template.read(), file_path, warning_settings)
+
+
+def lint_directory(directory: str, processes: typing.Optional[int] = None,
+                   warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS)\
+        -> typing.List[LintMessage]:
+    """Returns the lint messages of all `.gr`-files in the given directory and its subdirectories, sorted by file.
+    Files are linted by a pool of `processes` worker processes (defaulting to one per CPU); with `processes=1`, they
+    are linted in the current process."""
+    paths = [path for name, path in find_template_files(directory)]
+    if processes == 1:
+        messages_by_file = [lint_file(path, warning_settings) for path in paths]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+            messages_by_file = list(executor.map(lint_file, paths, [warning_settings] * len(paths),
+                                                 chunksize=max(1, len(paths) // (4 * (processes or os.cpu_count()
+                                                                                      or 1)))))
+    return [message for messages in messages_by_file for message in messages]
+
+# the command:
+
+
+def make_argument_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser of the `gender-render-lint` command."""
+    parser = argparse.ArgumentParser(
+        prog="gender-render-lint",
+        description="Reports all errors (and warnings) in gender*render templates.")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="a .gr-file, or a directory whose .gr-files (including those in subdirectories) are "
+                             + "linted")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="the number of worker processes to lint directories with (default: one per CPU)")
+    parser.add_argument("--no-warnings", action="store_true", help="only report errors, not warnings")
+    return parser
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Runs the `gender-render-lint` command with the given arguments (defaulting to `sys.argv`) and returns its exit
+    code: 0 if no errors were found, 1 if any were found, and 2 for invalid arguments."""
+    args = make_argument_parser().parse_args(argv)
+    warning_settings = warnings.DISABLE_ALL_WARNINGS if args.no_warnings else warnings.ENABLE_DEFAULT_WARNINGS
+    if args.jobs is not None and args.jobs < 1:
+        print("gender-render-lint: error: --jobs must be positive.", file=sys.stderr)
+        return 2
+
+    messages = list()
+    for path in args.paths:
+        try:
+            if os.path.isdir(path):
+                messages += lint_directory(path, args.jobs, warning_settings)
+            else:
+                messages += lint_file(path, warning_settings)
+        except OSError as e:
+            print("gender-render-lint: error: " + type(e).__name__ + ": " + str(e), file=sys.stderr)
+            return 2
+    for message in messages:
+        print(format_message(message))
+    return 1 if any(is_error(message) for message in messages) else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
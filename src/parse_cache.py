@@ -0,0 +1,169 @@
+"""
+A process-wide, size-bounded cache of parsed templates, so that templates which are parsed over and over (e.g. by
+calling `render_template` with the same template string many times) only go through
+`GRParser.full_parsing_pipeline` once.
+
+Entries are addressed by a hash of the template text and `parse_templates.PARSER_VERSION`, so entries of different
+versions of the parser never mix. `Template` and `render_template` use `template_cache`, which can be disabled globally
+by setting `template_cache.enabled` to False, or for a single template by passing `use_cache=False`.
+Only templates that were parsed successfully are cached. Templates are parsed for the cache with all warnings enabled,
+and the warnings raised while parsing them are stored with them, so that every lookup raises them again as far as the
+warning settings of the caller enable them, just like parsing the template would. Logging (see `warnings.GRLogging`)
+is only raised when a template is actually parsed.
+
+This is not part of the specification.
+"""
+
+import hashlib
+import sys
+import threading
+import typing
+from collections import OrderedDict, namedtuple
+
+from . import parse_templates
+from . import warnings
+
+# what is cached:
+
+
+CachedTemplate = namedtuple("CachedTemplate", ["compact_template", "used_ids", "contains_unspecified_ids",
+                                               "required_properties", "parse_warnings"], defaults=(tuple(),))
+"""The data `Template` needs from a parsed template: its compact form, the ids it uses, whether it contains tags with
+unspecified ids and the properties it requires from pronoun data (see `GRParser.get_required_properties`), as well as
+the type and text of every warning raised while parsing it, in the order they were raised. Compact templates are tuples,
+since they are shared by everyone who gets them from the cache (which must not modify the dict of required properties
+either)."""
+
+
+def get_key(template: str) -> bytes:
+    """Returns the key under which the given template is cached."""
+    return hashlib.sha256((str(parse_templates.PARSER_VERSION) + "\n" + template).encode("utf-8")).digest()
+
+
+def to_cached_template(parsed_template: parse_templates.ParsedTemplateRefined) -> CachedTemplate:
+    """Returns the data `Template` needs from the given fully parsed template."""
+    return CachedTemplate(tuple(parse_templates.GRParser.to_compact_template(parsed_template)),
+                          parse_templates.GRParser.get_all_specified_id_values(parsed_template),
+                          parse_templates.GRParser.template_contains_unspecified_ids(parsed_template),
+                          parse_templates.GRParser.get_required_properties(parsed_template))
+
+
+def parse(template: str) -> CachedTemplate:
+    """Parses the given template without consulting any cache."""
+    return to_cached_template(parse_templates.GRParser.full_parsing_pipeline(template))
+
+
+def parse_for_cache(template: str) -> CachedTemplate:
+    """Parses the given template with all warnings enabled, and returns it along with the warnings raised while parsing
+    it. These are collected rather than raised, and then raised as far as they are enabled for the current thread (even
+    if parsing fails). Logging is only raised and never stored, since it is about the parsing itself."""
+    thread_id = threading.get_ident()
+    warning_settings = warnings.WarningManager.warning_settings_by_thread_id.get(thread_id,
+                                                                                 warnings.ENABLE_DEFAULT_WARNINGS)
+    warnings.WarningManager.set_warning_settings(warnings.ENABLE_ALL_WARNINGS | warning_settings)
+    collector = warnings.WarningCollector()
+    try:
+        with warnings.WarningManager.collecting(collector):
+            cached_template = parse(template)
+    finally:
+        warnings.WarningManager.set_warning_settings(warning_settings)
+        raised_warnings = tuple(key for key, count in collector.counts.items() for _ in range(count))
+        raise_parse_warnings(raised_warnings)
+    return cached_template._replace(parse_warnings=tuple(
+        (warning_type, text) for warning_type, text in raised_warnings if issubclass(warning_type, warnings.GRWarning)))
+
+
+def raise_parse_warnings(parse_warnings: typing.Tuple[typing.Tuple[warnings.WarningType, str], ...]):
+    """Raises the given warnings (as stored in `CachedTemplate.parse_warnings`) as far as they are enabled for the
+    current thread."""
+    for warning_type, text in parse_warnings:
+        warnings.WarningManager.raise_warning(text, warning_type)
+
+
+def estimate_size(cached_template: CachedTemplate) -> int:
+    """Returns an estimate of the memory used by the given cached template, in bytes. Interned strings and gendered
+    nouns are shared between templates, so they are not counted."""
+    compact_template = cached_template.compact_template
+    size = (sys.getsizeof(compact_template) + sys.getsizeof(cached_template.used_ids)
+            + sys.getsizeof(cached_template.required_properties)
+            + sum(sys.getsizeof(properties) for properties in cached_template.required_properties.values())
+            + sys.getsizeof(cached_template.parse_warnings)
+            + sum(sys.getsizeof(text) for _, text in cached_template.parse_warnings))
+    for section in compact_template:
+        size += sys.getsizeof(section)
+    return size
+
+# the cache:
+
+
+class ParseCache:
+    """A thread-safe least-recently-used cache of parsed templates that holds at most `max_entries` templates and at
+    most (approximately) `max_bytes` bytes of them."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entries: int = 4096):
+        """Returns an empty cache with the given bounds."""
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = True
+        self.entries: typing.Dict[bytes, typing.Tuple[CachedTemplate, int]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, template: str) -> CachedTemplate:
+        """Returns the given template in parsed form, parsing it (and adding it to the cache) only if it is not cached
+        already. Either way, the warnings raised while parsing the template are raised as far as they are enabled for
+        the current thread. If the cache is disabled, the template is always parsed and never added."""
+        if not self.enabled:
+            return parse(template)
+
+        key = get_key(template)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                cached_template = self.entries[key][0]
+            else:
+                cached_template = None
+                self.misses += 1
+        if cached_template is not None:
+            raise_parse_warnings(cached_template.parse_warnings)
+            return cached_template
+
+        # templates are parsed outside of the lock, so that other threads are not blocked by it:
+        cached_template = parse_for_cache(template)
+        size = estimate_size(cached_template)
+        if size <= self.max_bytes and self.max_entries > 0:
+            with self.lock:
+                if key not in self.entries:
+                    self.entries[key] = (cached_template, size)
+                    self.size += size
+                    self.evict()
+        return cached_template
+
+    def evict(self):
+        """Removes the least recently used entries until the cache is within its bounds. The lock must be held."""
+        while self.entries and (self.size > self.max_bytes or len(self.entries) > self.max_entries):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Removes all entries from the cache and resets its statistics."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Returns the number of cache hits, misses and evictions so far, as well as the current number of entries and
+        their estimated size in bytes."""
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.entries), "bytes": self.size}
+
+
+template_cache = ParseCache()
+"""The cache used by `Template` and `render_template`."""
@@ -3,7 +3,7 @@ Contains functions for gender*render pronoun data.
 """
 
 import json
-from typing import Union
+from typing import Union, List
 
 from . import errors
 from . import warnings
@@ -89,38 +89,102 @@ class GRPDParser:
         for id in pd:
             new_idpd = dict()
             for gr_property, value in pd[id].items():
-                canonical_context_value = ContextValues.get_canonical(gr_property, is_from_tag=False)
-
-                # raise an error if two properties for the same attribute exist:
-                if canonical_context_value in new_idpd:
-                    raise errors.DoubledInformationError("The individual pronoun data for id \"" + id + "\" defines "
-                                                         + "multiple values for the \"" + canonical_context_value
-                                                         + "\" attribute, using different properties. Only one is "
-                                                         + "allowed!")
-
-                # raises an error if an attribute with a limited set of valid values is used and the value is invalid:
-                if not ContextValues.value_is_allowed(canonical_context_value, value):
-                    raise errors.InvalidInformationError("The individual pronoun data for id \"" + id + "\" defines "
-                                                         + "\"" + value + "\" as the value for \""
-                                                         + canonical_context_value + "\" even though this attribute "
-                                                         + "does not allow this value.")
-
-                # raises a warning if a custom attribute does not use the special syntax for custom properties:
-                if (ContextValues.is_a_custom_value(gr_property)
-                        and not ContextValues.uses_special_custom_value_syntax(gr_property)):
-                    warnings.WarningManager.raise_warning("The individual pronoun data for individual \"" + id + "\" "
-                                                          + "contains a custom property, but said property does not use"
-                                                          + " special custom property syntax.",
-                                                          warnings.UnknownPropertyWarning)
-                new_idpd[canonical_context_value] = value
+                if GRPDParser.add_canonical_property(id, gr_property, value, new_idpd):
+                    GRPDParser.warn_about_unknown_property(id)
             result[id] = new_idpd
         return result
 
+    @staticmethod
+    def add_canonical_property(id: str, gr_property: str, value: str, new_idpd: IDPD) -> bool:
+        """Adds `value` to `new_idpd` (the canonical version of the individual pronoun data of `id`) using the canonical
+        of `gr_property` as its key.
+        Raises a DoubledInformationError if `new_idpd` already contains a value for the same attribute.
+        Raises a InvalidInformationError if the property may not have the given value.
+        Returns whether an UnknownPropertyWarning needs to be raised for the property, but does not raise it."""
+        canonical_context_value = ContextValues.get_canonical(gr_property, is_from_tag=False)
+
+        # raise an error if two properties for the same attribute exist:
+        if canonical_context_value in new_idpd:
+            raise errors.DoubledInformationError("The individual pronoun data for id \"" + id + "\" defines "
+                                                 + "multiple values for the \"" + canonical_context_value
+                                                 + "\" attribute, using different properties. Only one is "
+                                                 + "allowed!")
+
+        # raises an error if an attribute with a limited set of valid values is used and the value is invalid:
+        if not ContextValues.value_is_allowed(canonical_context_value, value):
+            raise errors.InvalidInformationError("The individual pronoun data for id \"" + id + "\" defines "
+                                                 + "\"" + value + "\" as the value for \""
+                                                 + canonical_context_value + "\" even though this attribute "
+                                                 + "does not allow this value.")
+
+        new_idpd[canonical_context_value] = value
+        return (ContextValues.is_a_custom_value(gr_property)
+                and not ContextValues.uses_special_custom_value_syntax(gr_property))
+
+    @staticmethod
+    def warn_about_unknown_property(id: str) -> None:
+        """Raises a warning that a custom attribute in the individual pronoun data of `id` does not use the special
+        syntax for custom properties."""
+        warnings.WarningManager.raise_warning(lambda: "The individual pronoun data for individual \"" + id + "\" "
+                                              + "contains a custom property, but said property does not use"
+                                              + " special custom property syntax.",
+                                              warnings.UnknownPropertyWarning)
+
+    @staticmethod
+    def validate_and_canonicalize(pd: dict) -> GRPD:
+        """Does the work of `return_pd_if_it_is_valid`, `pd_dict_to_grpd_dict` and `grpd_dict_to_canonical_grpd_dict`
+        in a single traversal of the given dict, and returns the resulting grpd.
+        This is only done for valid pronoun data; as soon as the dict turns out to be invalid, these three methods are
+        called in a row instead, so errors and warnings are always exactly the ones they raise."""
+        result = dict()
+        pd_is_idpd = None
+        ids_with_unknown_properties: List[str] = list()
+        new_idpd = dict()
+        try:
+            if type(pd) is not dict:
+                raise errors.InvalidPDError("The given JSON object is not a valid piece of pronoun data.")
+            for key, value in pd.items():
+                # the type of the first value decides on whether we treat the data as idpd or grpd:
+                if pd_is_idpd is None:
+                    pd_is_idpd = type(value) is str
+
+                if pd_is_idpd:
+                    # key is a property of the only individual, and value the value assigned to it:
+                    if type(value) is not str:
+                        raise errors.InvalidPDError("The given JSON object is not a valid piece of pronoun data.")
+                    if GRPDParser.add_canonical_property("", key, value, new_idpd):
+                        ids_with_unknown_properties.append("")
+
+                else:
+                    # key is an id, and value its individual pronoun data:
+                    if type(value) is not dict or key == "":
+                        raise errors.InvalidPDError("The given JSON object is not a valid piece of pronoun data.")
+                    new_idpd = dict()
+                    for gr_property, property_value in value.items():
+                        if type(property_value) is not str:
+                            raise errors.InvalidPDError("The given JSON object is not a valid piece of pronoun data.")
+                        if GRPDParser.add_canonical_property(key, gr_property, property_value, new_idpd):
+                            ids_with_unknown_properties.append(key)
+                    result[key] = new_idpd
+        except errors.InvalidPDError:
+            # let the single steps of the pipeline find and raise the error (and the warnings that precede it):
+            pd = GRPDParser.return_pd_if_it_is_valid(pd)
+            pd = GRPDParser.pd_dict_to_grpd_dict(pd)
+            return GRPDParser.grpd_dict_to_canonical_grpd_dict(pd)
+
+        if pd_is_idpd:
+            result[""] = new_idpd
+
+        # raise the warnings we held back, now that we know the pronoun data is valid:
+        for id in ids_with_unknown_properties:
+            GRPDParser.warn_about_unknown_property(id)
+
+        return result
+
     @staticmethod
     def full_parsing_pipeline(pd: dict) -> GRPD:
         """Parses a dict into a valid piece of grpd following the pipeline defined by GRPDParser, and raises an error if
-        this turns out to be impossible."""
-        pd = GRPDParser.return_pd_if_it_is_valid(pd)
-        pd = GRPDParser.pd_dict_to_grpd_dict(pd)
-        pd = GRPDParser.grpd_dict_to_canonical_grpd_dict(pd)
-        return pd
+        this turns out to be impossible.
+        The steps of the pipeline are done in one go by `validate_and_canonicalize`."""
+        return GRPDParser.validate_and_canonicalize(pd)
+
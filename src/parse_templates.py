@@ -2,14 +2,22 @@
 Parser functions for gender*render templates.
 """
 
+import bisect
 import copy
-from typing import Tuple, Callable, List, Dict, Union, FrozenSet
+import functools
+import sys
+from typing import Tuple, Callable, List, Dict, Union, FrozenSet, Sequence, Optional
 
 from . import errors
 from . import handle_context_values
 from . import gender_nouns
 from . import warnings
 from . import global_capitalization_system
+from . import instrumentation
+
+PARSER_VERSION = 1
+"""The version of the output of `GRParser.full_parsing_pipeline`; it must be increased whenever the parser changes the
+way it parses any template, since parsed templates are cached under it (see `parse_cache`)."""
 
 # Some helpful type hints:
 
@@ -23,6 +31,45 @@ ParsedTemplateRefined = List[Union[str, Dict[str, Union[str, List[str], gender_n
 """A type similar to GRParser.ParsedTemplate that makes the sections of tags easier accessible by making them
 dicts instead of lists of tuples."""
 
+# a compact representation of parsed templates:
+
+
+class Tag:
+    """A compact representation of a tag of a fully parsed template, with the same values as its dict representation in
+    `ParsedTemplateRefined`; `id` is None if the tag has no id value. Strings are interned, since most templates use
+    the same few ids, context values and capitalization values over and over. Tags are immutable."""
+
+    __slots__ = ("id", "context", "capitalization")
+
+    def __init__(self, id: Union[str, None], context: Union[str, gender_nouns.GenderedNoun], capitalization: str):
+        """Returns a tag with the given values."""
+        object.__setattr__(self, "id", None if id is None else sys.intern(id))
+        object.__setattr__(self, "context", sys.intern(context) if type(context) is str else context)
+        object.__setattr__(self, "capitalization", sys.intern(capitalization))
+
+    def __setattr__(self, name, value):
+        """Prevents tags from being modified."""
+        raise AttributeError("Tag objects are immutable.")
+
+    def __reduce__(self):
+        """Allows tags to be pickled and copied despite being immutable."""
+        return Tag, (self.id, self.context, self.capitalization)
+
+    def __eq__(self, other) -> bool:
+        """Checks whether two tags have the same values."""
+        return (type(other) is Tag and self.id == other.id and self.context == other.context
+                and self.capitalization == other.capitalization)
+
+    def __repr__(self) -> str:
+        """Returns a representation of the tag for debugging."""
+        return "Tag(" + repr(self.id) + ", " + repr(self.context) + ", " + repr(self.capitalization) + ")"
+
+
+CompactParsedTemplate = Sequence[Union[str, Tag]]
+"""A type similar to `ParsedTemplateRefined` that represents tags as `Tag` objects instead of dicts, which is the form
+`Template` keeps parsed templates in. Use `GRParser.to_compact_template` and `GRParser.from_compact_template` to
+convert between both."""
+
 # definitions of words and word groups accepted by the finite state machine:
 
 
@@ -377,6 +424,33 @@ class SectionTypes:
         return result
 
 
+# finding the line and column of a position in a template:
+
+
+class LineIndex:
+    """Maps indices of characters in a template to their line and column numbers (both starting at 1), using the
+    indices at which the lines of the template start, which are computed once."""
+
+    def __init__(self, template: str):
+        """Returns the line index of the given template."""
+        self.template = template
+        self.line_starts = [0]
+        index = template.find("\n")
+        while index != -1:
+            self.line_starts.append(index + 1)
+            index = template.find("\n", index + 1)
+
+    def get_position(self, index: int) -> Tuple[int, int]:
+        """Returns the line and column number of the character at the given index (or of the end of the template, if
+        the index equals its length)."""
+        line_no = bisect.bisect_right(self.line_starts, index)
+        return line_no, index - self.line_starts[line_no - 1] + 1
+
+    def get_line(self, line_no: int) -> str:
+        """Returns the line with the given number, without its line break."""
+        end = self.line_starts[line_no] - 1 if line_no < len(self.line_starts) else len(self.template)
+        return self.template[self.line_starts[line_no - 1]:end]
+
 # translate the content of gender*render templates into basic parsed lists:
 
 
@@ -403,23 +477,32 @@ class GRParser:
 
         Special characters are all unescaped in the parsed version of the template."""
 
+        result, error_message, error_index, error_details = GRParser.try_to_parse_gr_template_from_str(template)
+        if error_message is not None:
+            # (the position of the error is only looked up once there is one):
+            line_index = LineIndex(template)
+            line_no, char_no = line_index.get_position(error_index)
+            error = errors.SyntaxError(error_message, ("unknown file", line_no, char_no, line_index.get_line(line_no)))
+            error.details = error_details
+            raise error
+        return result
+
+    @staticmethod
+    def try_to_parse_gr_template_from_str(template: str) -> Tuple[ParsedTemplate, Optional[str], int, Optional[str]]:
+        """Works like `parse_gr_template_from_str`, but instead of raising an `errors.SyntaxError`, it returns the
+        template as far as it could be parsed, along with the message of the error, the index of the character at
+        which it occurred and the details of the error (see `errors.SyntaxError.details`); if there is no error, the
+        message and the details are None."""
+
         result = [""]
         s = States.not_within_tags
-        line_no = 1
-        char_no = 1
         # iterate over all characters:
         for i in range(len(template)):
             c = template[i]
-            # increment char count for SyntaxError raising:
-            if c == "\n":
-                line_no += 1
-                char_no = 1
-            else:
-                char_no += 1
 
             # log:
             warnings.WarningManager.raise_warning(
-                "result: " + str(result) + "\n\n"
+                lambda: "result: " + str(result) + "\n\n"
                 + "c: \"" + c + "\"\n"
                 + "s: " + s + "\n"
                 + "char type: " + Chars.type(c),
@@ -438,21 +521,17 @@ class GRParser:
                     try:
                         s, processing_function = StateTransitioner.transition_state(s, c)
                         result = processing_function(result, c)
-                    except errors.SyntaxError:
-                        raise errors.SyntaxError(
-                            "The given gender*render template has invalid syntax.",
-                            ("unknown file", line_no, char_no, template.split("\n")[line_no - 1])
-                        )
+                    except errors.SyntaxError as e:
+                        return result, "The given gender*render template has invalid syntax.", i, str(e)
 
-        # raise an error if the template ends unproperly:
+        # the template must not end unproperly:
         if States.is_escaped(s):
-            raise errors.SyntaxError("The template ends with an unescaped escape character, please escape it.",
-                                     ("unknown file", line_no, char_no, template.split("\n")[-1]))
+            return (result, "The template ends with an unescaped escape character, please escape it.", len(template),
+                    None)
         elif s != States.not_within_tags:
-            raise errors.SyntaxError("A tag opens, but is not finished properly.",
-                                     ("unknown file", line_no, char_no, template.split("\n")[-1]))
+            return result, "A tag opens, but is not finished properly.", len(template), None
 
-        return result
+        return result, None, len(template), None
 
     @staticmethod
     def assign_types_to_all_sections(parsed_template: ParsedTemplate) -> ParsedTemplate:
@@ -551,7 +630,20 @@ class GRParser:
 
     @staticmethod
     def full_parsing_pipeline(template: str) -> ParsedTemplateRefined:
-        """Walks template through the full parsing pipeline defined by `GRParser`, and returns the result."""
+        """Walks template through the full parsing pipeline defined by `GRParser`, and returns the result.
+        Every stage is timed and reported to the hooks of `instrumentation.InstrumentationManager` if there are any."""
+        if instrumentation.InstrumentationManager.hooks:
+            run_stage = functools.partial(instrumentation.InstrumentationManager.run_stage, "parse", len(template),
+                                          None)
+            template = run_stage(GRParser.parse_gr_template_from_str, template)
+            template = run_stage(GRParser.assign_types_to_all_sections, template)
+            template = run_stage(GRParser.split_tags_with_multiple_context_values, template)
+            template = run_stage(GRParser.make_sure_that_sections_dont_exceed_allowed_amount_of_values, template)
+            template = run_stage(GRParser.convert_tags_to_indexable_dicts, template)
+            template = run_stage(GRParser.set_capitalization_value_for_all_tags, template)
+            template = run_stage(GRParser.convert_context_values_to_canonicals, template)
+            return template
+
         template = GRParser.parse_gr_template_from_str(template)
         template = GRParser.assign_types_to_all_sections(template)
         template = GRParser.split_tags_with_multiple_context_values(template)
@@ -561,6 +653,44 @@ class GRParser:
         template = GRParser.convert_context_values_to_canonicals(template)
         return template
 
+    @staticmethod
+    def to_compact_template(parsed_template: ParsedTemplateRefined) -> CompactParsedTemplate:
+        """Returns the given fully parsed template with every tag converted to a `Tag`."""
+        result = list(parsed_template)
+        for i in range(1, len(result), 2):
+            tag = result[i]
+            result[i] = Tag(tag.get("id"), tag["context"], tag["capitalization"])
+        return result
+
+    @staticmethod
+    def from_compact_template(compact_template: CompactParsedTemplate) -> ParsedTemplateRefined:
+        """Returns the given compact template with every tag converted back to its dict representation."""
+        result = list(compact_template)
+        for i in range(1, len(result), 2):
+            tag = result[i]
+            result[i] = {"context": tag.context, "capitalization": tag.capitalization}
+            if tag.id is not None:
+                result[i]["id"] = tag.id
+        return result
+
+    @staticmethod
+    def get_required_properties(parsed_template: ParsedTemplateRefined) -> Dict[Optional[str], FrozenSet[str]]:
+        """Returns the canonical properties that individual pronoun data may need to render the tags of the parsed
+        template, for every id value (using None for tags without an id): the context values of all tags that map
+        directly to pronoun data, "gender-nouns" for gendered nouns, and "gender-addressing" for the "address" context
+        value."""
+        result = dict()
+        for i in range(1, len(parsed_template), 2):
+            context_value = parsed_template[i]["context"]
+            properties = result.setdefault(parsed_template[i].get("id"), set())
+            if type(context_value) is gender_nouns.GenderedNoun:
+                properties.add("gender-nouns")
+            else:
+                properties.add(context_value)
+                if context_value == "address":
+                    properties.add("gender-addressing")
+        return {id: frozenset(properties) for id, properties in result.items()}
+
     @staticmethod
     def get_all_specified_id_values(parsed_template: ParsedTemplateRefined) -> FrozenSet[str]:
         """Returns a frozen set of all id values explicitly specified by tags in the parsed template."""
@@ -2,17 +2,35 @@
 The interface to gender*render pronoun data representations presented to the user.
 """
 
-from typing import Union
+import types
+from typing import Union, Mapping
 
 from . import warnings
 from .parse_pronoun_data import IDPD, GRPD, GRPDParser
+from .handle_context_values import ContextValues
 
 
+# read-only views of pronoun data:
+
+
+def make_read_only(grpd: GRPD) -> Mapping[str, Mapping[str, str]]:
+    """Returns a read-only view of the given grpd (and of every piece of individual pronoun data in it)."""
+    return types.MappingProxyType({id: types.MappingProxyType(idpd) for id, idpd in grpd.items()})
+
 # a class representation for pronoun data, as defined by the spec:
 
 
 class PronounData:
-    """A representation for pronoun data as defined by the specification."""
+    """A representation for pronoun data as defined by the specification.
+    Pronoun data is immutable once it is constructed, so it can be shared between threads: `get_pd` returns a copy of
+    the pronoun data, and `get_resolved_pd` a read-only view that is shared by everyone who uses the pronoun data.
+
+    Default values of properties are resolved once, when the pronoun data is constructed (see
+    `ContextValues.resolve_default_values`); `defaulted_properties` maps every id to the properties whose default
+    values were used for it, which is what `Template.render` raises `DefaultValueUsedWarning`s about."""
+
+    __slots__ = ("grpd", "resolved_grpd", "defaulted_properties")
+
     def __init__(self, pronoun_data: Union[str, GRPD, IDPD, "PronounData"], takes_file_path=False,
                  warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
 
@@ -26,7 +44,8 @@ class PronounData:
             pd = pronoun_data
         # take pronoun data from PronounData object, string or dict:
         if type(pd) is PronounData:
-            self.grpd = pd.get_pd()
+            for name in PronounData.__slots__:
+                object.__setattr__(self, name, getattr(pd, name))
         else:
             if type(pd) is str:
                 pd_as_dict = GRPDParser.pd_string_to_dict(pd)
@@ -39,13 +58,36 @@ class PronounData:
                 content_format = "grpd" if GRPDParser.type_of_pd(pd_as_dict) is GRPD else "idpd"
                 if file_format != content_format:
                     warnings.WarningManager.raise_warning(
-                        "The file format ." + file_format + " contains " + content_format + " data. "
+                        lambda: "The file format ." + file_format + " contains " + content_format + " data. "
                         + "This kind of data should e contained in ." + content_format + " files instead.",
                         warnings.UnexpectedFileFormatWarning
                     )
 
-            self.grpd = GRPDParser.full_parsing_pipeline(pd_as_dict)
+            object.__setattr__(self, "grpd", GRPDParser.full_parsing_pipeline(pd_as_dict))
+            resolved_grpd, defaulted_properties = ContextValues.resolve_default_values(self.grpd)
+            object.__setattr__(self, "resolved_grpd", make_read_only(resolved_grpd))
+            object.__setattr__(self, "defaulted_properties", defaulted_properties)
+
+    def __setattr__(self, name, value):
+        """Prevents pronoun data from being modified."""
+        raise AttributeError("PronounData objects are immutable.")
+
+    def __getstate__(self):
+        """Returns the data of the pronoun data, so that it can be pickled and copied despite being immutable."""
+        return (self.grpd, {id: dict(idpd) for id, idpd in self.resolved_grpd.items()}, self.defaulted_properties)
+
+    def __setstate__(self, state):
+        """Restores pronoun data from the data returned by `__getstate__`."""
+        grpd, resolved_grpd, defaulted_properties = state
+        object.__setattr__(self, "grpd", grpd)
+        object.__setattr__(self, "resolved_grpd", make_read_only(resolved_grpd))
+        object.__setattr__(self, "defaulted_properties", defaulted_properties)
+
+    def get_pd(self) -> GRPD:
+        """Returns a copy of the PronounData representations actual pronoun data structure."""
+        return {id: dict(idpd) for id, idpd in self.grpd.items()}
 
-    def get_pd(self):
-        """Returns the PronounData representations actual pronoun data structure."""
-        return self.grpd
+    def get_resolved_pd(self) -> Mapping[str, Mapping[str, str]]:
+        """Returns a read-only view of the pronoun data structure with all default values filled in, as it is used for
+        rendering."""
+        return self.resolved_grpd
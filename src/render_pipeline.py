@@ -4,7 +4,7 @@ This is the submodule where pronoun data and templates finally come together.
 """
 
 import typing
-import copy
+import functools
 
 from . import parse_pronoun_data
 from . import parse_templates
@@ -13,30 +13,67 @@ from . import errors
 from . import gender_nouns
 from .handle_context_values import ContextValues
 from . import global_capitalization_system
+from . import instrumentation
 
 
 class GRenderer:
     """Bundles methods that are part of the rendering pipeline."""
     @staticmethod
-    def id_resolution(
+    def copy_template_and_grpd(parsed_template: parse_templates.ParsedTemplateRefined, grpd: parse_pronoun_data.GRPD)\
+            -> (parse_templates.ParsedTemplateRefined, parse_pronoun_data.GRPD):
+        """Returns copies of the given parsed template and grpd that can be modified without modifying the originals.
+        Only the dicts are copied; the strings and gendered nouns in them are immutable, so they are shared."""
+        new_template = list(parsed_template)
+        for i in range(1, len(new_template), 2):
+            new_template[i] = dict(new_template[i])
+        return new_template, {id_value: dict(idpd) for id_value, idpd in grpd.items()}
+
+    @staticmethod
+    def resolve_ids(
             # regarding the given template:
-            parsed_template: parse_templates.ParsedTemplateRefined,
             ids_used_in_template: typing.FrozenSet[str],
             template_contains_unspecified_ids: bool,
 
             # regarding the given pronoun data:
-            grpd: parse_pronoun_data.GRPD) -> (parse_templates.ParsedTemplateRefined, parse_pronoun_data.GRPD):
-        """Takes a parsed template (as returned by the GRParser-pipeline), a set of all ids used in the template, a
-        boolean indicating whether the template contains tags with unspecified ids, and the pronoun data to render it.
-        Performs the id resolution steps described by the specification, with the corresponding errors, and returns
-        the modified template and grpd.
-        No modifications are performed in-place."""
+            grpd: parse_pronoun_data.GRPD) -> typing.Optional[str]:
+        """Takes a set of all ids used in a template, a boolean indicating whether the template contains tags with
+        unspecified ids, and the pronoun data to render it.
+        Performs the checks of the id resolution steps described by the specification, with the corresponding errors and
+        warnings, and returns the id that tags without an id are assigned (or None if no tag is assigned an id).
+        If the pronoun data is individual pronoun data, it is to be used under the id that tags without an id are
+        assigned, or under the only id used in the template if there is no such id (see `give_idpd_its_id`)."""
+        id_for_tags_without_id, error_message = GRenderer.try_to_resolve_ids(
+            ids_used_in_template, template_contains_unspecified_ids, grpd)
+        if error_message is not None:
+            raise errors.IdResolutionError(error_message)
+        return id_for_tags_without_id
 
-        ids_matched_without_modification = False
+    @staticmethod
+    def give_idpd_its_id(ids_used_in_template: typing.FrozenSet[str], id_for_tags_without_id: typing.Optional[str],
+                         grpd: parse_pronoun_data.GRPD) -> parse_pronoun_data.GRPD:
+        """Returns the given pronoun data, with individual pronoun data placed under the id it is used under after id
+        resolution (as returned by `resolve_ids`) without copying it."""
+        if "" in grpd:
+            id_of_idpd = id_for_tags_without_id
+            if id_of_idpd is None:
+                id_of_idpd, = ids_used_in_template
+            return {id_of_idpd: grpd[""]}
+        return grpd
+
+    @staticmethod
+    def try_to_resolve_ids(
+            # regarding the given template:
+            ids_used_in_template: typing.FrozenSet[str],
+            template_contains_unspecified_ids: bool,
+
+            # regarding the given pronoun data:
+            grpd: parse_pronoun_data.GRPD) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+        """Works exactly like `resolve_ids`, but instead of raising an `IdResolutionError`, it returns None along with
+        the message of the error; otherwise, it returns the id that tags without an id are assigned along with None.
+        This is what batch rendering uses, so that failing records do not cost an exception."""
 
-        # create deep copies of input values to later modify them:
-        new_template = copy.deepcopy(parsed_template)
-        new_grpd = copy.deepcopy(grpd)
+        ids_matched_without_modification = False
+        id_for_tags_without_id = None
 
         # only individual pronoun data is given:
         grpd_is_actually_idpd = "" in grpd
@@ -44,40 +81,36 @@ class GRenderer:
 
             # no ids are used in the template:
             if len(ids_used_in_template) == 0:
-                new_grpd = {"usr": new_grpd[""]}
-                for i in range(1, len(new_template), 2):
-                    new_template[i]["id"] = "usr"
+                id_for_tags_without_id = "usr"
 
             # all tags have the same id:
             elif len(ids_used_in_template) == 1 and not template_contains_unspecified_ids:
-                single_id_in_template, = ids_used_in_template
-                new_grpd = {single_id_in_template: new_grpd[""]}
+                pass
 
             # there is more than one id used in the template:
             else:
-                raise errors.IdResolutionError("The given template contains more than one id, but the given pronoun "
-                                               + "data is individual pronoun data, meaning it has no specified id.")
+                return None, ("The given template contains more than one id, but the given pronoun "
+                              + "data is individual pronoun data, meaning it has no specified id.")
 
         # the grpd contains only one id:
         elif len(grpd) == 1:
 
             # no ids are used in the template:
             if len(ids_used_in_template) == 0:
-                for i in range(1, len(new_template), 2):
-                    new_template[i]["id"] = list(grpd.keys())[0]
+                id_for_tags_without_id = list(grpd.keys())[0]
 
             # all tags have the same id:
             elif len(ids_used_in_template) == 1 and not template_contains_unspecified_ids:
                 if list(ids_used_in_template)[0] != list(grpd.keys())[0]:
-                    raise errors.IdResolutionError("The pronoun contains only pronouns for one id, and the template "
-                                                   + "also contains only one id, but they both differ.")
+                    return None, ("The pronoun contains only pronouns for one id, and the template "
+                                  + "also contains only one id, but they both differ.")
                 else:
                     ids_matched_without_modification = True
 
             # there is more than one id used in the template:
             else:
-                raise errors.IdResolutionError("The given template contains exactly one id, but the given pronoun "
-                                               + "contains multiple different ids.")
+                return None, ("The given template contains exactly one id, but the given pronoun "
+                              + "contains multiple different ids.")
 
         # the grpd contains more than one id:
         else:
@@ -85,34 +118,65 @@ class GRenderer:
             # all tags have ids assigned:
             if not template_contains_unspecified_ids:
                 if not frozenset(grpd.keys()).issuperset(ids_used_in_template):
-                    raise errors.IdResolutionError("All tags have ids assigned (more than one id, in summa) and the "
-                                                   + "pronoun data contains several ids as well, but they do not "
-                                                   + "match.")
+                    return None, ("All tags have ids assigned (more than one id, in summa) and the "
+                                  + "pronoun data contains several ids as well, but they do not "
+                                  + "match.")
                 else:
                     ids_matched_without_modification = True
 
             # not all tags have ids assigned:
             else:
                 if len(grpd) != len(ids_used_in_template) + 1:
-                    raise errors.IdResolutionError("Some tags don't have ids, and the amount of different ids used in "
-                                                   + "the template does not equal the amount of ids in the pronoun "
-                                                   + "data, minus one.")
+                    return None, ("Some tags don't have ids, and the amount of different ids used in "
+                                  + "the template does not equal the amount of ids in the pronoun "
+                                  + "data, minus one.")
                 else:
                     # there is one id more in the pronoun data than there is in the template:
                     if frozenset(grpd.keys()).issuperset(ids_used_in_template):
-                        missing_id_value = list(frozenset(grpd.keys()) - ids_used_in_template)[0]
-                        for i in range(1, len(new_template), 2):
-                            if "id" not in new_template[i]:
-                                new_template[i]["id"] = missing_id_value
+                        id_for_tags_without_id = list(frozenset(grpd.keys()) - ids_used_in_template)[0]
                     else:
-                        raise errors.IdResolutionError("The template contains tags without an id value and the "
-                                                       + "pronoun data contains one more id than the template, but "
-                                                       + "the ids of template and pronoun data do not match.")
+                        return None, ("The template contains tags without an id value and the "
+                                      + "pronoun data contains one more id than the template, but "
+                                      + "the ids of template and pronoun data do not match.")
 
         # raise a warning if template or pronoun data had to be modified:
         if not ids_matched_without_modification:
             warnings.WarningManager.raise_warning(None, warnings.IdMatchingNecessaryWarning)
 
+        return id_for_tags_without_id, None
+
+    @staticmethod
+    def id_resolution(
+            # regarding the given template:
+            parsed_template: parse_templates.ParsedTemplateRefined,
+            ids_used_in_template: typing.FrozenSet[str],
+            template_contains_unspecified_ids: bool,
+
+            # regarding the given pronoun data:
+            grpd: parse_pronoun_data.GRPD) -> (parse_templates.ParsedTemplateRefined, parse_pronoun_data.GRPD):
+        """Takes a parsed template (as returned by the GRParser-pipeline), a set of all ids used in the template, a
+        boolean indicating whether the template contains tags with unspecified ids, and the pronoun data to render it.
+        Performs the id resolution steps described by the specification, with the corresponding errors, and returns
+        the modified template and grpd.
+        No modifications are performed in-place."""
+
+        id_for_tags_without_id = GRenderer.resolve_ids(ids_used_in_template, template_contains_unspecified_ids, grpd)
+
+        # create copies of input values to later modify them:
+        new_template, new_grpd = GRenderer.copy_template_and_grpd(parsed_template, grpd)
+
+        # assign ids to all tags without one:
+        if id_for_tags_without_id is not None:
+            for i in range(1, len(new_template), 2):
+                if "id" not in new_template[i]:
+                    new_template[i]["id"] = id_for_tags_without_id
+
+        # give individual pronoun data the id it is used under:
+        if "" in grpd:
+            if id_for_tags_without_id is None:
+                id_for_tags_without_id, = ids_used_in_template
+            new_grpd = {id_for_tags_without_id: new_grpd[""]}
+
         return new_template, new_grpd
 
     @staticmethod
@@ -123,16 +187,24 @@ class GRenderer:
         and returns a modified copy of the template in which the implications of the gender-addressing property are
         already applied and the grpd."""
 
-        new_template = copy.deepcopy(parsed_template)
-        new_grpd = copy.deepcopy(grpd)
+        new_template, new_grpd = GRenderer.copy_template_and_grpd(parsed_template, grpd)
         for i in range(1, len(new_template), 2):
-            id_value = new_template[i]["id"]
-            if new_template[i]["context"] == "address":
-                if ContextValues.get_value(grpd, id_value, "gender-addressing") in ("f", "false"):
-                    new_template[i]["context"] = "personal-name"
+            new_template[i]["context"] = GRenderer.resolve_addressing_of_context_value(
+                new_template[i]["context"], grpd, new_template[i]["id"])
 
         return new_template, new_grpd
 
+    @staticmethod
+    def resolve_addressing_of_context_value(context_value: typing.Union[str, gender_nouns.GenderedNoun],
+                                            grpd: parse_pronoun_data.GRPD, id_value: str)\
+            -> typing.Union[str, gender_nouns.GenderedNoun]:
+        """Returns the context value a tag with the given (canonical) context value and id has once the implications of
+        the gender-addressing property are applied."""
+        if context_value == "address":
+            if ContextValues.get_value(grpd, id_value, "gender-addressing") in ("f", "false"):
+                return "personal-name"
+        return context_value
+
     @staticmethod
     def actually_render_context_values(parsed_template: parse_templates.ParsedTemplateRefined,
                                        grpd: parse_pronoun_data.GRPD) -> (parse_templates.ParsedTemplateRefined,
@@ -140,50 +212,128 @@ class GRenderer:
         """Accepts a parsed template with a piece of gender\\*render pronoun data, both with matching id values and
         already resolved addressing, and renders all context values, storing their values in the slot originally
         intended for them."""
-        new_template = copy.deepcopy(parsed_template)
-        new_grpd = copy.deepcopy(grpd)
+        new_template, new_grpd = GRenderer.copy_template_and_grpd(parsed_template, grpd)
 
         for i in range(1, len(new_template), 2):
-            id_value = new_template[i]["id"]
-            context_value = new_template[i]["context"]
-
-            if ContextValues.property_maps_directly_between_template_and_pronoun_data(context_value):
-                # render tag by looking it up in the individual pronoun data of the individual:
-                new_template[i]["context"] = ContextValues.get_value(grpd, id_value, context_value)
-
-            else:  # type(context_value) is gender_nouns.GenderedNoun:
-                # render tag by correctly gendering the noun it represents.
-                gender = ContextValues.get_value(grpd, id_value, "gender-nouns")
-                new_template[i]["context"] = context_value.render_noun(gender)
+            new_template[i]["context"] = GRenderer.render_context_value(
+                new_template[i]["context"], grpd, new_template[i]["id"])
 
         return new_template, new_grpd
 
+    @staticmethod
+    def render_context_value(context_value: typing.Union[str, gender_nouns.GenderedNoun],
+                             grpd: parse_pronoun_data.GRPD, id_value: str) -> str:
+        """Returns the value a tag with the given (canonical) context value, whose addressing is already resolved, is
+        rendered to for the individual with the given id, minus proper capitalization."""
+        if ContextValues.property_maps_directly_between_template_and_pronoun_data(context_value):
+            # render tag by looking it up in the individual pronoun data of the individual:
+            return ContextValues.get_value(grpd, id_value, context_value)
+
+        else:  # type(context_value) is gender_nouns.GenderedNoun:
+            # render tag by correctly gendering the noun it represents.
+            gender = ContextValues.get_value(grpd, id_value, "gender-nouns")
+            return context_value.render_noun(gender)
+
     @staticmethod
     def apply_capitalization(parsed_template: parse_templates.ParsedTemplateRefined,
                              grpd: parse_pronoun_data.GRPD) -> (parse_templates.ParsedTemplateRefined,
                                                                 parse_pronoun_data.GRPD):
         """Capitalizes every tag's context value in accordance to its capitalization value."""
-        new_template = copy.deepcopy(parsed_template)  # Test this!
-        new_grpd = copy.deepcopy(grpd)
+        new_template, new_grpd = GRenderer.copy_template_and_grpd(parsed_template, grpd)
         for i in range(1, len(new_template), 2):
             new_template[i]["context"] = global_capitalization_system.apply_capitalization_to_tag(new_template[i])
         return new_template, new_grpd
 
     @staticmethod
     def convert_to_string(parsed_template: parse_templates.ParsedTemplateRefined,
-                          grpd: parse_pronoun_data.GRPD) -> str:
+                          grpd: parse_pronoun_data.GRPD, return_parts=False) -> typing.Union[str, typing.List[str]]:
         """Accepts a parsed template with a piece of gender*render pronoun data, both with matching id values,
-        and returns the rendered template as a string.
+        and returns the rendered template as a string, or, if return_parts is True, as the list of strings it consists
+        of (e.g. for `writelines`).
         This should be the last step in the rendering pipeline."""
-        result = ""
+        # the text sections are already in place; only the tags need to be replaced by their values:
+        parts = list(parsed_template)
+        parts[1::2] = [tag["context"] for tag in parsed_template[1::2]]
 
-        for i in range(len(parsed_template)):
-            if not i % 2:  # <- is a string
-                result += parsed_template[i]
-            else:  # <- is a tag
-                result += parsed_template[i]["context"]
+        return parts if return_parts else "".join(parts)
 
-        return result
+    @staticmethod
+    def render_compact_template(
+            # regarding the given template:
+            compact_template: parse_templates.CompactParsedTemplate,
+            ids_used_in_template: typing.FrozenSet[str],
+            template_contains_unspecified_ids: bool,
+
+            # regarding the given pronoun data:
+            grpd: parse_pronoun_data.GRPD) -> str:
+        """Renders a compact template just like `render_with_full_rendering_pipeline` renders the corresponding parsed
+        template, but applies all steps of the rendering pipeline to one tag after another, without copying the
+        template or the pronoun data."""
+
+        id_for_tags_without_id = GRenderer.resolve_ids(ids_used_in_template, template_contains_unspecified_ids, grpd)
+        return GRenderer.render_compact_template_with_resolved_ids(
+            compact_template, id_for_tags_without_id,
+            GRenderer.give_idpd_its_id(ids_used_in_template, id_for_tags_without_id, grpd)
+        )
+
+    @staticmethod
+    def render_compact_template_with_resolved_ids(compact_template: parse_templates.CompactParsedTemplate,
+                                                  id_for_tags_without_id: typing.Optional[str],
+                                                  grpd: parse_pronoun_data.GRPD) -> str:
+        """Renders a compact template like `render_compact_template`, but with ids that are already resolved: tags
+        without an id are assigned `id_for_tags_without_id`, and the pronoun data must already contain individual
+        pronoun data under the id it is used under (see `give_idpd_its_id`)."""
+        result = list(compact_template)
+        for i in range(1, len(result), 2):
+            tag = compact_template[i]
+            id_value = tag.id if tag.id is not None else id_for_tags_without_id
+            context_value = GRenderer.resolve_addressing_of_context_value(tag.context, grpd, id_value)
+            result[i] = global_capitalization_system.apply_capitalization(
+                GRenderer.render_context_value(context_value, grpd, id_value), tag.capitalization)
+        return "".join(result)
+
+    @staticmethod
+    def try_to_render_compact_template_with_resolved_ids(compact_template: parse_templates.CompactParsedTemplate,
+                                                         id_for_tags_without_id: typing.Optional[str],
+                                                         grpd: parse_pronoun_data.GRPD) -> typing.Optional[str]:
+        """Works like `render_compact_template_with_resolved_ids`, but returns None instead of raising a
+        `MissingInformationError` if a property is missing (use `get_missing_properties` to find out which ones are),
+        and requires pronoun data with resolved default values (see `PronounData.get_resolved_pd`)."""
+        result = list(compact_template)
+        for i in range(1, len(result), 2):
+            tag = compact_template[i]
+            id_value = tag.id if tag.id is not None else id_for_tags_without_id
+            context_value = GRenderer.resolve_addressing_of_context_value(tag.context, grpd, id_value)
+            if type(context_value) is gender_nouns.GenderedNoun:
+                value = context_value.render_noun(grpd[id_value]["gender-nouns"])
+            else:
+                value = grpd[id_value].get(context_value)
+                if value is None:
+                    return None
+            result[i] = global_capitalization_system.apply_capitalization(value, tag.capitalization)
+        return "".join(result)
+
+    @staticmethod
+    def get_missing_properties(required_properties: typing.Dict[typing.Optional[str], typing.FrozenSet[str]],
+                               id_for_tags_without_id: typing.Optional[str],
+                               grpd: parse_pronoun_data.GRPD) -> typing.Dict[str, typing.FrozenSet[str]]:
+        """Takes the properties a template requires (as returned by `GRParser.get_required_properties`) and pronoun data
+        with resolved ids (like `render_compact_template_with_resolved_ids` does) and default values, and returns the
+        properties rendering the template would find missing, for every id (as it would be named in the
+        `MissingInformationError`), without rendering anything."""
+        missing_properties = dict()
+        for id_value, properties in required_properties.items():
+            if id_value is None:
+                id_value = id_for_tags_without_id
+            idpd = grpd[id_value]
+            missing = properties.difference(idpd)
+            # (addressing may require the personal name instead of the address):
+            if "address" in properties \
+                    and GRenderer.resolve_addressing_of_context_value("address", grpd, id_value) != "address":
+                missing = (missing - {"address"}) | ({"personal-name"} - idpd.keys())
+            if missing:
+                missing_properties[id_value] = missing_properties.get(id_value, frozenset()) | missing
+        return missing_properties
 
     @staticmethod
     def render_with_full_rendering_pipeline(
@@ -197,7 +347,18 @@ class GRenderer:
         """Takes a parsed template, a set of ids used in the template, a boolean specifying whether there are
         tags without specified ids in the template, and a piece of the grpd, and runs the full set of functions defined
         by GRenderer on it.
-        Returns the rendered template."""
+        Returns the rendered template.
+        Every stage is timed and reported to the hooks of `instrumentation.InstrumentationManager` if there are any."""
+
+        if instrumentation.InstrumentationManager.hooks:
+            run_stage = functools.partial(instrumentation.InstrumentationManager.run_stage, "render",
+                                          len(parsed_template), len(parsed_template) // 2)
+            parsed_template, grpd = run_stage(GRenderer.id_resolution, parsed_template, ids_used_in_template,
+                                              template_contains_unspecified_ids, grpd)
+            parsed_template, grpd = run_stage(GRenderer.resolve_addressing, parsed_template, grpd)
+            parsed_template, grpd = run_stage(GRenderer.actually_render_context_values, parsed_template, grpd)
+            parsed_template, grpd = run_stage(GRenderer.apply_capitalization, parsed_template, grpd)
+            return run_stage(GRenderer.convert_to_string, parsed_template, grpd)
 
         parsed_template, grpd = GRenderer.id_resolution(parsed_template, ids_used_in_template,
                                                         template_contains_unspecified_ids, grpd)
@@ -0,0 +1,363 @@
+"""
+A local rendering daemon, so that several services can share one set of parsed templates instead of each embedding
+the library. It only uses the standard library (asyncio), and speaks a small subset of HTTP/1.1 over TCP or a Unix
+socket. Start it with `gender-render-server <template directory>` (see `--help`), or from Python with `RenderServer`.
+
+The templates of the given directory (or packed `TemplateBundle` file) are loaded once into every worker process,
+where each template is parsed lazily on first use and kept afterwards, and every worker keeps the `BoundRenderer`s of
+the pronoun data it rendered with most recently. Endpoints:
+
+- `POST /render` with a batch of render requests,
+  `{"requests": [{"template": "emails/welcome", "pronoun_data": {...}}, ...]}`, responds with their results in the same
+  order, `{"results": [{"output": "..."}, {"error": "IdResolutionError", "message": "..."}, ...]}`. Templates are named
+  like in `TemplateBundle`, and pronoun data may be given as a dict or as a JSON string. Any error while rendering one
+  request is reported as its result, named after its type, and does not affect the other requests of the batch.
+- `GET /templates` responds with the names of all templates, `{"templates": [...]}`.
+- `GET /metrics` responds with request counts, throughput and latency percentiles of the server.
+
+`RenderClient` is a minimal (synchronous) client for these endpoints.
+
+This is not part of the specification.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import http
+import http.client
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import typing
+
+from . import warnings
+from .bound_renderer import BoundRenderer
+from .template_bundle import TemplateBundle
+from .instrumentation import percentile
+
+# rendering (in worker processes):
+
+worker_bundle: typing.Optional[TemplateBundle] = None
+"""The templates of the current worker; set by `init_worker`."""
+
+worker_get_renderer: typing.Optional[typing.Callable[[str], BoundRenderer]] = None
+"""Returns the (cached) renderer for a piece of pronoun data given as a JSON string; set by `init_worker`."""
+
+worker_warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS
+
+
+def init_worker(bundle_path: str, max_cached_pronoun_data: int, warning_settings: warnings.WarningSettingType):
+    """Prepares the current worker to render with the templates of the given packed template bundle."""
+    global worker_bundle, worker_get_renderer, worker_warning_settings
+    worker_warning_settings = warning_settings
+    worker_bundle = TemplateBundle(bundle_path, warning_settings)
+    worker_get_renderer = functools.lru_cache(maxsize=max_cached_pronoun_data)(
+        functools.partial(BoundRenderer, warning_settings=warning_settings))
+
+
+def render_batch(batch: typing.List[typing.Tuple[str, str]]) -> typing.List[dict]:
+    """Renders every pair of template name and pronoun data (as a JSON string) in the given batch, and returns one
+    result per pair, as described in the documentation of this module."""
+    results = list()
+    for template_name, pronoun_data in batch:
+        if template_name not in worker_bundle:
+            results.append({"error": "UnknownTemplateError",
+                            "message": "There is no template named \"" + template_name + "\"."})
+            continue
+        try:
+            results.append({"output": worker_get_renderer(pronoun_data).render(worker_bundle[template_name],
+                                                                               worker_warning_settings)})
+        except Exception as e:
+            # (besides `errors.InvalidPDError` and `errors.RenderingError`, this includes unexpected errors, which
+            #  should not fail the other requests of the batch either):
+            results.append({"error": type(e).__name__, "message": str(e)})
+    return results
+
+# metrics:
+
+
+class ServerMetrics:
+    """Counts requests and keeps the latencies of the most recent render requests."""
+
+    def __init__(self, max_latencies: int = 10000):
+        """Returns metrics without any requests, which keep the latencies of the last `max_latencies` render
+        requests."""
+        self.started = time.monotonic()
+        self.http_requests = 0
+        self.render_requests = 0
+        self.renders = 0
+        self.errors = 0
+        self.latencies: typing.Deque[float] = collections.deque(maxlen=max_latencies)
+
+    def record_render_request(self, results: typing.List[dict], latency: float):
+        """Records a render request with the given results, which took `latency` seconds to handle."""
+        self.render_requests += 1
+        self.renders += len(results)
+        self.errors += sum(1 for result in results if "error" in result)
+        self.latencies.append(latency)
+
+    def snapshot(self) -> dict:
+        """Returns the current metrics: uptime (in seconds), request counts, renders per second since the start, and
+        latency percentiles (in milliseconds) of the most recent render requests."""
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        return {
+            "uptime": uptime,
+            "http_requests": self.http_requests,
+            "render_requests": self.render_requests,
+            "renders": self.renders,
+            "errors": self.errors,
+            "renders_per_second": self.renders / uptime if uptime else 0.0,
+            "latency_ms": {("p" + str(p) if p < 100 else "max"):
+                           (percentile(latencies, p) * 1e3 if latencies else None) for p in (50, 90, 99, 100)}
+        }
+
+# the server:
+
+
+class RenderServer:
+    """A rendering daemon for the templates of one directory (or packed template bundle)."""
+
+    def __init__(self, templates: str, processes: typing.Optional[int] = None, max_cached_pronoun_data: int = 1024,
+                 chunk_size: int = 64, warning_settings: warnings.WarningSettingType = warnings.DISABLE_ALL_WARNINGS):
+        """Loads the templates from the given directory (which is bundled first) or packed template bundle, and starts
+        `processes` worker processes (defaulting to one per CPU; with `processes=0`, templates are rendered by a single
+        thread of the server process instead). Batches of render requests are split into chunks of `chunk_size`
+        requests, which are rendered by different workers.
+        Warnings are disabled by default, since nobody would see them."""
+
+        self.temporary_directory = None
+        if os.path.isdir(templates):
+            self.temporary_directory = tempfile.mkdtemp()
+            bundle_path = os.path.join(self.temporary_directory, "templates.grb")
+            TemplateBundle.build(templates, bundle_path, processes if processes != 0 else 1, warning_settings)
+        else:
+            bundle_path = templates
+        self.template_names = TemplateBundle(bundle_path, warning_settings).names()
+
+        init_args = (bundle_path, max_cached_pronoun_data, warning_settings)
+        if processes == 0:
+            self.executor = concurrent.futures.ThreadPoolExecutor(1, initializer=init_worker, initargs=init_args)
+        else:
+            self.executor = concurrent.futures.ProcessPoolExecutor(processes, initializer=init_worker,
+                                                                   initargs=init_args)
+        self.chunk_size = chunk_size
+        self.metrics = ServerMetrics()
+        self.server: typing.Optional[asyncio.AbstractServer] = None
+        self.connections: typing.Dict[asyncio.StreamWriter, asyncio.Future] = dict()
+        self.background_loop: typing.Optional[asyncio.AbstractEventLoop] = None
+        self.background_thread: typing.Optional[threading.Thread] = None
+
+    async def render(self, requests: typing.List[typing.Tuple[str, str]]) -> typing.List[dict]:
+        """Renders the given pairs of template name and pronoun data (as a JSON string) in the worker pool, and returns
+        their results in the same order."""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        chunks = [requests[i:i + self.chunk_size] for i in range(0, len(requests), self.chunk_size)]
+        results = [result for chunk_results in await asyncio.gather(
+            *(loop.run_in_executor(self.executor, render_batch, chunk) for chunk in chunks)
+        ) for result in chunk_results]
+        self.metrics.record_render_request(results, time.perf_counter() - start)
+        return results
+
+    async def handle_request(self, method: str, path: str, body: bytes) -> typing.Tuple[int, dict]:
+        """Handles a request to one of the endpoints and returns the status code and body of the response."""
+        self.metrics.http_requests += 1
+        if path == "/render":
+            if method != "POST":
+                return 405, {"error": "MethodNotAllowed", "message": "Use POST to render templates."}
+            try:
+                requests = [(request["template"], request["pronoun_data"] if type(request["pronoun_data"]) is str
+                             else json.dumps(request["pronoun_data"], sort_keys=True))
+                            for request in json.loads(body.decode("utf-8"))["requests"]]
+                if not all(type(template_name) is str for template_name, _ in requests):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": "InvalidRequest", "message": "The body must be a JSON object of the form "
+                             + "{\"requests\": [{\"template\": <name>, \"pronoun_data\": <pronoun data>}, ...]}."}
+            return 200, {"results": await self.render(requests)}
+        elif path in ("/templates", "/metrics"):
+            if method != "GET":
+                return 405, {"error": "MethodNotAllowed", "message": "Use GET to query " + path + "."}
+            return 200, ({"templates": self.template_names} if path == "/templates" else self.metrics.snapshot())
+        return 404, {"error": "NotFound", "message": "There is no endpoint " + path + "."}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves HTTP requests on the given connection until the client closes it or asks to close it."""
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                    body = await reader.readexactly(int(headers.get("content-length", "0")))
+                except ValueError:
+                    method, path, version = None, None, "HTTP/1.0"
+                    status, response = 400, {"error": "InvalidRequest", "message": "Malformed HTTP request."}
+                else:
+                    status, response = await self.handle_request(method, path, body)
+
+                data = json.dumps(response).encode("utf-8")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(("HTTP/1.1 " + str(status) + " " + http.HTTPStatus(status).phrase + "\r\n"
+                              + "Content-Type: application/json\r\n"
+                              + "Content-Length: " + str(len(data)) + "\r\n"
+                              + "Connection: " + ("keep-alive" if keep_alive else "close") + "\r\n\r\n"
+                              ).encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.connections[writer]
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080, unix_path: typing.Optional[str] = None)\
+            -> asyncio.AbstractServer:
+        """Starts listening on the given host and port (or, if given, on a Unix socket at `unix_path`) in the running
+        event loop, and returns the asyncio server."""
+        if unix_path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    def start_in_background(self, host: str = "127.0.0.1", port: int = 0, unix_path: typing.Optional[str] = None)\
+            -> typing.Union[int, str]:
+        """Starts the server in an event loop in a background thread (for tests and for embedding it in other
+        applications), and returns the port it listens on (or `unix_path`). Stop it with `close`."""
+        self.background_loop = asyncio.new_event_loop()
+        server = self.background_loop.run_until_complete(self.start(host, port, unix_path))
+        self.background_thread = threading.Thread(target=self.background_loop.run_forever, daemon=True)
+        self.background_thread.start()
+        return unix_path if unix_path is not None else server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stops listening, closes all open connections and waits until they are closed."""
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self.connections):
+            writer.close()
+        await asyncio.gather(*self.connections.values(), return_exceptions=True)
+
+    def close(self):
+        """Stops the server running in the background (if any) and the workers, and deletes temporary files. A server
+        started with `start` should be stopped with `stop` first."""
+        if self.background_loop is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self.background_loop).result()
+            self.background_loop.call_soon_threadsafe(self.background_loop.stop)
+            self.background_thread.join()
+            self.background_loop.close()
+        self.executor.shutdown()
+        if self.temporary_directory is not None:
+            shutil.rmtree(self.temporary_directory, ignore_errors=True)
+
+# a client:
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix socket."""
+
+    def __init__(self, unix_path: str, timeout: typing.Optional[float] = None):
+        """Returns a connection to the server listening on the Unix socket at `unix_path`."""
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = unix_path
+
+    def connect(self):
+        """Connects to the Unix socket."""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class RenderClient:
+    """A minimal client for `RenderServer`, which keeps one connection to the server open."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080, unix_path: typing.Optional[str] = None,
+                 timeout: typing.Optional[float] = None):
+        """Returns a client of the server listening on the given host and port (or on a Unix socket at `unix_path`)."""
+        if unix_path is not None:
+            self.connection = UnixHTTPConnection(unix_path, timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout)
+
+    def request(self, method: str, path: str, body: typing.Optional[dict] = None) -> typing.Tuple[int, dict]:
+        """Sends a request to the server and returns the status code and the decoded body of its response."""
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        self.connection.request(method, path, data, {"Content-Type": "application/json"} if data else {})
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+
+    def render(self, requests: typing.List[typing.Tuple[str, typing.Union[str, dict]]]) -> typing.List[dict]:
+        """Renders the given pairs of template name and pronoun data, and returns their results (see `RenderServer`).
+        Raises a ValueError if the server rejects the request."""
+        status, response = self.request("POST", "/render", {"requests": [
+            {"template": template_name, "pronoun_data": pronoun_data} for template_name, pronoun_data in requests]})
+        if status != 200:
+            raise ValueError(response["message"])
+        return response["results"]
+
+    def templates(self) -> typing.List[str]:
+        """Returns the names of all templates of the server."""
+        return self.request("GET", "/templates")[1]["templates"]
+
+    def metrics(self) -> dict:
+        """Returns the metrics of the server."""
+        return self.request("GET", "/metrics")[1]
+
+    def close(self):
+        """Closes the connection to the server."""
+        self.connection.close()
+
+# the command:
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Runs the `gender-render-server` command with the given arguments (defaulting to `sys.argv`)."""
+    parser = argparse.ArgumentParser(prog="gender-render-server",
+                                     description="Serves rendered gender*render templates over HTTP.")
+    parser.add_argument("templates", help="a directory of .gr-files, or a packed template bundle")
+    parser.add_argument("--host", default="127.0.0.1", help="the host to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="the port to listen on (default: 8080)")
+    parser.add_argument("--unix", help="listen on a Unix socket at this path instead of a port")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="the number of worker processes (default: one per CPU; 0 renders in the server process)")
+    parser.add_argument("--max-cached-pronoun-data", type=int, default=1024,
+                        help="the number of pieces of pronoun data every worker keeps prepared (default: 1024)")
+    args = parser.parse_args(argv)
+
+    render_server = RenderServer(args.templates, args.processes, args.max_cached_pronoun_data)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(render_server.start(args.host, args.port, args.unix))
+        print("gender-render-server: listening on " + (args.unix or (args.host + ":" + str(args.port))),
+              file=sys.stderr)
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(render_server.stop())
+        loop.close()
+        render_server.close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Bundles of many gender*render templates that are parsed once, ahead of time, and stored in a single packed file.
+
+This is meant for applications that ship a large directory tree of templates, and is not part of the specification.
+"""
+
+import os
+import json
+import concurrent.futures
+import typing
+
+from . import warnings
+from . import gender_nouns
+from . import parse_templates
+from .template_interface import Template
+
+# the format of packed template bundles:
+
+PACKED_FORMAT_VERSION = 1
+"""The version of the packed file format written by `TemplateBundle.build`; packed files of other versions are rejected
+when loading them."""
+
+# A packed file consists of a single line with a json header, which maps the name of every template to the offset and
+#  length (in bytes, relative to the end of the header line) of its entry, followed by the entries of all templates.
+#  Every entry is the json representation of a parsed template, in which gendered nouns are stored as
+#  {"gendered-noun": word}, so that only the templates that are actually used need to be decoded.
+
+
+def encode_parsed_template(parsed_template: parse_templates.ParsedTemplateRefined) -> bytes:
+    """Returns the entry of the given parsed template in a packed file."""
+    encoded_template = list(parsed_template)
+    for i in range(1, len(encoded_template), 2):
+        tag = dict(encoded_template[i])
+        if type(tag["context"]) is gender_nouns.GenderedNoun:
+            tag["context"] = {"gendered-noun": tag["context"].word}
+        encoded_template[i] = tag
+    return json.dumps(encoded_template, separators=(",", ":")).encode("utf-8")
+
+
+def decode_parsed_template(entry: bytes) -> parse_templates.ParsedTemplateRefined:
+    """Returns the parsed template stored in the given entry of a packed file."""
+    parsed_template = json.loads(entry.decode("utf-8"))
+    for i in range(1, len(parsed_template), 2):
+        if type(parsed_template[i]["context"]) is dict:
+            parsed_template[i]["context"] = gender_nouns.GenderedNoun(parsed_template[i]["context"]["gendered-noun"])
+    return parsed_template
+
+
+def parse_template_file(file_path: str, warning_settings: warnings.WarningSettingType) -> bytes:
+    """Parses the template in the given file and returns its entry in a packed file.
+    This is what the worker processes of `TemplateBundle.build` execute."""
+    warnings.WarningManager.set_warning_settings(warning_settings)
+    with open(file_path, "r") as f_template:
+        template = f_template.read()
+    return encode_parsed_template(parse_templates.GRParser.full_parsing_pipeline(template))
+
+
+def find_template_files(directory: str) -> typing.List[typing.Tuple[str, str]]:
+    """Returns the name (see `TemplateBundle`) and path of every `.gr`-file in the given directory and its
+    subdirectories, in a stable order (the files of every directory, sorted by name, come before those of its
+    subdirectories)."""
+    names_and_paths = list()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.endswith(".gr"):
+                path = os.path.join(root, file_name)
+                name = os.path.relpath(path, directory)[:-len(".gr")].replace(os.sep, "/")
+                names_and_paths.append((name, path))
+    return names_and_paths
+
+# Template bundles:
+
+
+class TemplateBundle:
+    """A collection of templates loaded from a packed file created with `TemplateBundle.build`.
+    Templates are looked up by their name, which is their path relative to the bundled directory, using forward slashes
+    and without the `.gr`-extension (e.g. `"emails/welcome"`), and are only turned into `Template` objects the first
+    time they are looked up."""
+
+    def __init__(self, file_path: str,
+                 warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
+        """Loads the template bundle stored in the given packed file. The warning settings are used whenever a template
+        from the bundle is materialized."""
+
+        with open(file_path, "rb") as f_bundle:
+            header = json.loads(f_bundle.readline().decode("utf-8"))
+            self.entries = f_bundle.read()
+        if header.get("format-version") != PACKED_FORMAT_VERSION:
+            raise ValueError("\"" + file_path + "\" is not a packed template bundle of format version "
+                             + str(PACKED_FORMAT_VERSION) + ".")
+
+        self.index: typing.Dict[str, typing.List[int]] = header["templates"]
+        self.templates: typing.Dict[str, Template] = dict()
+        self.warning_settings = warning_settings
+
+    @staticmethod
+    def build(directory: str, file_path: str, processes: typing.Optional[int] = None,
+              warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS) -> "TemplateBundle":
+        """Parses all `.gr`-files in the given directory and its subdirectories, stores them in a packed file at
+        `file_path` and returns the resulting template bundle.
+        Templates are parsed by a pool of `processes` worker processes (defaulting to one per CPU); with `processes=1`,
+        they are parsed in the current process. Errors in any template are raised as they would be by `Template`."""
+
+        names_and_paths = find_template_files(directory)
+        paths = [path for name, path in names_and_paths]
+
+        if processes == 1:
+            entries = [parse_template_file(path, warning_settings) for path in paths]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+                entries = list(executor.map(parse_template_file, paths, [warning_settings] * len(paths),
+                                            chunksize=max(1, len(paths) // (4 * (processes or os.cpu_count() or 1)))))
+
+        index = dict()
+        offset = 0
+        for (name, path), entry in zip(names_and_paths, entries):
+            index[name] = [offset, len(entry)]
+            offset += len(entry)
+        header = {"format-version": PACKED_FORMAT_VERSION, "templates": index}
+        with open(file_path, "wb") as f_bundle:
+            f_bundle.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+            for entry in entries:
+                f_bundle.write(entry)
+
+        return TemplateBundle(file_path, warning_settings)
+
+    def names(self) -> typing.List[str]:
+        """Returns the names of all templates in the bundle."""
+        return list(self.index.keys())
+
+    def __len__(self) -> int:
+        """Returns the number of templates in the bundle."""
+        return len(self.index)
+
+    def __contains__(self, name: str) -> bool:
+        """Checks whether the bundle contains a template with the given name."""
+        return name in self.index
+
+    def __getitem__(self, name: str) -> Template:
+        """Returns the template with the given name, raising a KeyError if there is none."""
+        if name not in self.templates:
+            offset, length = self.index[name]
+            warnings.WarningManager.set_warning_settings(self.warning_settings)
+            self.templates[name] = Template.from_parsed_template(
+                decode_parsed_template(self.entries[offset:offset + length]))
+        return self.templates[name]
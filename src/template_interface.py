@@ -2,37 +2,125 @@
 The interface to gender*render template representations presented to the user.
 """
 
+import typing
+
+from . import errors
 from . import warnings
 from . import parse_templates
 from . import render_pipeline
 from . import pronoun_data_interface
+from . import instrumentation
+from . import parse_cache
+from .handle_context_values import ContextValues
+
+# results of rendering without raising errors:
+
+
+class RenderResult:
+    """The result of rendering a template with one piece of pronoun data without raising errors (see
+    `Template.try_to_render`): either the rendered template (`output`), or the type of the error rendering would have
+    raised (`error`), along with the details needed to describe it. Messages are only formatted by `get_message`."""
+
+    __slots__ = ("output", "error", "details")
+
+    def __init__(self, output: typing.Optional[str] = None, error: typing.Optional[type] = None, details=None):
+        """Returns a result with the given output or the given error type and details: the message of an
+        `IdResolutionError`, the missing properties (by id) of a `MissingInformationError`, or the raised error of an
+        `InvalidPDError`."""
+        self.output = output
+        self.error = error
+        self.details = details
+
+    def succeeded(self) -> bool:
+        """Returns whether rendering succeeded."""
+        return self.error is None
+
+    def get_message(self) -> typing.Optional[str]:
+        """Returns the message of the error rendering would have raised, or None if rendering succeeded."""
+        if self.error is None:
+            return None
+        if self.error is errors.MissingInformationError:
+            return ("The template requires the "
+                    + ", ".join("\"" + p + "\"-attribute of individual \"" + id + "\"" for id in sorted(self.details)
+                                for p in sorted(self.details[id]))
+                    + ", but the pronoun data does not define these attributes.")
+        return str(self.details)
+
+    def raise_error(self):
+        """Raises the error rendering would have raised, if there is one."""
+        if isinstance(self.details, Exception):
+            raise self.details
+        if self.error is not None:
+            raise self.error(self.get_message())
 
 # Template interface:
 
 
 class Template:
-    """Represents a parsed and preprocessed version of a gender*render template."""
+    """Represents a parsed and preprocessed version of a gender*render template.
+
+    Templates are immutable once they are constructed, so a single template can be rendered from several threads at
+    once. Warning settings are stored per thread (see `warnings.WarningManager`), so every thread renders with the
+    warning settings it passed to `render`.
+
+    Every template knows which properties it requires from the pronoun data for every id it uses (`required_properties`,
+    see `GRParser.get_required_properties`), so pronoun data can be checked against it without rendering (`check`)."""
+
+    __slots__ = ("compact_template", "used_ids", "contains_unspecified_ids", "required_properties")
 
     def __init__(self, template, takes_file_path=False,
-                 warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
+                 warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS, use_cache=True):
         """Return a parsed and preprocessed version of a gender*render template. If takes_file_path is set to False,
-        template is interpreted as the template itself; otherwise, it is interpreted as a path to the template."""
+        template is interpreted as the template itself; otherwise, it is interpreted as a path to the template.
+        Unless use_cache is set to False, the template is looked up in (and added to) `parse_cache.template_cache`."""
 
         warnings.WarningManager.set_warning_settings(warning_settings)
 
         if takes_file_path:
             if not template.endswith(".gr"):
-                warnings.WarningManager.raise_warning("\"" + template.split(".")[-1] + "\" is not the right file type "
-                                                      + "for templates; the right file type would be \".gr\".",
-                                                      warnings.UnexpectedFileFormatWarning)
+                warnings.WarningManager.raise_warning(lambda: "\"" + template.split(".")[-1] + "\" is not the right "
+                                                      + "file type for templates; the right file type would be "
+                                                      + "\".gr\".", warnings.UnexpectedFileFormatWarning)
             with open(template, "r") as f_template:
                 template = f_template.read()
 
         # get data from the parsed template:
-        self.parsed_template = parse_templates.GRParser.full_parsing_pipeline(template)
-        self.used_ids = parse_templates.GRParser.get_all_specified_id_values(self.parsed_template)
-        self.contains_unspecified_ids = parse_templates.GRParser.template_contains_unspecified_ids(
-            self.parsed_template)
+        self.initialize(parse_cache.template_cache.get(template) if use_cache else parse_cache.parse(template))
+
+    @staticmethod
+    def from_parsed_template(parsed_template: parse_templates.ParsedTemplateRefined) -> "Template":
+        """Returns a template from an already parsed template (as returned by `GRParser.full_parsing_pipeline`) without
+        parsing it again."""
+
+        template = Template.__new__(Template)
+        template.initialize(parse_cache.to_cached_template(parsed_template))
+        return template
+
+    def initialize(self, cached_template: parse_cache.CachedTemplate):
+        """Stores the data of the parsed template in a template that is being constructed. Raises an AttributeError if
+        the template is already initialized."""
+        if hasattr(self, "compact_template"):
+            raise AttributeError("Template objects are immutable.")
+        for name, value in zip(Template.__slots__, cached_template):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        """Prevents templates from being modified."""
+        raise AttributeError("Template objects are immutable.")
+
+    def __getstate__(self):
+        """Returns the data of the template, so that templates can be pickled and copied despite being immutable."""
+        return tuple(getattr(self, name) for name in Template.__slots__)
+
+    def __setstate__(self, state):
+        """Restores a template from the data returned by `__getstate__`."""
+        self.initialize(parse_cache.CachedTemplate(*state))
+
+    @property
+    def parsed_template(self) -> parse_templates.ParsedTemplateRefined:
+        """The parsed template in the form returned by `GRParser.full_parsing_pipeline`. Templates only keep their
+        compact form (`compact_template`), so this is created anew every time it is accessed."""
+        return parse_templates.GRParser.from_compact_template(self.compact_template)
 
     def render(self, pronoun_data, takes_file_path=False,
                warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
@@ -40,7 +128,98 @@ class Template:
         or a file path to a .grpd/.grpd file if takes_file_path is set to True."""
 
         warnings.WarningManager.set_warning_settings(warning_settings)
-        pronoun_data = pronoun_data_interface.PronounData(pronoun_data, takes_file_path, warning_settings).get_pd()
-        return render_pipeline.GRenderer.render_with_full_rendering_pipeline(
-            self.parsed_template, self.used_ids, self.contains_unspecified_ids, pronoun_data
-        )
+        if type(pronoun_data) is not pronoun_data_interface.PronounData:
+            pronoun_data = pronoun_data_interface.PronounData(pronoun_data, takes_file_path, warning_settings)
+        # (neither the template nor the pronoun data are ever modified, so both can be used without copying them, and
+        #  the pronoun data already contains all default values, so that looking them up needs no special handling):
+        grpd = pronoun_data.get_resolved_pd()
+        if instrumentation.InstrumentationManager.hooks:
+            # render stage by stage, so that every stage can be timed:
+            result = render_pipeline.GRenderer.render_with_full_rendering_pipeline(
+                self.parsed_template, self.used_ids, self.contains_unspecified_ids, grpd
+            )
+        else:
+            result = render_pipeline.GRenderer.render_compact_template(
+                self.compact_template, self.used_ids, self.contains_unspecified_ids, grpd
+            )
+        if pronoun_data.defaulted_properties:
+            ContextValues.warn_about_default_values(pronoun_data.defaulted_properties, self.required_properties)
+        return result
+
+    def try_to_render(self, pronoun_data,
+                      warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS,
+                      check_only=False) -> RenderResult:
+        """Renders the template with the given pronoun data (given in any form `render` accepts, except for file paths)
+        like `render` does, but returns a `RenderResult` instead of raising an error if the pronoun data is invalid or
+        does not fit the template; rendering errors are detected before rendering, without raising any exceptions.
+        If check_only is True, the template is only checked, but not rendered (so the result has no output).
+        Stages are not reported to instrumentation hooks."""
+
+        warnings.WarningManager.set_warning_settings(warning_settings)
+        if type(pronoun_data) is not pronoun_data_interface.PronounData:
+            try:
+                pronoun_data = pronoun_data_interface.PronounData(pronoun_data, False, warning_settings)
+            except errors.InvalidPDError as e:
+                return RenderResult(error=type(e), details=e)
+        grpd = pronoun_data.get_resolved_pd()
+
+        id_for_tags_without_id, error_message = render_pipeline.GRenderer.try_to_resolve_ids(
+            self.used_ids, self.contains_unspecified_ids, grpd)
+        if error_message is not None:
+            return RenderResult(error=errors.IdResolutionError, details=error_message)
+        grpd = render_pipeline.GRenderer.give_idpd_its_id(self.used_ids, id_for_tags_without_id, grpd)
+        result = None
+        if not check_only:
+            result = render_pipeline.GRenderer.try_to_render_compact_template_with_resolved_ids(
+                self.compact_template, id_for_tags_without_id, grpd)
+        if result is None:
+            # (either the template is only checked, or some properties are missing):
+            missing_properties = render_pipeline.GRenderer.get_missing_properties(self.required_properties,
+                                                                                  id_for_tags_without_id, grpd)
+            if missing_properties:
+                return RenderResult(error=errors.MissingInformationError, details=missing_properties)
+            return RenderResult()
+
+        if pronoun_data.defaulted_properties:
+            ContextValues.warn_about_default_values(pronoun_data.defaulted_properties, self.required_properties)
+        return RenderResult(result)
+
+    def render_batch(self, pronoun_data: typing.Iterable,
+                     warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS)\
+            -> typing.Iterator[RenderResult]:
+        """Renders the template with every one of the given pieces of pronoun data with `try_to_render`, and yields one
+        `RenderResult` per piece of pronoun data, in order. Records that cannot be rendered never raise an error, so
+        that they neither slow down the batch nor end it."""
+        for pd in pronoun_data:
+            yield self.try_to_render(pd, warning_settings)
+
+    def check(self, pronoun_data, takes_file_path=False,
+              warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS):
+        """Checks whether the template can be rendered with the given pronoun data (given in any form `render` accepts)
+        without rendering it, and raises the error rendering it would raise otherwise: an `IdResolutionError` if the
+        ids do not match, or a `MissingInformationError` that lists all properties that are missing.
+        This only takes time proportional to the number of properties the template requires (see
+        `required_properties`), plus the time it takes to parse the pronoun data if it is not given as `PronounData`."""
+
+        warnings.WarningManager.set_warning_settings(warning_settings)
+        if type(pronoun_data) is not pronoun_data_interface.PronounData:
+            pronoun_data = pronoun_data_interface.PronounData(pronoun_data, takes_file_path, warning_settings)
+        self.try_to_render(pronoun_data, warning_settings, check_only=True).raise_error()
+
+    def filter_renderable(self, pronoun_data: typing.Iterable,
+                          warning_settings: warnings.WarningSettingType = warnings.ENABLE_DEFAULT_WARNINGS)\
+            -> typing.List:
+        """Returns those of the given pieces of pronoun data (each given in any form `render` accepts, except for file
+        paths) that the template can be rendered with, as determined by `check`. Pronoun data that is invalid is left
+        out as well."""
+        return [pd for pd in pronoun_data
+                if self.try_to_render(pd, warning_settings, check_only=True).succeeded()]
+
+    def get_needed_properties(self) -> typing.FrozenSet[str]:
+        """Returns the canonical properties of individual pronoun data that rendering the template may need, for all ids
+        together, e.g. to fetch only these properties from wherever pronoun data is stored. Since addressing may fall
+        back to the personal name, "personal-name" is included whenever "address" is."""
+        needed_properties = frozenset().union(*self.required_properties.values())
+        if "address" in needed_properties:
+            needed_properties |= {"personal-name"}
+        return needed_properties
@@ -16,12 +16,16 @@ Please note that classes that enable logging rather than actual warnings are not
 gender_render.ENABLE_ALL_WARNINGS set. Every type of warning that would be raised regardless of input at initialization
 time of the module is considered logging rather than warning.
 
+Instead of raising warnings with Python's `warnings` module, warnings can also be collected in a `WarningCollector`,
+using `WarningManager.collecting`; this is faster if many warnings are raised.
+
 When calling a function, method or class that isn't specified as a public interface by the specification (currently only
 render_template, Template and PronounData), the warning behavior is unreliable; you therefore shouldn't do this unless
 you explicitly define your preferred warning settings with `WarningManager.set_warning_settings`.
 """
 
 import warnings as ws
+import contextlib
 import threading
 import typing
 import inspect
@@ -125,7 +129,11 @@ class DefaultValueUsedWarning(GRWarning):
 
 
 class GenderedNounsBuildFromWebWarning(GRWarning):
-    """The data containing the gendered and especially neutral versions of all english hyponyms for "person" could not
+    """Deprecated: this warning is never raised, since the gendered noun data is no longer downloaded when it is missing
+    (see `GenderedNounsMissingWarning`), and it will be removed in a future version. It only still exists so that
+    warning settings that refer to it keep working.
+
+    The data containing the gendered and especially neutral versions of all english hyponyms for "person" could not
     be found; therefore, it will be downloaded and saved from the internet now. This should only happen once per
     installation and only when initializing the module for the first time, and it should not happen at all with the PyPi
     installation."""
@@ -134,6 +142,16 @@ class GenderedNounsBuildFromWebWarning(GRWarning):
     pass
 
 
+class GenderedNounsMissingWarning(GRWarning):
+    """The data containing the gendered and especially neutral versions of all english hyponyms for "person" could not
+    be found, so gendered nouns are rendered as they are written in templates. It can be built from a local copy of
+    its source file with the `gender-render-build-nouns` command (see `gender_render.build_nouns`). This should not
+    happen at all with the PyPi installation."""
+    # This warning is not part of the specification since it is too dependent on this implementation's architecture to
+    #  expect every implementation to need it.
+    pass
+
+
 class BuildingGenderedNounDataLogging(GRLogging):
     """This class enables/disables the logging of information when building the gendered-noun-data from which the
     gendered versions of nouns are read."""
@@ -167,12 +185,56 @@ DISABLE_ALL_WARNINGS: WarningSettingType = frozenset()
 
 ENABLE_DEFAULT_WARNINGS: WarningSettingType = ENABLE_ALL_WARNINGS
 
+# WarningCollector:
+
+
+class WarningCollector:
+    """Collects warnings instead of raising them with Python's `warnings` module, which is comparatively slow; see
+    `WarningManager.collecting`. Identical warnings (same type and text) are only stored once, together with the number
+    of times they were raised."""
+
+    def __init__(self):
+        """Returns an empty collector."""
+        self.counts: typing.Dict[typing.Tuple[WarningType, str], int] = dict()
+        self.lock = threading.Lock()
+
+    def add(self, text: str, warning_type: WarningType):
+        """Adds a warning of the given type with the given text to the collector."""
+        key = (warning_type, text)
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def get_warnings(self) -> typing.List[dict]:
+        """Returns all distinct warnings in the order in which they were first raised, as dicts with the name of their
+        type ("warning"), their text ("message") and the number of times they were raised ("count")."""
+        with self.lock:
+            return [{"warning": warning_type.__name__, "message": text, "count": count}
+                    for (warning_type, text), count in self.counts.items()]
+
+    def total(self) -> int:
+        """Returns the number of warnings raised, duplicates included."""
+        with self.lock:
+            return sum(self.counts.values())
+
+    def __len__(self) -> int:
+        """Returns the number of distinct warnings raised."""
+        with self.lock:
+            return len(self.counts)
+
+    def raise_all(self):
+        """Raises every distinct warning in the collector once, using Python's `warnings` module."""
+        with self.lock:
+            keys = list(self.counts.keys())
+        for warning_type, text in keys:
+            ws.warn(text, warning_type)
+
 # WarningManager:
 
 
 class WarningManager:
     """A bundle of functions to handle warning handling."""
     warning_settings_by_thread_id = dict()
+    collectors_by_thread_id: typing.Dict[int, WarningCollector] = dict()
 
     @staticmethod
     def set_warning_settings(warning_settings: WarningSettingType):
@@ -180,13 +242,26 @@ class WarningManager:
         WarningManager.warning_settings_by_thread_id[threading.get_ident()] = warning_settings
 
     @staticmethod
-    def raise_warning(text: typing.Union[str, None], warning_type: WarningType):
-        """Raises the given warning type with the given text if it is enabled for the current thread."""
+    def is_enabled(warning_type: WarningType) -> bool:
+        """Returns whether the given warning type is enabled for the current thread."""
+        return warning_type in WarningManager.warning_settings_by_thread_id.get(threading.get_ident(),
+                                                                                ENABLE_DEFAULT_WARNINGS)
+
+    @staticmethod
+    def raise_warning(text: typing.Union[str, None, typing.Callable[[], str]], warning_type: WarningType):
+        """Raises the given warning type with the given text if it is enabled for the current thread.
+        text may also be a function that returns the text, so that texts that are expensive to build are only built if
+        the warning is actually raised; if it is None, the documentation of the warning type is used."""
+        if not WarningManager.is_enabled(warning_type):
+            return
         if text is None:
             text = warning_type.__doc__
-        if threading.get_ident() not in WarningManager.warning_settings_by_thread_id:
-            WarningManager.warning_settings_by_thread_id[threading.get_ident()] = ENABLE_DEFAULT_WARNINGS
-        if warning_type in WarningManager.warning_settings_by_thread_id[threading.get_ident()]:
+        elif callable(text):
+            text = text()
+        collector = WarningManager.collectors_by_thread_id.get(threading.get_ident())
+        if collector is not None:
+            collector.add(text, warning_type)
+        else:
             ws.warn(text, warning_type)
         # ToDo: Make a pull request if you want children of GRLogging to use the logging-module rather than the warnings
         #  module. Note that this may cause the need to change the unittests, and may not require any changes except to
@@ -196,3 +271,27 @@ class WarningManager:
         #  (https://stackoverflow.com/questions/2654113/how-to-get-the-callers-method-name-in-the-called-method), but
         #  there would be some design decisions to be made about this since inspect.stack() tends to be very slow,
         #  amongst other things.
+
+    @staticmethod
+    @contextlib.contextmanager
+    def collecting(collector: typing.Optional[WarningCollector] = None):
+        """A context manager that adds all warnings raised in the current thread during the `with`-block to the given
+        collector (or a new one) instead of raising them, and returns the collector. Which warnings are raised at all
+        is still decided by the warning settings.
+
+            with WarningManager.collecting() as collector:
+                result = template.render(pronoun_data)
+            warnings = collector.get_warnings()
+        """
+        if collector is None:
+            collector = WarningCollector()
+        thread_id = threading.get_ident()
+        previous_collector = WarningManager.collectors_by_thread_id.get(thread_id)
+        WarningManager.collectors_by_thread_id[thread_id] = collector
+        try:
+            yield collector
+        finally:
+            if previous_collector is None:
+                del WarningManager.collectors_by_thread_id[thread_id]
+            else:
+                WarningManager.collectors_by_thread_id[thread_id] = previous_collector
@@ -1,13 +1,38 @@
 
 import unittest
 import os
+import sys
+import subprocess
+import importlib.util
 import warnings
 import copy
+import typing
 
 import src.warnings as ws
 import src.errors as err
 import src.gender_nouns as gn
 from src import render_template
+import src.parse_cache as pc
+import src
+
+IMPORT_TIME_BUDGET = 0.25
+"""The maximum time `import gender_render` may take, in seconds (measured with `python -X importtime`)."""
+
+
+def get_import_times(module: str, hidden_modules: typing.Iterable[str] = tuple()):
+    """Imports the given module in a new interpreter and returns the cumulative import time of every module imported by
+    it, in seconds. The modules in `hidden_modules` are made unimportable in that interpreter, as if they were not
+    installed."""
+    code = "import sys; sys.modules.update(dict.fromkeys(" + repr(list(hidden_modules)) + ")); import " + module
+    process = subprocess.run([sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    import_times = dict()
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("| imported package"):
+            self_time, cumulative_time, name = line[len("import time:"):].split("|")
+            import_times[name.strip()] = int(cumulative_time) / 1e6
+    return import_times
 
 
 class TestInit(unittest.TestCase):
@@ -42,6 +67,12 @@ class TestInit(unittest.TestCase):
 
     def test_render_template(self):
 
+        # templates are cached unless caching is disabled:
+        misses = pc.template_cache.stats()["misses"]
+        for use_cache in (True, True, False):
+            self.assertEqual(render_template("cached {they}", {"subject": "xe"}, use_cache=use_cache), "cached xe")
+        self.assertEqual(pc.template_cache.stats()["misses"], misses + 1)
+
         # test with a string as a template and a string as the pd:
         with self.assertWarns(ws.IdMatchingNecessaryWarning):
             # ^ also check if template parsing properly raises warning
@@ -104,3 +135,27 @@ class TestInit(unittest.TestCase):
                 "wawa xen rock")
             self.assertEqual(len(w), 0)
         ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def test___getattr__(self):
+        self.assertIs(src.BoundRenderer, importlib.import_module("src.bound_renderer").BoundRenderer)
+        self.assertIs(src.TemplateBundle, importlib.import_module("src.template_bundle").TemplateBundle)
+        self.assertIs(src.lint, importlib.import_module("src.lint"))
+        # (once a submodule is imported, it is an attribute of the package, so this is only called for submodules that
+        #  were not imported yet):
+        self.assertIs(src.__getattr__("server"), importlib.import_module("src.server"))
+        with self.assertRaises(AttributeError):
+            getattr(src, "wuwu")
+
+    def test___dir__(self):
+        self.assertTrue({"Template", "render_template", "BoundRenderer", "TemplateBundle", "server"} <= set(dir(src)))
+
+    def test_import_time(self):
+        import_times = get_import_times("src")
+        # modules that are only needed by some functions are not imported:
+        for module in ("requests", "src.bound_renderer", "src.template_bundle", "src.cli", "src.server", "src.lint",
+                       "src.build_nouns"):
+            self.assertNotIn(module, import_times)
+        # (loading the corpora of nltk at import time takes longer than the budget, so the budget is checked with nltk
+        #  hidden, whether it is installed or not; the fastest of three imports is compared to be robust against noise):
+        self.assertLess(min(get_import_times("src", hidden_modules=["nltk"])["src"] for _ in range(3)),
+                        IMPORT_TIME_BUDGET)
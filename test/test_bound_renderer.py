@@ -0,0 +1,147 @@
+import threading
+import unittest
+import warnings
+
+import src.warnings as ws
+import src.errors as err
+from src.pronoun_data_interface import PronounData
+from src.template_interface import Template
+from src.bound_renderer import BoundRenderer, SpecializedTemplate
+
+
+# templates and pronoun data that can be rendered with each other:
+
+TEMPLATES = [
+    "{Mr_s} {doe}, {they} said {they} {ACTOR} {id:foo*them}.",
+    "{id:foo*They} and {id:bar*them} met {id:bar*Address} {id:bar*name} and {id:foo*actor}s.",
+    "{id:foo*they} {id:foo*themself} {id:foo*<pet>} {Doe}",
+    "no tags at all"
+]
+PRONOUN_DATA = [
+    {"they": "xe", "them": "xem", "themself": "xemself", "address": "Mx", "surname": "Doe", "gender-nouns": "female",
+     "_pet": "cat"},
+    {"foo": {"they": "she", "them": "her", "themself": "herself", "address": "Ms", "name": "Smith", "<pet>": "dog"},
+     "bar": {"they": "he", "them": "him", "address": "Mr", "name": "Johnson", "gender-addressing": "f",
+             "first-name": "Avery", "gender-nouns": "male"}}
+]
+
+
+class TestBoundRenderer(unittest.TestCase):
+
+    def test__init__(self):
+        # accepts pronoun data in every form `PronounData` accepts:
+        # (with all default values resolved):
+        idpd = {"subject": "xe", "gender-addressing": "t", "gender-nouns": "neutral"}
+        self.assertEqual(BoundRenderer({"they": "xe"}).grpd, {"": idpd})
+        self.assertEqual(BoundRenderer("""{"foo": {"they": "xe"}}""").grpd, {"foo": idpd})
+        self.assertEqual(BoundRenderer(PronounData({"they": "xe"})).grpd, {"": idpd})
+        self.assertEqual(BoundRenderer({"they": "xe"}).defaulted_properties,
+                         {"": frozenset({"gender-addressing", "gender-nouns"})})
+        self.assertEqual(BoundRenderer({"they": "xe"}).rendered_values, dict())
+        # and raises its errors:
+        self.assertRaises(err.InvalidPDError, lambda: BoundRenderer({"foo": {"they": 1}}))
+
+    def test_get_rendered_value(self):
+        renderer = BoundRenderer({"foo": {"they": "xe", "gender-addressing": "f", "first-name": "avery"}})
+        # resolves addressing and capitalization:
+        self.assertEqual(renderer.get_rendered_value("foo", "foo", "subject", "capitalized"), "Xe")
+        self.assertEqual(renderer.get_rendered_value("foo", "foo", "address", "all-caps"), "AVERY")
+        # and caches the result:
+        self.assertEqual(renderer.rendered_values[("foo", "address", "all-caps")], "AVERY")
+        renderer.rendered_values[("foo", "address", "all-caps")] = "wuwu"
+        self.assertEqual(renderer.get_rendered_value("foo", "foo", "address", "all-caps"), "wuwu")
+
+        # resolves default values, raising the warning only the first time the value is needed:
+        renderer = BoundRenderer({"foo": {"they": "xe"}})
+        template = Template("{id:foo*actor}")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(renderer.render(template), "actor")
+            self.assertEqual(renderer.render(template), "actor")
+            self.assertEqual(len([x for x in w if issubclass(x.category, ws.DefaultValueUsedWarning)]), 1)
+
+        # missing information is not cached:
+        self.assertRaises(err.MissingInformationError,
+                          lambda: renderer.get_rendered_value("foo", "foo", "address", "lower-case"))
+        self.assertNotIn(("foo", "address", "lower-case"), renderer.rendered_values)
+
+    def test_render(self):
+        # renders exactly like `Template.render` would:
+        for template_str in TEMPLATES:
+            template = Template(template_str, warning_settings=ws.DISABLE_ALL_WARNINGS)
+            for pd in PRONOUN_DATA:
+                renderer = BoundRenderer(pd, warning_settings=ws.DISABLE_ALL_WARNINGS)
+                try:
+                    expected = template.render(pd, warning_settings=ws.DISABLE_ALL_WARNINGS)
+                except err.RenderingError as e:
+                    self.assertRaises(type(e), lambda: renderer.render(template,
+                                                                       warning_settings=ws.DISABLE_ALL_WARNINGS))
+                else:
+                    # a second time to make sure cached values are used correctly:
+                    for _ in range(2):
+                        self.assertEqual(renderer.render(template, warning_settings=ws.DISABLE_ALL_WARNINGS), expected)
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+        # the same individual pronoun data can be used with templates that use different ids:
+        renderer = BoundRenderer({"they": "xe"})
+        with self.assertWarns(ws.IdMatchingNecessaryWarning):
+            self.assertEqual(renderer.render(Template("{id:foo*they}")), "xe")
+        with self.assertWarns(ws.IdMatchingNecessaryWarning):
+            self.assertEqual(renderer.render(Template("{they} {They}")), "xe Xe")
+
+        # id resolution errors are raised:
+        self.assertRaises(err.IdResolutionError,
+                          lambda: BoundRenderer({"foo": {"they": "xe"}}).render(Template("{id:bar*they}")))
+
+    def test_render_from_several_threads(self):
+        # many threads share one renderer, whose values are resolved while they render:
+        template = Template(TEMPLATES[1], warning_settings=ws.DISABLE_ALL_WARNINGS)
+        expected = template.render(PRONOUN_DATA[1], warning_settings=ws.DISABLE_ALL_WARNINGS)
+        renderer = BoundRenderer({"foo": {"they": "she", "them": "her", "address": "Ms", "name": "Smith"},
+                                  "bar": {"they": "he", "them": "him", "address": "Mr", "name": "Johnson",
+                                          "gender-addressing": "f", "first-name": "Avery", "gender-nouns": "male"}})
+        results = list()
+        errors = list()
+
+        def render():
+            try:
+                results.append(renderer.render(template, warning_settings=ws.ENABLE_DEFAULT_WARNINGS))
+            except Exception as e:
+                errors.append(e)
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            threads = [threading.Thread(target=render) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # the default value of foo's "gender-nouns"-property is warned about exactly once:
+            self.assertEqual(len([x for x in w if issubclass(x.category, ws.DefaultValueUsedWarning)]), 1)
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [expected] * 16)
+        self.assertEqual(renderer.defaulted_properties, {"foo": frozenset({"gender-addressing"})})
+
+    def test_specialize(self):
+        renderer = BoundRenderer({"foo": {"they": "xe"}})
+        specialized_template = renderer.specialize(Template("{id:foo*They} {id:foo*they}"))
+        self.assertIsInstance(specialized_template, SpecializedTemplate)
+        self.assertEqual(specialized_template.render(), "Xe xe")
+
+
+class TestSpecializedTemplate(unittest.TestCase):
+
+    def test__init__(self):
+        self.assertEqual(SpecializedTemplate("foo").rendered_template, "foo")
+
+    def test_render(self):
+        self.assertEqual(SpecializedTemplate("foo").render(), "foo")
+
+    def test__setattr__(self):
+        # specialized templates are immutable:
+        specialized_template = SpecializedTemplate("foo")
+        with self.assertRaises(AttributeError):
+            specialized_template.rendered_template = "bar"
+        with self.assertRaises(AttributeError):
+            specialized_template.foo = "bar"
+        self.assertEqual(specialized_template.render(), "foo")
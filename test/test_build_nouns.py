@@ -0,0 +1,181 @@
+import unittest
+import os
+import io
+import json
+import contextlib
+import functools
+import tempfile
+import warnings
+from unittest import mock
+
+import src.warnings as ws
+import src.build_nouns as bn
+from src.gender_nouns import GenderNounDataHandler, GDN_META_DATA
+
+# a local copy of a (very small) gendered_words.json:
+
+ORIGINAL_DATA = [
+    {"word": "actor", "wordnet_senseno": "actor.n.01", "gender": "n",
+     "gender_map": {"f": [{"parts_of_speech": "n", "word": "actress"}]}},
+    {"word": "actress", "wordnet_senseno": "actress.n.01", "gender": "f",
+     "gender_map": {"m": [{"parts_of_speech": "n", "word": "actor man"}]}},
+    {"word": "salesman", "wordnet_senseno": "salesman.n.01", "gender": "m"},
+    {"word": "wuwu", "gender": "m"}
+]
+
+
+class TestBuildNouns(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_file = os.path.join(self.directory.name, "gendered_words.json")
+        with open(self.source_file, "w") as f:
+            json.dump(ORIGINAL_DATA, f)
+        self.cache_dir = os.path.join(self.directory.name, "cache")
+        self.output_file = os.path.join(self.directory.name, "gendered-nouns.gdn")
+        self.stages = GenderNounDataHandler.get_pipeline_stages()
+        ws.WarningManager.set_warning_settings(ws.DISABLE_ALL_WARNINGS)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def read(self, file_name):
+        with open(file_name, "r") as f:
+            return f.read()
+
+    def test_get_default_cache_dir(self):
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": self.directory.name}):
+            self.assertEqual(bn.get_default_cache_dir(), os.path.join(self.directory.name, "gender-render", "gdn"))
+
+    def test_get_code(self):
+        self.assertIn("def get_code(", bn.get_code(bn.get_code))
+        # partially applied functions include their arguments:
+        partial = functools.partial(GenderNounDataHandler.make_all_links_two_sided, log_clashs=True)
+        self.assertTrue(bn.get_code(partial).startswith(bn.get_code(GenderNounDataHandler.make_all_links_two_sided)))
+        self.assertNotEqual(bn.get_code(partial), bn.get_code(
+            functools.partial(GenderNounDataHandler.make_all_links_two_sided, log_clashs=False)))
+        # functions without source code are identified by their byte code:
+        namespace = dict()
+        exec("def stage(graph):\n    return graph\n", namespace)
+        self.assertEqual(bn.get_code(namespace["stage"]), repr(namespace["stage"].__code__.co_code))
+
+    def test_get_checkpoint_keys(self):
+        keys = bn.get_checkpoint_keys(self.source_file, self.stages)
+        self.assertEqual(len(set(keys)), len(self.stages) + 1)
+
+        # changing a stage changes the keys of its checkpoint and of all following ones:
+        changed_stages = list(self.stages)
+        changed_stages[3] = (changed_stages[3][0], lambda graph: graph)
+        changed_keys = bn.get_checkpoint_keys(self.source_file, changed_stages)
+        self.assertEqual(changed_keys[:4], keys[:4])
+        self.assertTrue(all(key != changed_key for key, changed_key in zip(keys[4:], changed_keys[4:])))
+
+        # changing the source file changes all of them:
+        with open(self.source_file, "w") as f:
+            json.dump(ORIGINAL_DATA[:2], f)
+        self.assertTrue(all(key != changed_key for key, changed_key in
+                            zip(keys, bn.get_checkpoint_keys(self.source_file, self.stages))))
+
+    def test_save_checkpoint(self):
+        graph = {"b": {"gender": "male", "gender_map": {"female": "a"}, "warning": {"y", "x"}},
+                 "a": {"gender": "female", "gender_map": {"male": "b"}}}
+        file_name = os.path.join(self.cache_dir, "checkpoint.json")
+        bn.save_checkpoint(graph, file_name)
+        self.assertEqual(os.listdir(self.cache_dir), ["checkpoint.json"])
+        # the order of words is kept, and warnings are saved as sorted lists:
+        self.assertEqual(list(json.loads(self.read(file_name)).keys()), ["b", "a"])
+        self.assertEqual(json.loads(self.read(file_name))["b"]["warning"], ["x", "y"])
+        # the given graph is not changed:
+        self.assertEqual(graph["b"]["warning"], {"x", "y"})
+
+    def test_load_checkpoint(self):
+        graph = {"b": {"gender": "male", "gender_map": {"female": "a"}, "warning": {"y", "x"}},
+                 "a": {"gender": "female", "gender_map": {"male": "b"}}}
+        file_name = os.path.join(self.cache_dir, "checkpoint.json")
+        bn.save_checkpoint(graph, file_name)
+        self.assertEqual(bn.load_checkpoint(file_name), graph)
+        self.assertEqual(list(bn.load_checkpoint(file_name).keys()), ["b", "a"])
+
+    def test_build_noun_data(self):
+        # the result is identical to building the data in-process:
+        expected_file = os.path.join(self.directory.name, "expected.gdn")
+        GenderNounDataHandler.save_to_disk(GenderNounDataHandler.complete_graph(
+            GenderNounDataHandler.load_from_source_file(self.source_file)), expected_file, **GDN_META_DATA)
+        all_stages = ["load_from_source_file"] + [stage_name for stage_name, stage in self.stages]
+        self.assertEqual(bn.build_noun_data(self.source_file, self.output_file, self.cache_dir), all_stages)
+        self.assertEqual(self.read(self.output_file), self.read(expected_file))
+        self.assertEqual(len(os.listdir(self.cache_dir)), len(self.stages) + 1)
+
+        # running it again uses the checkpoints:
+        os.remove(self.output_file)
+        self.assertEqual(bn.build_noun_data(self.source_file, self.output_file, self.cache_dir), [])
+        self.assertEqual(self.read(self.output_file), self.read(expected_file))
+
+        # only the stages after the last checkpoint are run:
+        keys = bn.get_checkpoint_keys(self.source_file, self.stages)
+        for key in keys[5:]:
+            os.remove(os.path.join(self.cache_dir, key + ".json"))
+        self.assertEqual(bn.build_noun_data(self.source_file, self.output_file, self.cache_dir), all_stages[5:])
+        self.assertEqual(self.read(self.output_file), self.read(expected_file))
+
+        # without using checkpoints or without a cache directory, all stages are run:
+        self.assertEqual(bn.build_noun_data(self.source_file, self.output_file, self.cache_dir, False), all_stages)
+        self.assertEqual(bn.build_noun_data(self.source_file, self.output_file), all_stages)
+        self.assertEqual(self.read(self.output_file), self.read(expected_file))
+
+        # source files that are not in the format of gendered_words.json raise a ValueError:
+        with open(self.source_file, "w") as f:
+            json.dump([1], f)
+        with self.assertRaises(ValueError):
+            bn.build_noun_data(self.source_file, self.output_file)
+
+    def run_main(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = bn.main(list(args))
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_make_argument_parser(self):
+        args = bn.make_argument_parser().parse_args(["words.json", "-o", "out.gdn", "--cache-dir", "cache",
+                                                     "--rebuild", "-v"])
+        self.assertEqual((args.source, args.output, args.cache_dir, args.no_cache, args.rebuild, args.verbose),
+                         ("words.json", "out.gdn", "cache", False, True, True))
+
+    def test_main(self):
+        exit_code, stdout, stderr = self.run_main(self.source_file, "-o", self.output_file, "--cache-dir",
+                                                  self.cache_dir)
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(os.path.isfile(self.output_file))
+        self.assertIn("find_words_with_no_neutral_form", stderr)
+        self.assertIn("no stages", self.run_main(self.source_file, "-o", self.output_file, "--cache-dir",
+                                                 self.cache_dir)[2])
+        self.assertIn("find_words_with_no_neutral_form", self.run_main(
+            self.source_file, "-o", self.output_file, "--cache-dir", self.cache_dir, "--rebuild")[2])
+        # what every stage does is only logged with --verbose:
+        self.assertNotIn("words found.", self.run_main(self.source_file, "-o", self.output_file, "--no-cache")[2])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(self.run_main(self.source_file, "-o", self.output_file, "--no-cache", "-v")[0], 0)
+        self.assertIn(ws.BuildingGenderedNounDataLogging, [x.category for x in w])
+
+        # invalid source files:
+        self.assertEqual(self.run_main(os.path.join(self.directory.name, "missing.json"), "--no-cache")[0], 2)
+        with open(self.source_file, "w") as f:
+            f.write("[")
+        self.assertEqual(self.run_main(self.source_file, "-o", self.output_file, "--no-cache")[0], 2)
+        # source files that are valid JSON, but not in the format of gendered_words.json:
+        for source in ([{"word": "actor", "wordnet_senseno": "actor.n.01", "gender": "x"}], [1]):
+            with open(self.source_file, "w") as f:
+                json.dump(source, f)
+            exit_code, stdout, stderr = self.run_main(self.source_file, "-o", self.output_file, "--no-cache")
+            self.assertEqual(exit_code, 2)
+            self.assertIn("is not in the format of gendered_words.json", stderr)
+        # errors in the stages themselves are not mistaken for malformed source files:
+        with open(self.source_file, "w") as f:
+            json.dump(ORIGINAL_DATA, f)
+        def failing_stage(graph):
+            return graph["wuwu"]
+        with mock.patch.object(GenderNounDataHandler, "get_pipeline_stages", return_value=[("fails", failing_stage)]):
+            with self.assertRaises(KeyError):
+                self.run_main(self.source_file, "-o", self.output_file, "--no-cache")
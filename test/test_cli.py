@@ -0,0 +1,189 @@
+import unittest
+import os
+import io
+import json
+import tempfile
+import contextlib
+from unittest import mock
+
+import src.warnings as ws
+import src.cli as cli
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.welcome = self.path("welcome.gr", "Hello {Mr_s} {Name}, {they} {actor}!")
+        self.short = self.path("short.gr", "{They}.")
+        self.invalid = self.path("invalid.gr", "{id:foo}")
+        self.pronoun_data = self.path("pd.jsonl", "\n".join([
+            json.dumps({"they": "xe", "mr_s": "Mx", "name": "Doe", "gender-nouns": "female"}),
+            "",
+            json.dumps({"they": "she"}),
+            "this is not json"
+        ]) + "\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def path(self, file_name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, file_name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def run_main(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = cli.main(list(args))
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_load_templates(self):
+        cli.load_templates([self.welcome, self.short], ws.DISABLE_ALL_WARNINGS)
+        self.assertEqual([path for path, _ in cli.templates], [self.welcome, self.short])
+        self.assertEqual(cli.templates[1][1].parsed_template,
+                         ["", {"context": "subject", "capitalization": "capitalized"}, "."])
+        self.assertEqual(cli.warning_settings_for_records, ws.DISABLE_ALL_WARNINGS)
+
+    def test_render_record(self):
+        cli.load_templates([self.welcome, self.short], ws.DISABLE_ALL_WARNINGS)
+        record, results, latency = cli.render_record((3, json.dumps({"they": "xe", "mr_s": "Mx", "name": "Doe"})))
+        self.assertEqual(record, 3)
+        self.assertEqual(results, [{"record": 3, "template": self.welcome, "output": "Hello Mx Doe, xe actor!"},
+                                   {"record": 3, "template": self.short, "output": "Xe."}])
+        self.assertGreaterEqual(latency, 0)
+
+        # rendering errors are reported per template, errors in pronoun data once per record:
+        _, results, _ = cli.render_record((4, json.dumps({"they": "xe"})))
+        self.assertEqual(results[0]["error"], "MissingInformationError")
+        self.assertEqual(results[1], {"record": 4, "template": self.short, "output": "Xe."})
+        _, results, _ = cli.render_record((5, "[]"))
+        self.assertEqual([set(r.keys()) for r in results], [{"record", "error", "message"}])
+        self.assertEqual(results[0]["error"], "InvalidPDError")
+
+        # collecting warnings:
+        cli.load_templates([self.welcome, self.short], ws.ENABLE_DEFAULT_WARNINGS, collect_warnings=True)
+        _, results, _ = cli.render_record((6, json.dumps({"they": "xe", "mr_s": "Mx", "name": "Doe"})))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[2].keys()), {"record", "warnings"})
+        self.assertEqual(set(w["warning"] for w in results[2]["warnings"]),
+                         {"DefaultValueUsedWarning", "IdMatchingNecessaryWarning"})
+        self.assertEqual([w["count"] for w in results[2]["warnings"] if w["warning"] == "IdMatchingNecessaryWarning"],
+                         [2])
+        # no warnings, no object:
+        cli.load_templates([self.short], ws.DISABLE_ALL_WARNINGS, collect_warnings=True)
+        self.assertEqual(len(cli.render_record((7, json.dumps({"they": "xe"})))[1]), 1)
+
+    def test_get_output_file_name(self):
+        self.assertEqual(cli.get_output_file_name(self.welcome), "welcome")
+        self.assertEqual(cli.get_output_file_name(os.path.join("a", "b.grt")), "b.grt")
+
+    def test_write_results_to_directory(self):
+        output_dir = os.path.join(self.directory.name, "out")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            cli.write_results_to_directory(output_dir, [
+                {"record": 1, "template": self.welcome, "output": "foo"},
+                {"record": 2, "template": self.short, "error": "IdResolutionError", "message": "bar"},
+                {"record": 2, "warnings": [{"warning": "DefaultValueUsedWarning", "message": "baz", "count": 3}]}
+            ])
+        with open(os.path.join(output_dir, "1", "welcome")) as f:
+            self.assertEqual(f.read(), "foo")
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "2")))
+        self.assertIn("record 2, template " + self.short + ": IdResolutionError: bar", stderr.getvalue())
+        self.assertIn("record 2: DefaultValueUsedWarning (x3): baz", stderr.getvalue())
+
+    def test_write_buffer(self):
+        f_out = io.StringIO()
+        cli.write_buffer([{"record": 1, "output": "a"}, {"record": 2, "output": "b"}], f_out, None)
+        cli.write_buffer([], f_out, None)
+        self.assertEqual(f_out.getvalue(), '{"record": 1, "output": "a"}\n{"record": 2, "output": "b"}\n')
+
+    def test_format_stats(self):
+        self.assertEqual(cli.format_stats([], 1), "0 records in 1.000 s")
+        self.assertEqual(cli.format_stats([0.001, 0.002], 0.5), "2 records in 0.500 s (4.0 records/s); latency in ms: "
+                                                                 + "p50 1.000, p90 2.000, p99 2.000, max 2.000")
+
+    def test_make_argument_parser(self):
+        args = cli.make_argument_parser().parse_args(["a.gr", "b.gr", "-j", "4", "--stats"])
+        self.assertEqual(args.templates, ["a.gr", "b.gr"])
+        self.assertEqual((args.jobs, args.stats, args.pronoun_data, args.output, args.output_dir), (4, True, "-", "-",
+                                                                                                     None))
+
+    def test_main(self):
+        expected = [
+            {"record": 1, "template": self.welcome, "output": "Hello Mx Doe, xe actress!"},
+            {"record": 1, "template": self.short, "output": "Xe."},
+            {"record": 3, "template": self.welcome, "error": "MissingInformationError"},
+            {"record": 3, "template": self.short, "output": "She."},
+            {"record": 4, "error": "InvalidPDError"}
+        ]
+        for jobs in ("1", "2"):
+            for buffer_size in ("1", "1000"):
+                exit_code, stdout, stderr = self.run_main(self.welcome, self.short, "-p", self.pronoun_data,
+                                                          "--no-warnings", "-j", jobs, "--buffer-size", buffer_size)
+                self.assertEqual(exit_code, 1)
+                results = [json.loads(line) for line in stdout.splitlines()]
+                for result in results:
+                    result.pop("message", None)
+                self.assertEqual(results, expected)
+
+        # output to a file, with statistics:
+        output = os.path.join(self.directory.name, "out.jsonl")
+        exit_code, stdout, stderr = self.run_main(self.short, "-p", self.pronoun_data, "-o", output, "--stats",
+                                                  "--no-warnings")
+        with open(output) as f:
+            self.assertEqual(len(f.read().splitlines()), 3)
+        self.assertEqual(stdout, "")
+        self.assertIn("3 records in", stderr)
+
+        # output to a directory:
+        output_dir = os.path.join(self.directory.name, "out")
+        exit_code, stdout, stderr = self.run_main(self.short, "-p", self.pronoun_data, "-d", output_dir,
+                                                  "--no-warnings")
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(sorted(os.listdir(output_dir)), ["1", "3"])
+        with open(os.path.join(output_dir, "3", "short")) as f:
+            self.assertEqual(f.read(), "She.")
+
+        # everything renders:
+        exit_code, stdout, stderr = self.run_main(self.short, "-p", self.path("pd2.jsonl", '{"they": "xe"}'))
+        self.assertEqual((exit_code, stdout), (0, '{"record": 1, "template": "' + self.short + '", "output": "Xe."}\n'))
+
+        # reading from stdin:
+        with mock.patch("sys.stdin", io.StringIO('{"they": "xe"}\n')):
+            self.assertEqual(self.run_main(self.short)[:2],
+                             (0, '{"record": 1, "template": "' + self.short + '", "output": "Xe."}\n'))
+
+        # collecting warnings, also in worker processes:
+        for jobs in ("1", "2"):
+            exit_code, stdout, stderr = self.run_main(self.short, "-p", self.path("pd3.jsonl", '{"they": "xe"}'),
+                                                      "--collect-warnings", "-j", jobs)
+            self.assertEqual(exit_code, 0)
+            results = [json.loads(line) for line in stdout.splitlines()]
+            self.assertEqual(results[1], {"record": 1, "warnings": [
+                {"warning": "IdMatchingNecessaryWarning", "message": ws.IdMatchingNecessaryWarning.__doc__, "count": 1}
+            ]})
+
+        # invalid templates and arguments:
+        self.assertEqual(self.run_main(self.invalid, "-p", self.pronoun_data)[0], 2)
+        self.assertEqual(self.run_main(os.path.join(self.directory.name, "missing.gr"), "-p", self.pronoun_data)[0], 2)
+        self.assertEqual(self.run_main(self.short, "-j", "0")[0], 2)
+
+        # files that cannot be opened:
+        self.assertEqual(self.run_main(self.short, "-p", os.path.join(self.directory.name, "missing.jsonl"))[0], 2)
+        exit_code, stdout, stderr = self.run_main(self.short, "-p", self.pronoun_data, "-o",
+                                                  os.path.join(self.directory.name, "missing", "out.jsonl"))
+        self.assertEqual(exit_code, 2)
+        self.assertIn("FileNotFoundError", stderr)
+
+        # templates that would be rendered to the same files:
+        os.makedirs(os.path.join(self.directory.name, "other"))
+        other_short = self.path(os.path.join("other", "short.gr"), "{them}")
+        exit_code, stdout, stderr = self.run_main(self.short, other_short, "-p", self.pronoun_data, "-d", output_dir)
+        self.assertEqual(exit_code, 2)
+        self.assertIn("--output-dir", stderr)
+        # (this is fine when writing JSON Lines, though):
+        self.assertEqual(self.run_main(self.short, other_short, "-p", self.pronoun_data, "--no-warnings")[0], 1)
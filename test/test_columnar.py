@@ -0,0 +1,116 @@
+import sys
+import importlib
+import unittest
+import warnings
+
+import src.warnings as ws
+import src.errors as err
+import src.columnar as columnar
+from src.template_interface import Template
+
+
+class TestColumnar(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def test_group_rows(self):
+        unique_rows, row_indices = columnar.group_rows({
+            "subject": ["xe", "she", "xe", "xe", None],
+            "personal-name": ["Avery", "Sam", "Avery", "Kim", None]
+        })
+        self.assertEqual(unique_rows, [{"subject": "xe", "personal-name": "Avery"},
+                                       {"subject": "she", "personal-name": "Sam"},
+                                       {"subject": "xe", "personal-name": "Kim"},
+                                       dict()])
+        self.assertEqual(row_indices, [0, 1, 0, 2, 3])
+
+        # no rows:
+        self.assertEqual(columnar.group_rows({"subject": []}), ([], []))
+        self.assertEqual(columnar.group_rows(dict()), ([], []))
+
+        # columns of different lengths:
+        self.assertRaises(ValueError, lambda: columnar.group_rows({"subject": ["xe"], "object": ["xem", "her"]}))
+
+        # with ids, the pronoun data of every row assigns its individual pronoun data to its id:
+        unique_rows, row_indices = columnar.group_rows({"subject": ["xe", "xe", "xe", None]},
+                                                       ids=["foo", "bar", "foo", "foo"])
+        self.assertEqual(unique_rows, [{"foo": {"subject": "xe"}}, {"bar": {"subject": "xe"}}, {"foo": dict()}])
+        self.assertEqual(row_indices, [0, 1, 0, 2])
+        self.assertEqual(columnar.group_rows(dict(), ids=["foo"]), ([{"foo": dict()}], [0]))
+        self.assertRaises(ValueError, lambda: columnar.group_rows({"subject": ["xe"]}, ids=["foo", "bar"]))
+
+    def test_render_columns(self):
+        template = Template("{Name} said {they} would bring {their} {First-name}.")
+        columns = {
+            "name": ["Avery", "Sam", "Avery", "Kim"],
+            "subject": ["xe", "she", "xe", "they"],
+            "dposs": ["xyr", "her", "xyr", "their"],
+            "first-name": ["Jo", "Rae", "Jo", "Jo"]
+        }
+        rendered_rows = columnar.render_columns(template, columns)
+        self.assertEqual(rendered_rows, [
+            template.render({p: column[i] for p, column in columns.items()}) for i in range(4)
+        ])
+        self.assertEqual(rendered_rows[1], "Sam said she would bring her Rae.")
+
+        # distinct rows are only rendered once, so warnings are raised once per distinct row:
+        template = Template("{They} {Actor}")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(columnar.render_columns(template, {"subject": ["xe", "xe", "she"],
+                                                                "gender-nouns": [None, None, "female"]}),
+                             ["Xe Actor", "Xe Actor", "She Actress"])
+            self.assertEqual(len([warning for warning in w if warning.category is ws.DefaultValueUsedWarning]), 1)
+
+        # errors are raised:
+        self.assertRaises(err.MissingInformationError,
+                          lambda: columnar.render_columns(Template("{first-name}"), {"subject": ["xe"]},
+                                                          ws.DISABLE_ALL_WARNINGS))
+        self.assertRaises(ValueError, lambda: columnar.render_columns(template, {"subject": ["xe"], "object": []}))
+
+        # rows with ids are rendered with gender*render pronoun data, so templates may use the ids:
+        template = Template("Dear {id:recipient*Name}, {id:recipient*they} won.")
+        columns = {"subject": ["xe", "she", "xe"], "name": ["Doe", "Kim", "Doe"]}
+        self.assertEqual(columnar.render_columns(template, columns, ids=["recipient"] * 3),
+                         ["Dear Doe, xe won.", "Dear Kim, she won.", "Dear Doe, xe won."])
+        self.assertRaises(err.IdResolutionError,
+                          lambda: columnar.render_columns(template, columns, ids=["recipient", "sender", "recipient"]))
+
+    @unittest.skipIf(columnar.numpy is None, "NumPy is not installed.")
+    def test_render_columns_with_numpy(self):
+        numpy = columnar.numpy
+        template = Template("{They} met {Name}.")
+        columns = {"subject": numpy.array(["xe", "she", "xe"], dtype=object), "name": ["Avery", "Sam", "Avery"]}
+        rendered_rows = columnar.render_columns(template, columns)
+        self.assertIsInstance(rendered_rows, numpy.ndarray)
+        self.assertEqual(rendered_rows.dtype, object)
+        self.assertEqual(list(rendered_rows), ["Xe met Avery.", "She met Sam.", "Xe met Avery."])
+        # arrays of NumPy strings work as well:
+        self.assertEqual(list(columnar.render_columns(template, {"subject": numpy.array(["xe"]),
+                                                                 "name": numpy.array(["Kim"])})), ["Xe met Kim."])
+        # and so does a NumPy array of ids:
+        rendered_rows = columnar.render_columns(Template("{id:foo*They} met {id:foo*Name}."), {"subject": ["xe", "she"],
+                                                "name": ["Avery", "Sam"]}, ids=numpy.array(["foo", "foo"]))
+        self.assertIsInstance(rendered_rows, numpy.ndarray)
+        self.assertEqual(list(rendered_rows), ["Xe met Avery.", "She met Sam."])
+
+    def test_render_columns_without_numpy(self):
+        # hide NumPy (if it is installed) and reload the module:
+        numpy = sys.modules.get("numpy")
+        sys.modules["numpy"] = None
+        try:
+            importlib.reload(columnar)
+            self.assertIsNone(columnar.numpy)
+            self.assertEqual(columnar.render_columns(Template("{They}"), {"subject": ("xe", "she", "xe")}),
+                             ["Xe", "She", "Xe"])
+        finally:
+            if numpy is None:
+                del sys.modules["numpy"]
+            else:
+                sys.modules["numpy"] = numpy
+            importlib.reload(columnar)
+
+
+if __name__ == '__main__':
+    unittest.main()
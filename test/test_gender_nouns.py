@@ -7,6 +7,7 @@ import sys
 import logging
 import copy
 import importlib
+import tempfile
 import requests
 import json
 from test import check_type
@@ -14,6 +15,7 @@ from deepdiff import DeepDiff
 import typing_extensions
 
 import src
+import src.parse_cache
 import src.gender_nouns as gn
 import src.warnings as ws
 import src.errors as err
@@ -45,6 +47,8 @@ class TestImportOfTypingModule(unittest.TestCase):
         # un-hide it and reload the src.gender_nouns:
         sys.modules["typing_extensions"] = self.__typing_extensions
         importlib.reload(sys.modules["src.gender_nouns"])
+        # cached templates contain gendered nouns of the module before it was reloaded:
+        src.parse_cache.template_cache.clear()
 
 
 class TestHelperFunctionsWithoutNLTKInstalled(unittest.TestCase):
@@ -61,6 +65,8 @@ class TestHelperFunctionsWithoutNLTKInstalled(unittest.TestCase):
         # make sure nltk is installed for further tests:
         sys.modules["nltk"] = self.__nltk
         importlib.reload(sys.modules["src.gender_nouns"])
+        # cached templates contain gendered nouns of the module before it was reloaded:
+        src.parse_cache.template_cache.clear()
 
     def test_is_a_word(self):
         # returns True for everything:
@@ -105,25 +111,49 @@ class TestHelperFunctionsWithNLTKInstalled(unittest.TestCase):
         self.assertTrue(fkt("carpenter"))
 
 
+# a (very small) part of gendered_words.json, the source file of the gendered noun data:
+
+ORIGINAL_DATA_EXCERPT = [
+    {"word": "actor", "wordnet_senseno": "actor.n.01", "gender": "n",
+     "gender_map": {"f": [{"parts_of_speech": "n", "word": "actress"}]}},
+    {"word": "actress", "wordnet_senseno": "actress.n.01", "gender": "f",
+     "gender_map": {"m": [{"parts_of_speech": "n", "word": "actor"}]}},
+    {"word": "salesman", "wordnet_senseno": "salesman.n.01", "gender": "m",
+     "gender_map": {"f": [{"parts_of_speech": "n", "word": "saleswoman"}]}},
+    {"word": "saleswoman", "wordnet_senseno": "saleswoman.n.01", "gender": "f",
+     "gender_map": {"m": [{"parts_of_speech": "n", "word": "salesman"}]}},
+    {"word": "salesperson", "wordnet_senseno": "salesperson.n.01", "gender": "n"},
+    {"word": "wuwu", "gender": "m"}
+]
+
+
 class TestCreateNewNounData(unittest.TestCase):
 
     def test_create_noun_data(self):
-        # test if noun data is correctly generated when the `gender-nouns.gdn`-file is missing and has to be rebuild
-        # on initialization.
-        # the outcome should be identical to what it contained before it was deleted, and also, to the result of the
-        # render pipeline.
-
-        # create copy and reload module:
-        old_gender_dict = copy.deepcopy(gn.GENDER_DICT)
-        pipeline_output = GenderNounDataHandler.create_full_graph_from_web()
-        os.remove("src/data/gendered-nouns.gdn")
-        with self.assertWarns(ws.GenderedNounsBuildFromWebWarning):
-            importlib.reload(sys.modules["src.gender_nouns"])
-
-        # check for equality:
-        self.assertEqual(old_gender_dict, pipeline_output)
-        self.assertEqual(old_gender_dict, gn.GENDER_DICT)
-        self.assertEqual(pipeline_output, gn.GENDER_DICT)
+        # building the noun data from (an excerpt of) its source file, without network access, reproduces the matching
+        # part of the shipped data:
+        with tempfile.TemporaryDirectory() as directory:
+            source_file = os.path.join(directory, "gendered_words.json")
+            with open(source_file, "w") as f:
+                json.dump(ORIGINAL_DATA_EXCERPT, f)
+            ws.WarningManager.set_warning_settings(ws.DISABLE_ALL_WARNINGS)
+            try:
+                graph = GenderNounDataHandler.complete_graph(GenderNounDataHandler.load_from_source_file(source_file))
+            finally:
+                ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+        self.assertEqual(set(graph), {"actor", "actress", "salesman", "saleswoman", "salesperson"})
+        self.assertEqual(graph, {word: gn.GENDER_DICT[word] for word in graph})
+
+        # test that noun data is NOT generated from the web when the `gender-nouns.gdn`-file is missing on
+        # initialization (see test_build_nouns for building it offline); instead, a warning is raised and no gendered
+        # nouns are known:
+        missing_location = gn.noun_data_location + ".missing"
+        with self.assertWarns(ws.GenderedNounsMissingWarning):
+            self.assertEqual(gn.load_noun_data(missing_location), dict())
+        self.assertFalse(os.path.exists(missing_location))
+
+    def test_load_noun_data(self):
+        self.assertEqual(gn.load_noun_data(gn.noun_data_location), gn.GENDER_DICT)
 
 
 class TestInstallWordnetCorpusIfItIsNotPresent(unittest.TestCase):
@@ -275,6 +305,28 @@ class TestGenderNounDataHandler(unittest.TestCase):
         self.assertEqual(json_generated["great_grandson"],
                          {"gender": "male", "gender_map": {"female": "great_granddaughter"}})
 
+    def test_convert_original_data(self):
+        self.assertEqual(GenderNounDataHandler.convert_original_data([
+            {"word": "actor", "wordnet_senseno": "actor.n.01", "gender": "n",
+             "gender_map": {"f": [{"parts_of_speech": "n", "word": "actress"}]}},
+            {"word": "bonus child", "wordnet_senseno": "bonus_child.n.01", "gender": "o",
+             "gender_map": {"m": [{"parts_of_speech": "n", "word": "bonus son"}]}},
+            {"word": "wuwu", "gender": "m"}
+        ]), {
+            "actor": {"gender": "neutral", "gender_map": {"female": "actress"}},
+            "bonus child": {"gender": "neutral", "gender_map": {"male": "bonus_son"}}
+        })
+
+    def test_load_from_source_file(self):
+        original_data = [{"word": "actor", "wordnet_senseno": "actor.n.01", "gender": "n",
+                          "gender_map": {"f": [{"parts_of_speech": "n", "word": "actress"}]}}]
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "gendered_words.json")
+            with open(file_name, "w") as f:
+                json.dump(original_data, f)
+            self.assertEqual(GenderNounDataHandler.load_from_source_file(file_name),
+                             GenderNounDataHandler.convert_original_data(original_data))
+
     def test_load_from_disk(self):
         # test for dict with warning:
 
@@ -441,6 +493,23 @@ class TestGenderNounDataHandler(unittest.TestCase):
         self.assertEqual(GenderNounDataHandler.choose_better_word("police_matron", "poioioice_matron"),
                          "poioioice_matron")
 
+    def test_get_groups_of_linked_words(self):
+        # groups are ordered by their first word, and their words are in the order of the graph:
+        self.assertEqual(GenderNounDataHandler.get_groups_of_linked_words(
+            {"carpenter": {"gender": "neutral", "gender_map": {}},
+             "actor": {"gender": "neutral", "gender_map": {"female": "actress"}},
+             "carpentress": {"gender": "female", "gender_map": {"neutral": "carpenter"}},
+             "actress": {"gender": "female", "gender_map": {}},
+             "carpenter_man": {"gender": "male", "gender_map": {"female": "carpentress"}},
+             "waiter": {"gender": "neutral", "gender_map": {}}}),
+            [["carpenter", "carpentress", "carpenter_man"], ["actor", "actress"], ["waiter"]])
+
+        # long chains of links do not exceed the recursion limit:
+        chain = {"word" + str(i): {"gender": "neutral", "gender_map": {"female": "word" + str(i + 1)}}
+                 for i in range(10 * sys.getrecursionlimit())}
+        chain["word" + str(len(chain))] = {"gender": "female", "gender_map": {}}
+        self.assertEqual(GenderNounDataHandler.get_groups_of_linked_words(chain), [list(chain.keys())])
+
     def test_make_all_links_two_sided(self):
         # keep a dict where all links are two-sided (A <-> B C):
         self.assertEqual(GenderNounDataHandler.make_all_links_two_sided(
@@ -739,6 +808,165 @@ class TestGenderNounDataHandler(unittest.TestCase):
         #  be preevaluated if it is even possible and/or desirable
         self.assertEqual(out, GNDH.find_words_with_no_neutral_form(inp))
 
+    def test_get_pipeline_stages(self):
+        stages = GenderNounDataHandler.get_pipeline_stages()
+        # stage names are unique, and complete_graph applies the stages in order:
+        self.assertEqual(len(set(stage_name for stage_name, stage in stages)), len(stages))
+        graph = {"salesman": {"gender": "male", "gender_map": {}}}
+        expected_graph = copy.deepcopy(graph)
+        for stage_name, stage in stages:
+            expected_graph = stage(expected_graph)
+        self.assertEqual(GenderNounDataHandler.complete_graph(graph), expected_graph)
+
+    def test_complete_graph(self):
+        graph = GenderNounDataHandler.complete_graph(
+            {"actor": {"gender": "neutral", "gender_map": {"female": "actress"}},
+             "actress": {"gender": "female", "gender_map": {"male": "actor_man"}},
+             "salesman": {"gender": "male", "gender_map": {}}})
+
+        # missing words are created, and all words are linked to each other:
+        self.assertEqual({word: word_data["gender_map"] for word, word_data in graph.items()}, {
+            "actor": {"female": "actress", "male": "actor_man"},
+            "actress": {"male": "actor_man", "neutral": "actor"},
+            "actor_man": {"female": "actress", "neutral": "actor"},
+            "salesman": {"female": "saleswoman", "neutral": "salesperson"},
+            "saleswoman": {"male": "salesman", "neutral": "salesperson"},
+            "salesperson": {"female": "saleswoman", "male": "salesman"}
+        })
+        # words that were linked automatically share their warnings:
+        self.assertEqual(len(graph["salesman"]["warning"]), 4)
+        self.assertEqual(graph["salesman"]["warning"], graph["saleswoman"]["warning"])
+        self.assertNotIn("warning", graph["actor"])
+
+
+class TestLayeredNounData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.base = {
+            "actor": {"gender": "neutral", "gender_map": {"female": "actress"}},
+            "actress": {"gender": "female", "gender_map": {"neutral": "actor"}},
+            "chair_man": {"gender": "male", "gender_map": {"neutral": "chair_person"}}
+        }
+        self.overlay = {
+            "actor": {"gender": "neutral", "gender_map": {"female": "stage_actress", "male": "stage_actor"}},
+            "crew_member": {"gender": "neutral", "gender_map": {"female": "crew_woman"}}
+        }
+        self.data = gn.LayeredNounData(self.base)
+
+    def test__init__(self):
+        self.assertIs(self.data.base, self.base)
+        self.assertEqual((self.data.overlays, self.data.merged, self.data.rendered_versions), ({}, {}, {}))
+
+    def test_check_overlay(self):
+        gn.LayeredNounData.check_overlay(self.overlay)
+        gn.LayeredNounData.check_overlay(gn.GENDER_DICT)
+        for overlay in ({"a": "b"}, {"a": {"gender": "f", "gender_map": {}}}, {"a": {"gender": "neutral"}},
+                        {"a": {"gender": "neutral", "gender_map": {"f": "b"}}},
+                        {"a": {"gender": "neutral", "gender_map": {"female": ["b"]}}},
+                        {"a": {"gender": "male", "gender_map": {"female": "b"}}}):
+            with self.assertRaises(ValueError):
+                gn.LayeredNounData.check_overlay(overlay)
+
+    def test_add_overlay(self):
+        self.assertEqual(self.data.render("actor", "female"), "actress")
+        self.data.add_overlay("theater", self.overlay)
+        # overlays take precedence over the base data, which is not changed:
+        self.assertEqual(self.data.render("actor", "female"), "stage actress")
+        self.assertEqual(self.data.render("crew_member", "female"), "crew woman")
+        self.assertEqual(self.data.render("actress", "neutral"), "actor")
+        self.assertEqual(self.base["actor"]["gender_map"], {"female": "actress"})
+
+        # later overlays take precedence over earlier ones:
+        self.data.add_overlay("film", {"actor": {"gender": "neutral", "gender_map": {"female": "film_actress"}}})
+        self.assertEqual(self.data.render("actor", "female"), "film actress")
+        self.assertEqual(self.data.render("actor", "male"), "actor")
+        # replacing an overlay moves it to the top:
+        self.data.add_overlay("theater", self.overlay)
+        self.assertEqual(self.data.get_overlay_names(), ["film", "theater"])
+        self.assertEqual(self.data.render("actor", "female"), "stage actress")
+
+        # invalid overlays are not added:
+        with self.assertRaises(ValueError):
+            self.data.add_overlay("broken", {"a": {"gender": "male", "gender_map": {}}})
+        self.assertEqual(self.data.get_overlay_names(), ["film", "theater"])
+
+        # overlays of the noun data every gendered noun uses:
+        self.assertEqual(gn.GenderedNoun("actor").render_noun("female"), "actress")
+        gn.noun_data.add_overlay("theater", self.overlay)
+        try:
+            self.assertEqual(gn.GenderedNoun("actor").render_noun("female"), "stage actress")
+            with warnings.catch_warnings(record=True) as w:
+                self.assertEqual(gn.GenderedNoun("crew_member").render_noun("female"), "crew woman")
+                self.assertEqual(w, [])
+        finally:
+            gn.noun_data.remove_overlay("theater")
+        self.assertEqual(gn.GenderedNoun("actor").render_noun("female"), "actress")
+
+    def test_remove_overlay(self):
+        self.data.add_overlay("theater", self.overlay)
+        self.data.add_overlay("film", {"actor": {"gender": "neutral", "gender_map": {"female": "film_actress"}}})
+        self.data.remove_overlay("film")
+        self.assertEqual(self.data.render("actor", "female"), "stage actress")
+        # after removing all overlays, the base data is used again:
+        self.data.remove_overlay("theater")
+        self.assertEqual(self.data.render("actor", "female"), "actress")
+        self.assertEqual(self.data.render("crew_member", "female"), "crew member")
+        self.assertEqual(self.data.merged, {})
+        with self.assertRaises(KeyError):
+            self.data.remove_overlay("theater")
+
+    def test_get_overlay_names(self):
+        self.assertEqual(self.data.get_overlay_names(), [])
+        self.data.add_overlay("theater", self.overlay)
+        self.data.add_overlay("film", {})
+        self.assertEqual(self.data.get_overlay_names(), ["theater", "film"])
+
+    def test_update_words(self):
+        self.data.render("actor", "female")
+        # changing an overlay directly only takes effect once its words are updated:
+        self.data.overlays["theater"] = self.overlay
+        self.assertEqual(self.data.render("actor", "female"), "actress")
+        self.data.update_words({"actor"})
+        self.assertEqual(self.data.render("actor", "female"), "stage actress")
+        self.assertEqual(set(self.data.merged), {"actor"})
+        # the rendered versions of words that are no longer defined anywhere are not kept:
+        self.data.render("crew_member", "female")
+        self.data.update_words({"crew_member"})
+        self.assertIn("crew_member", self.data.rendered_versions)
+        del self.data.overlays["theater"]
+        self.data.update_words({"actor", "crew_member"})
+        self.assertEqual(set(self.data.rendered_versions), {"actor"})
+
+    def test_get(self):
+        self.assertIs(self.data.get("actor"), self.base["actor"])
+        self.assertIsNone(self.data.get("crew_member"))
+        self.data.add_overlay("theater", self.overlay)
+        self.assertEqual(self.data.get("actor"), self.overlay["actor"])
+        self.assertEqual(self.data.get("crew_member"), self.overlay["crew_member"])
+        self.assertIs(self.data.get("actress"), self.base["actress"])
+
+    def test_render_versions(self):
+        self.assertEqual(self.data.render_versions("actor"),
+                         {"female": "actress", "male": "actor", "neutral": "actor"})
+        self.assertEqual(self.data.render_versions("chair_man"),
+                         {"female": "chair person", "male": "chair man", "neutral": "chair person"})
+        self.assertEqual(self.data.render_versions("wuwu_wu"),
+                         {"female": "wuwu wu", "male": "wuwu wu", "neutral": "wuwu wu"})
+
+    def test_render(self):
+        self.assertEqual(self.data.render("actress", "male"), "actor")
+        self.assertEqual(self.data.render("actress", "female"), "actress")
+        # the rendered versions of every word are computed once:
+        self.assertEqual(set(self.data.rendered_versions), {"actress"})
+        # words that are not in the noun data are rendered as they are, but not stored, so that rendering lots of
+        # different unknown words does not fill up the memory:
+        self.assertEqual(self.data.render("wuwu", "neutral"), "wuwu")
+        self.assertEqual(self.data.render("wuwu_wu", "female"), "wuwu wu")
+        self.assertEqual(set(self.data.rendered_versions), {"actress"})
+        self.data.add_overlay("wuwu", {"wuwu": {"gender": "neutral", "gender_map": {"female": "wawa"}}})
+        self.assertEqual(self.data.render("wuwu", "female"), "wawa")
+        self.assertEqual(set(self.data.rendered_versions), {"actress", "wuwu"})
+
 
 class TestGenderedNoun(unittest.TestCase):
 
@@ -795,6 +1023,12 @@ class TestGenderedNoun(unittest.TestCase):
             n = gn.GenderedNoun("Bishop")
         self.assertEqual(n.word, "Bishop")
 
+    def test__hash__(self):
+        # equal nouns hash equally, so they can be used as dictionary keys:
+        self.assertEqual(hash(gn.GenderedNoun("actor")), hash(gn.GenderedNoun("actor")))
+        self.assertEqual({gn.GenderedNoun("actor"): 1}[gn.GenderedNoun("actor")], 1)
+        self.assertNotIn(gn.GenderedNoun("actress"), {gn.GenderedNoun("actor"): 1})
+
     def test_render_noun(self):
         with warnings.catch_warnings(record=True) as w:
             # every test case refers to a specific type of lookup-scenario; and every test case has ana additional test
@@ -36,6 +36,18 @@ class TestGlobalCapitalizationSystem(unittest.TestCase):
         self.assertFalse(gcs.islower("Wuuu"))  # <-- some upper-case letters
         self.assertFalse(gcs.islower("Wu11"))  # <-- ^ plus some non-capitalizable letters
 
+    def test_studly_caps(self):
+        # starting with an upper-case or a lower-case character:
+        self.assertEqual(gcs.studly_caps("foobar", first_char_is_upper=True), "FoObAr")
+        self.assertEqual(gcs.studly_caps("foobar", first_char_is_upper=False), "fOoBaR")
+        # non-capitalizable characters and empty strings:
+        self.assertEqual(gcs.studly_caps("f1o2o", first_char_is_upper=True), "F1O2O")
+        self.assertEqual(gcs.studly_caps("", first_char_is_upper=True), "")
+        # characters are cased one by one, even if their case mapping changes their length or depends on context:
+        self.assertEqual(gcs.studly_caps("ßaß", first_char_is_upper=True), "SSaSS")
+        self.assertEqual(gcs.studly_caps("ΑΣ", first_char_is_upper=False), "αΣ")
+        self.assertEqual(gcs.studly_caps("ΣΣΣ", first_char_is_upper=True), "ΣσΣ")
+
     def test_get_capitalization_from_context_value(self):
         # lower-case:
         self.assertEqual(gcs.get_capitalization_from_context_value("wuwu"), "lower-case")  # <-- standard
@@ -43,6 +55,7 @@ class TestGlobalCapitalizationSystem(unittest.TestCase):
         self.assertEqual(gcs.get_capitalization_from_context_value("1w  "), "lower-case")  # <-- != studly-caps
         self.assertEqual(gcs.get_capitalization_from_context_value("1uwu"), "lower-case")  # <-- != capitalized
         self.assertEqual(gcs.get_capitalization_from_context_value("1111"), "lower-case")  # <-- is the default
+        self.assertEqual(gcs.get_capitalization_from_context_value(""), "lower-case")  # <-- also for empty values
 
         # capitalized:
         self.assertEqual(gcs.get_capitalization_from_context_value("Wuwu"), "capitalized")  # <-- standard
@@ -69,6 +82,17 @@ class TestGlobalCapitalizationSystem(unittest.TestCase):
         with self.assertRaises(err.InvalidCapitalizationError):
             gcs.get_capitalization_from_context_value("wu1U")
 
+        # results agree with the `is_applied`-functions of the capitalization table, tried in order:
+        for context_value in ["wuwu", "Wuwu", "WUWU", "WuWu", "wUwU", "W", "w", "1", "wuUU", "ǅa", "ßS", "aΣ", "Σa"]:
+            for capitalization_type_name, capitalization_method in gcs.CAPITALIZATION_TABLE.items():
+                if capitalization_method.is_applied(context_value):
+                    self.assertEqual(gcs.get_capitalization_from_context_value(context_value),
+                                     capitalization_type_name)
+                    break
+            else:
+                with self.assertRaises(err.InvalidCapitalizationError):
+                    gcs.get_capitalization_from_context_value(context_value)
+
     def test_assign_and_check_capitalization_value_of_tag(self):
         # erroneous inputs:
 
@@ -195,3 +219,16 @@ class TestGlobalCapitalizationSystem(unittest.TestCase):
             backup = copy.deepcopy(inp)
             self.assertEqual(gcs.apply_capitalization_to_tag(inp), out)
             self.assertEqual(inp, backup)
+
+    def test_apply_capitalization(self):
+        # applies the capitalization methods from the capitalization table:
+        for capitalization_type_name, capitalization_method in gcs.CAPITALIZATION_TABLE.items():
+            for value in ["foo", "FOO", "fO1", "", "ßoß"]:
+                self.assertEqual(gcs.apply_capitalization(value, capitalization_type_name),
+                                 capitalization_method.apply(value))
+
+        # results are cached:
+        gcs.apply_capitalization.cache_clear()
+        gcs.apply_capitalization("they", "capitalized")
+        self.assertEqual(gcs.apply_capitalization("they", "capitalized"), "They")
+        self.assertEqual(gcs.apply_capitalization.cache_info().hits, 1)
@@ -7,6 +7,7 @@ import warnings
 import src.warnings as ws
 import src.errors as err
 import src.gender_nouns as gn
+import src.handle_context_values as hcv
 from src.handle_context_values import ContextValues
 
 
@@ -123,6 +124,56 @@ class TestContextValues(unittest.TestCase):
         # error if value has no default value and is not defined:
         self.assertRaises(err.MissingInformationError, lambda: ContextValues.get_value({"foo": {}}, "foo", "subject"))
 
+    def test_resolve_default_values(self):
+        grpd = {"foo": {"subject": "xe"}, "bar": {"gender-addressing": "f", "gender-nouns": "male"}}
+        resolved_grpd, defaulted_properties = ContextValues.resolve_default_values(grpd)
+        self.assertEqual(resolved_grpd, {"foo": {"subject": "xe", "gender-addressing": "t", "gender-nouns": "neutral"},
+                                         "bar": {"gender-addressing": "f", "gender-nouns": "male"}})
+        self.assertEqual(defaulted_properties, {"foo": frozenset({"gender-addressing", "gender-nouns"})})
+        # only the individual pronoun data that misses default values is copied:
+        self.assertEqual(grpd["foo"], {"subject": "xe"})
+        self.assertIs(resolved_grpd["bar"], grpd["bar"])
+
+        # the resolved values are what `get_value` would return, but without raising warnings:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            for prop in ContextValues.default_values:
+                self.assertEqual(ContextValues.get_value(resolved_grpd, "foo", prop),
+                                 ContextValues.get_value(grpd, "foo", prop))
+            self.assertEqual(len(w), len(ContextValues.default_values))
+
+    def test_warn_about_default_values(self):
+        defaulted_properties = {"foo": frozenset({"gender-addressing", "gender-nouns"}),
+                                "bar": frozenset({"gender-nouns"})}
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            # properties the template does not require and ids it does not use are not warned about:
+            self.assertEqual(ContextValues.warn_about_default_values(
+                defaulted_properties, {"foo": frozenset({"subject"}), "bar": frozenset({"subject"})}), dict())
+            self.assertEqual(ContextValues.warn_about_default_values(
+                defaulted_properties, {"baz": frozenset({"gender-nouns"})}), dict())
+            self.assertEqual(w, [])
+
+            # all used default values are warned about in a single warning:
+            self.assertEqual(ContextValues.warn_about_default_values(
+                defaulted_properties, {"foo": frozenset({"address", "gender-addressing", "gender-nouns"})}),
+                {"foo": frozenset({"gender-addressing", "gender-nouns"})})
+            self.assertEqual(len(w), 1)
+            self.assertTrue(issubclass(w[0].category, ws.DefaultValueUsedWarning))
+            self.assertIn("\"gender-addressing\"-property of individuum \"foo\"", str(w[0].message))
+            self.assertIn("\"gender-nouns\"-property of individuum \"foo\"", str(w[0].message))
+
+            # tags without ids may refer to any id:
+            self.assertEqual(ContextValues.warn_about_default_values(
+                defaulted_properties, {None: frozenset({"gender-nouns"})}),
+                {"foo": frozenset({"gender-nouns"}), "bar": frozenset({"gender-nouns"})})
+            self.assertEqual(len(w), 2)
+            # and individual pronoun data is referred to by all tags:
+            self.assertEqual(ContextValues.warn_about_default_values(
+                {"": frozenset({"gender-nouns"})}, {"foo": frozenset({"gender-nouns"})}),
+                {"": frozenset({"gender-nouns"})})
+            self.assertEqual(len(w), 3)
+
     def test_value_is_allowed(self):
         # test for explicitly allowed values for properties with limited allowed values:
         self.assertTrue(ContextValues.value_is_allowed("gender-nouns", "male"))
@@ -155,10 +206,53 @@ class TestContextValues(unittest.TestCase):
         original_value = ContextValues.properties_to_canonical_property
         ContextValues.initialize()
         self.assertEqual(original_value, ContextValues.properties_to_canonical_property)
+        # the derived frozen set and descriptors are initialized as well:
+        self.assertEqual(ContextValues.canonical_properties_that_directly_map_between_template_and_pronoun_data_set,
+                         set(ContextValues.canonical_properties_that_directly_map_between_template_and_pronoun_data))
+        self.assertEqual(set(ContextValues.property_descriptors.keys()),
+                         set(ContextValues.properties_to_canonical_property.keys()))
         # fix an issue we have with code coverage due to `initialize` not taking any arguments:
         initialize_fkt = ContextValues.initialize
         ContextValues.initialize = initialize_fkt
 
+    def test_classify(self):
+        # properties that are not custom properties:
+        self.assertEqual(ContextValues.classify("they"), ("subject", False, False, False, False, None))
+        self.assertEqual(ContextValues.classify("subject"), ("subject", False, False, False, True, None))
+        self.assertEqual(ContextValues.classify("gender-nouns"),
+                         ("gender-nouns", False, False, False, False, frozenset({"female", "male", "neutral"})))
+        self.assertIs(ContextValues.classify("they"), ContextValues.classify("they"))
+
+        # custom properties (and nouns, which are not distinguishable from them by name):
+        self.assertEqual(ContextValues.classify("wuwu"), ("<wuwu>", True, False, False, False, None))
+        self.assertEqual(ContextValues.classify("_wuwu"), ("<wuwu>", True, True, False, False, None))
+        self.assertEqual(ContextValues.classify("<wuwu>"), ("<wuwu>", True, True, True, True, None))
+
+        # the descriptors agree with the individual classification methods:
+        for property_name in ["they", "subject", "gender-addressing", "wuwu", "_wuwu", "<wuwu>", "carpenter"]:
+            descriptor = ContextValues.classify(property_name)
+            self.assertEqual(descriptor.canonical, ContextValues.get_canonical(property_name, is_from_tag=False))
+            self.assertEqual(descriptor.is_custom, ContextValues.is_a_custom_value(property_name))
+            self.assertEqual(descriptor.uses_special_custom_value_syntax,
+                             ContextValues.uses_special_custom_value_syntax(property_name))
+            self.assertEqual(descriptor.is_custom_property_defined_in_a_tag,
+                             ContextValues.is_a_custom_property_defined_in_a_tag(property_name))
+
+    def test_classify_custom_property(self):
+        # descriptors of custom properties are cached:
+        ContextValues.classify_custom_property.cache_clear()
+        self.assertIs(ContextValues.classify_custom_property("wuwu"), ContextValues.classify_custom_property("wuwu"))
+        self.assertEqual(ContextValues.classify_custom_property.cache_info().hits, 1)
+
+        # ...but only a bounded amount of them:
+        for i in range(hcv.MAX_CACHED_CUSTOM_PROPERTIES + 10):
+            ContextValues.classify_custom_property("wuwu" + str(i))
+        self.assertEqual(ContextValues.classify_custom_property.cache_info().currsize,
+                         hcv.MAX_CACHED_CUSTOM_PROPERTIES)
+
+        # this also classifies names of properties that are not custom properties as if they were custom ones:
+        self.assertEqual(ContextValues.classify_custom_property("subject").canonical, "<subject>")
+
     def test_property_maps_directly_between_template_and_pronoun_data(self):
         # return True for all non-custom properties that map directly:
         self.assertTrue(ContextValues.property_maps_directly_between_template_and_pronoun_data("subject"))
@@ -0,0 +1,137 @@
+import unittest
+import threading
+
+from src.instrumentation import InstrumentationManager, StageTiming, StageHistogram, percentile
+from src.parse_templates import GRParser
+from src.render_pipeline import GRenderer
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile([3.0], 90), 3)
+
+
+class TestInstrumentationManager(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        InstrumentationManager.hooks = tuple()
+
+    def test_add_hook(self):
+        timings = list()
+        InstrumentationManager.add_hook(timings.append)
+        self.assertEqual(InstrumentationManager.hooks, (timings.append,))
+        InstrumentationManager.add_hook(print)
+        self.assertEqual(InstrumentationManager.hooks, (timings.append, print))
+
+    def test_remove_hook(self):
+        InstrumentationManager.add_hook(print)
+        InstrumentationManager.add_hook(repr)
+        InstrumentationManager.remove_hook(print)
+        self.assertEqual(InstrumentationManager.hooks, (repr,))
+        self.assertRaises(ValueError, lambda: InstrumentationManager.remove_hook(print))
+
+    def test_hooked(self):
+        timings = list()
+        with InstrumentationManager.hooked(timings.append) as hook:
+            self.assertEqual(hook, timings.append)
+            self.assertEqual(InstrumentationManager.hooks, (timings.append,))
+        self.assertEqual(InstrumentationManager.hooks, tuple())
+
+        # the hook is also removed if the block raises an error:
+        with self.assertRaises(KeyError):
+            with InstrumentationManager.hooked(timings.append):
+                raise KeyError
+        self.assertEqual(InstrumentationManager.hooks, tuple())
+
+    def test_run_stage(self):
+        timings = list()
+        with InstrumentationManager.hooked(timings.append):
+            # returns the result of the stage and reports its timing:
+            self.assertEqual(InstrumentationManager.run_stage("parse", 4, None, GRParser.parse_gr_template_from_str,
+                                                              "{a}b"), ["", [("", ["a"])], "b"])
+            self.assertEqual(InstrumentationManager.run_stage("render", 3, 1, GRenderer.convert_to_string,
+                                                              ["a", {"context": "b"}, "c"], {}), "abc")
+        self.assertEqual([t[:2] + t[3:] for t in timings], [("parse", "parse_gr_template_from_str", 4, 1),
+                                                             ("render", "convert_to_string", 3, 1)])
+        self.assertTrue(all(t.duration >= 0 for t in timings))
+
+    def test_pipelines(self):
+        # the pipelines report all of their stages (and the number of tags after each parsing stage):
+        timings = list()
+        with InstrumentationManager.hooked(timings.append):
+            parsed_template = GRParser.full_parsing_pipeline("{they them} {id:foo*Actor}")
+            self.assertEqual(GRenderer.render_with_full_rendering_pipeline(
+                parsed_template, frozenset({"foo"}), True,
+                {"foo": {"gender-nouns": "male"}, "bar": {"subject": "xe", "object": "xem"}}),
+                "xe xem Actor")
+        self.assertEqual([(t.pipeline, t.stage, t.template_size, t.tag_count) for t in timings], [
+            ("parse", "parse_gr_template_from_str", 26, 2),
+            ("parse", "assign_types_to_all_sections", 26, 2),
+            ("parse", "split_tags_with_multiple_context_values", 26, 3),
+            ("parse", "make_sure_that_sections_dont_exceed_allowed_amount_of_values", 26, 3),
+            ("parse", "convert_tags_to_indexable_dicts", 26, 3),
+            ("parse", "set_capitalization_value_for_all_tags", 26, 3),
+            ("parse", "convert_context_values_to_canonicals", 26, 3),
+            ("render", "id_resolution", 7, 3),
+            ("render", "resolve_addressing", 7, 3),
+            ("render", "actually_render_context_values", 7, 3),
+            ("render", "apply_capitalization", 7, 3),
+            ("render", "convert_to_string", 7, 3)
+        ])
+
+        # nothing is reported without hooks:
+        GRParser.full_parsing_pipeline("{they}")
+        self.assertEqual(len(timings), 12)
+
+
+class TestStageHistogram(unittest.TestCase):
+
+    def test__init__(self):
+        histogram = StageHistogram()
+        self.assertEqual(len(histogram.bucket_bounds), 15)
+        self.assertAlmostEqual(histogram.bucket_bounds[0], 1e-7)
+        self.assertAlmostEqual(histogram.bucket_bounds[-1], 1)
+        self.assertEqual(StageHistogram([1, 2]).bucket_bounds, (1, 2))
+        self.assertEqual(histogram.histograms, dict())
+
+    def test_get_histogram(self):
+        histogram = StageHistogram([1, 2])
+        for duration in (0.5, 1, 1.5, 3):
+            histogram(StageTiming("render", "foo", duration, 10, 2))
+        self.assertEqual(histogram.get_histogram("render", "foo"),
+                         {"count": 4, "total": 6.0, "max": 3, "tags": 8, "buckets": [2, 1, 1]})
+        # the returned histogram is a copy:
+        histogram.get_histogram("render", "foo")["buckets"][0] = 5
+        self.assertEqual(histogram.get_histogram("render", "foo")["buckets"], [2, 1, 1])
+        self.assertRaises(KeyError, lambda: histogram.get_histogram("parse", "foo"))
+
+    def test_summary(self):
+        histogram = StageHistogram()
+
+        # used as a hook from several threads:
+        def render():
+            for _ in range(20):
+                GRenderer.render_with_full_rendering_pipeline(["a", {"context": "subject",
+                                                                     "capitalization": "lower-case"}, ""],
+                                                              frozenset(), True, {"foo": {"subject": "xe"}})
+        with InstrumentationManager.hooked(histogram):
+            threads = [threading.Thread(target=render) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        summary = histogram.summary()
+        self.assertEqual(sorted(summary.keys()), [
+            "render/actually_render_context_values", "render/apply_capitalization", "render/convert_to_string",
+            "render/id_resolution", "render/resolve_addressing"])
+        for stage_histogram in summary.values():
+            self.assertEqual(stage_histogram["count"], 80)
+            self.assertEqual(sum(stage_histogram["buckets"]), 80)
+            self.assertEqual(stage_histogram["tags"], 80)
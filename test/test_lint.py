@@ -0,0 +1,146 @@
+import unittest
+import os
+import io
+import contextlib
+import tempfile
+
+import src.warnings as ws
+import src.errors as err
+from src.parse_templates import GRParser
+import src.lint as lint
+from src.lint import LintMessage
+
+# templates to lint, by their path relative to the linted directory:
+
+TEMPLATES = {
+    "valid.gr": "Hello {Mr_s} {Name}, {they} {actor}!",
+    "emails/broken.gr": "Hi {foo:they}, }\n{id:a b*them} {they",
+    "emails/ignored.txt": "{",
+}
+
+
+class TestLint(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.templates_dir = os.path.join(self.directory.name, "templates")
+        for path, template in TEMPLATES.items():
+            path = os.path.join(self.templates_dir, *path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(template)
+        self.broken = os.path.join(self.templates_dir, "emails", "broken.gr")
+        self.expected_for_broken = [
+            (1, 4, "SyntaxPostprocessingError"),
+            (1, 16, "SyntaxError"),
+            (2, 1, "SyntaxPostprocessingError"),
+            (2, 20, "SyntaxError")
+        ]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    @staticmethod
+    def positions_and_errors(messages):
+        return [(message.line, message.column, message.error) for message in messages]
+
+    def test_format_message(self):
+        self.assertEqual(lint.format_message(LintMessage("a.gr", 3, 17, "SyntaxError", "Foo.")),
+                         "a.gr:3:17: SyntaxError: Foo.")
+
+    def test_is_error(self):
+        self.assertTrue(lint.is_error(LintMessage("a.gr", 1, 1, "SyntaxPostprocessingError", "Foo.")))
+        self.assertFalse(lint.is_error(LintMessage("a.gr", 1, 1, "NotAPersonNounWarning", "Foo.")))
+
+    def test_lint_tag(self):
+        self.assertEqual(lint.lint_tag("{they}"), [])
+        # syntax errors are reported where they occur, and post-processing errors at the start of the tag:
+        self.assertEqual([(index, error) for index, error, message in lint.lint_tag("{they:}")],
+                         [(6, "SyntaxError")])
+        self.assertEqual([(index, error) for index, error, message in lint.lint_tag("{foo:they}")],
+                         [(0, "SyntaxPostprocessingError")])
+        self.assertEqual([(index, error) for index, error, message in lint.lint_tag("{capitalization:foo*they}")],
+                         [(0, "InvalidCapitalizationError")])
+        # with the messages the parser would raise them with:
+        with self.assertRaises(err.SyntaxPostprocessingError) as context:
+            GRParser.full_parsing_pipeline("{foo:they}")
+        self.assertEqual(lint.lint_tag("{foo:they}")[0][2], str(context.exception))
+        # syntax errors include their details:
+        with self.assertRaises(err.SyntaxError) as context:
+            GRParser.full_parsing_pipeline("{they:}")
+        self.assertEqual(lint.lint_tag("{they:}")[0][2], "The given gender*render template has invalid syntax ("
+                         + context.exception.details + ").")
+
+    def test_lint_template(self):
+        self.assertEqual(lint.lint_template("Hello {Mr_s} {they}!"), [])
+        # all errors are reported, with their lines and columns:
+        messages = lint.lint_template(TEMPLATES["emails/broken.gr"], "broken.gr")
+        self.assertEqual(self.positions_and_errors(messages), self.expected_for_broken)
+        self.assertTrue(all(message.file == "broken.gr" for message in messages))
+
+        # warnings are reported at the start of the tag they are raised for, unless they are disabled:
+        self.assertEqual(self.positions_and_errors(lint.lint_template("Hi\n a {chair}.")),
+                         [(2, 4, "NotAPersonNounWarning")])
+        self.assertIn("\"chair\"", lint.lint_template("Hi\n a {chair}.")[0].message)
+        self.assertEqual(lint.lint_template("Hi\n a {chair}.", warning_settings=ws.DISABLE_ALL_WARNINGS), [])
+
+        # unclosed tags end where the next tag starts, and escaped braces are not tags:
+        self.assertEqual(self.positions_and_errors(lint.lint_template("{they {capitalization:foo*they} \\{ \\}")),
+                         [(1, 7, "SyntaxError"), (1, 7, "InvalidCapitalizationError")])
+        # a trailing escape character is reported as well:
+        self.assertEqual(self.positions_and_errors(lint.lint_template("a\nbc\\")), [(2, 4, "SyntaxError")])
+        self.assertEqual(lint.lint_template("a\nbc\\\\"), [])
+
+        # templates without errors according to the linter can be parsed, and vice versa:
+        for template in ("{they}", "{they", "}", "a\\", "{id:a b*they}", "{foo:they}", "\\{they}"):
+            self.assertEqual(lint.lint_template(template, warning_settings=ws.DISABLE_ALL_WARNINGS) == [],
+                             self.can_be_parsed(template))
+
+    @staticmethod
+    def can_be_parsed(template):
+        try:
+            GRParser.full_parsing_pipeline(template)
+        except err.SyntaxError:
+            return False
+        return True
+
+    def test_lint_file(self):
+        self.assertEqual(self.positions_and_errors(lint.lint_file(self.broken, ws.DISABLE_ALL_WARNINGS)),
+                         self.expected_for_broken)
+        self.assertTrue(all(message.file == self.broken for message in lint.lint_file(self.broken)))
+
+    def test_lint_directory(self):
+        for processes in (1, 2):
+            messages = lint.lint_directory(self.templates_dir, processes, ws.DISABLE_ALL_WARNINGS)
+            # only .gr-files are linted:
+            self.assertEqual(set(message.file for message in messages), {self.broken})
+            self.assertEqual(self.positions_and_errors(messages), self.expected_for_broken)
+
+    def run_main(self, *args):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exit_code = lint.main(list(args))
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_make_argument_parser(self):
+        args = lint.make_argument_parser().parse_args(["a.gr", "templates", "-j", "4", "--no-warnings"])
+        self.assertEqual((args.paths, args.jobs, args.no_warnings), (["a.gr", "templates"], 4, True))
+
+    def test_main(self):
+        exit_code, stdout, stderr = self.run_main(self.templates_dir, "-j", "1", "--no-warnings")
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(len(stdout.splitlines()), len(self.expected_for_broken))
+        self.assertTrue(stdout.startswith(self.broken + ":1:4: SyntaxPostprocessingError: "))
+        self.assertEqual(self.run_main(os.path.join(self.templates_dir, "valid.gr"), "--no-warnings"), (0, "", ""))
+        # warnings are printed, but are not errors:
+        chair = os.path.join(self.directory.name, "chair.gr")
+        with open(chair, "w") as f:
+            f.write("a {chair}")
+        self.assertEqual(self.run_main(chair), (0, chair + ":1:3: NotAPersonNounWarning: \"chair\" is not a hyponym "
+                                                + "for person, so gender*render might not be able to gender it "
+                                                + "correctly.\n", ""))
+        # invalid arguments:
+        self.assertEqual(self.run_main(self.templates_dir, "-j", "0")[0], 2)
+        self.assertEqual(self.run_main(os.path.join(self.templates_dir, "missing.gr"))[0], 2)
+
@@ -0,0 +1,176 @@
+import unittest
+import threading
+import warnings
+from unittest import mock
+
+import src.parse_cache as pc
+import src.warnings as ws
+import src.parse_templates as pt
+from src.parse_templates import GRParser
+
+
+class TestParseCache(unittest.TestCase):
+
+    def test_get_key(self):
+        self.assertEqual(pc.get_key("{they}"), pc.get_key("{" + "they}"))
+        self.assertNotEqual(pc.get_key("{they}"), pc.get_key("{them}"))
+        self.assertEqual(len(pc.get_key("")), 32)
+
+        # keys depend on the parser version:
+        key = pc.get_key("{they}")
+        pt.PARSER_VERSION += 1
+        try:
+            self.assertNotEqual(pc.get_key("{they}"), key)
+        finally:
+            pt.PARSER_VERSION -= 1
+
+    def test_parse(self):
+        parsed_template = GRParser.full_parsing_pipeline("a {id:foo*they} b {them}")
+        self.assertEqual(pc.parse("a {id:foo*they} b {them}"),
+                         (tuple(GRParser.to_compact_template(parsed_template)), frozenset({"foo"}), True,
+                          {"foo": frozenset({"subject"}), None: frozenset({"object"})}, ()))
+        self.assertEqual(pc.parse("text").contains_unspecified_ids, False)
+
+    def test_to_cached_template(self):
+        parsed_template = GRParser.full_parsing_pipeline("a {id:foo*they} b {Actor}")
+        cached_template = pc.to_cached_template(parsed_template)
+        self.assertEqual(cached_template, pc.parse("a {id:foo*they} b {Actor}"))
+        self.assertIs(type(cached_template.compact_template), tuple)
+        self.assertEqual(GRParser.from_compact_template(cached_template.compact_template), parsed_template)
+
+    def test_parse_for_cache(self):
+        # stores the warnings (but not the logging) raised while parsing, even if they are disabled:
+        ws.WarningManager.set_warning_settings(ws.DISABLE_ALL_WARNINGS | {ws.GRSyntaxParsingLogging})
+        with ws.WarningManager.collecting() as collector:
+            cached_template = pc.parse_for_cache("{wuwuwu} {they} {wuwuwu}")
+        self.assertEqual(cached_template[:4], pc.parse("{wuwuwu} {they} {wuwuwu}")[:4])
+        self.assertEqual(len(cached_template.parse_warnings), 2)
+        self.assertTrue(all(issubclass(warning_type, ws.NotAWordWarning)
+                            for warning_type, _ in cached_template.parse_warnings))
+        # and raises them as far as they are enabled, logging included:
+        self.assertEqual({w["warning"] for w in collector.get_warnings()}, {"GRSyntaxParsingLogging"})
+        # (the warning settings are restored afterwards):
+        self.assertEqual(ws.WarningManager.warning_settings_by_thread_id[threading.get_ident()],
+                         ws.DISABLE_ALL_WARNINGS | {ws.GRSyntaxParsingLogging})
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+        # warnings raised before an error are raised as well:
+        def parse_and_fail(template):
+            ws.WarningManager.raise_warning(template, ws.NotAWordWarning)
+            raise ValueError
+
+        with mock.patch.object(pc, "parse", parse_and_fail), self.assertWarns(ws.NotAWordWarning):
+            self.assertRaises(ValueError, lambda: pc.parse_for_cache("wuwuwu"))
+
+    def test_raise_parse_warnings(self):
+        parse_warnings = ((ws.NotAWordWarning, "a"), (ws.NotANounWarning, "b"))
+        with ws.WarningManager.collecting() as collector:
+            pc.raise_parse_warnings(parse_warnings)
+            ws.WarningManager.set_warning_settings(ws.DISABLE_ALL_WARNINGS)
+            pc.raise_parse_warnings(parse_warnings)
+            ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+        self.assertEqual(collector.get_warnings(), [{"warning": "NotAWordWarning", "message": "a", "count": 1},
+                                                    {"warning": "NotANounWarning", "message": "b", "count": 1}])
+
+    def test_estimate_size(self):
+        small = pc.estimate_size(pc.parse("{they}"))
+        large = pc.estimate_size(pc.parse("{they} " * 10 + "text" * 100))
+        self.assertGreater(small, 0)
+        self.assertGreater(large, small + 400)
+
+    def test__init__(self):
+        cache = pc.ParseCache(max_bytes=1000, max_entries=2)
+        self.assertEqual((cache.max_bytes, cache.max_entries, cache.enabled), (1000, 2, True))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0})
+
+    def test_get(self):
+        cache = pc.ParseCache()
+        first = cache.get("a {they} b")
+        self.assertEqual(first, pc.parse("a {they} b"))
+        self.assertIs(cache.get("a {they} b"), first)
+        cache.get("a {them} b")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 2, 2))
+        self.assertEqual(stats["bytes"], pc.estimate_size(first) + pc.estimate_size(pc.parse("a {them} b")))
+
+        # templates with errors are not cached:
+        for _ in range(2):
+            self.assertRaises(Exception, lambda: cache.get("{they"))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+        # a disabled cache always parses:
+        cache.enabled = False
+        self.assertIsNot(cache.get("a {they} b"), first)
+        self.assertEqual(cache.get("{their}"), pc.parse("{their}"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+        # templates larger than the whole cache are not cached:
+        cache = pc.ParseCache(max_bytes=10)
+        cache.get("{they}")
+        self.assertEqual(cache.stats()["entries"], 0)
+
+        # the cache can be used from several threads at once:
+        cache = pc.ParseCache(max_entries=5)
+        results = list()
+
+        def get_all():
+            results.append([cache.get("{they} " + str(i % 8)) for i in range(40)])
+
+        threads = [threading.Thread(target=get_all) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for result in results:
+            self.assertEqual(result, [pc.parse("{they} " + str(i % 8)) for i in range(40)])
+        stats = cache.stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 8 * 40)
+        self.assertLessEqual(stats["entries"], 5)
+
+    def test_evict(self):
+        cache = pc.ParseCache(max_entries=2)
+        cache.get("{they}")
+        cache.get("{them}")
+        cache.get("{they}")
+        cache.get("{their}")
+        # the least recently used template was evicted:
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertIn(pc.get_key("{they}"), cache.entries)
+        self.assertNotIn(pc.get_key("{them}"), cache.entries)
+
+        # evicting by size:
+        size = pc.estimate_size(pc.parse("{they}"))
+        cache = pc.ParseCache(max_bytes=2 * size)
+        for template in ("{they}", "{them}", "{Them}"):
+            cache.get(template)
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertLessEqual(cache.stats()["bytes"], 2 * size)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        cache.max_entries = 0
+        with cache.lock:
+            cache.evict()
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_clear(self):
+        cache = pc.ParseCache(max_entries=1)
+        cache.get("{they}")
+        cache.get("{they}")
+        cache.get("{them}")
+        cache.clear()
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0})
+
+    def test_stats(self):
+        cache = pc.ParseCache(max_entries=1)
+        cache.get("{they}")
+        cache.get("{they}")
+        cache.get("{them}")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "evictions": 1, "entries": 1,
+                                         "bytes": pc.estimate_size(pc.parse("{them}"))})
+
+
+if __name__ == '__main__':
+    unittest.main()
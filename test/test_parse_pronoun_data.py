@@ -291,3 +291,50 @@ class TestGRPDParser(unittest.TestCase):
         # error for doubled information
         self.assertRaises(err.DoubledInformationError,
                           lambda: ppd.GRPDParser.full_parsing_pipeline({"foo": {"they": "a", "subj": "b"}}))
+
+    def test_add_canonical_property(self):
+        new_idpd = dict()
+        self.assertFalse(ppd.GRPDParser.add_canonical_property("foo", "they", "xe", new_idpd))
+        self.assertTrue(ppd.GRPDParser.add_canonical_property("foo", "wuwu", "wawa", new_idpd))
+        self.assertEqual(new_idpd, {"subject": "xe", "<wuwu>": "wawa"})
+
+        # errors for doubled and invalid information:
+        self.assertRaises(err.DoubledInformationError,
+                          lambda: ppd.GRPDParser.add_canonical_property("foo", "subj", "xe", new_idpd))
+        self.assertRaises(err.InvalidInformationError,
+                          lambda: ppd.GRPDParser.add_canonical_property("foo", "gender-nouns", "fufu", new_idpd))
+        self.assertEqual(new_idpd, {"subject": "xe", "<wuwu>": "wawa"})
+
+    def test_warn_about_unknown_property(self):
+        with self.assertWarns(ws.UnknownPropertyWarning):
+            ppd.GRPDParser.warn_about_unknown_property("foo")
+
+    def test_validate_and_canonicalize(self):
+        # behaves exactly like the three pipeline steps it does in a single pass, including errors and warnings:
+        def staged_pipeline(pd):
+            pd = ppd.GRPDParser.return_pd_if_it_is_valid(pd)
+            pd = ppd.GRPDParser.pd_dict_to_grpd_dict(pd)
+            return ppd.GRPDParser.grpd_dict_to_canonical_grpd_dict(pd)
+
+        def outcome(f, pd):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                try:
+                    result = f(pd)
+                except err.InvalidPDError as e:
+                    result = (type(e), str(e))
+            return result, [(raised_warning.category, str(raised_warning.message)) for raised_warning in w]
+
+        test_values = [inp for _, inp in VALID_IDPDS + VALID_GRPDS] + [
+            "foo", {"a": "foo", "b": ["a"]}, {"a": {"c": "bar"}, "b": 1}, {"": {"they": "xe"}}, {"": "xe"},
+            {"foo": {"wuwu": "wawa"}, "bar": {"_wuwu": "wawa", "wiwi": "wowo"}}, {"wuwu": "wawa", "they": "xe"},
+            # canonicalization errors and warnings are only raised once the pronoun data is known to be valid:
+            {"foo": {"they": "a", "subj": "b"}, "bar": {"they": 1}},
+            {"foo": {"wuwu": "wawa"}, "bar": {"they": 1}},
+            {"they": "a", "subj": "b", "them": ["c"]},
+            # only the first canonicalization error is raised, and warnings before it are raised as well:
+            {"foo": {"wuwu": "wawa", "gender-nouns": "fufu"}, "bar": {"they": "a", "subj": "b", "wiwi": "wowo"}},
+            {"wuwu": "wawa", "they": "a", "subj": "b", "gender-nouns": "fufu"}
+        ]
+        for pd in test_values:
+            self.assertEqual(outcome(ppd.GRPDParser.validate_and_canonicalize, pd), outcome(staged_pipeline, pd))
@@ -2,6 +2,7 @@
 import unittest
 import string
 import copy
+import pickle
 from typing import List, Tuple
 
 from test import check_type
@@ -210,6 +211,28 @@ class TestSectionTypes(unittest.TestCase):
                           lambda: pt.SectionTypes.create_section_types_for_untyped_tag(["capitalization", "id"]))
 
 
+class TestLineIndex(unittest.TestCase):
+
+    def test__init__(self):
+        self.assertEqual(pt.LineIndex("").line_starts, [0])
+        self.assertEqual(pt.LineIndex("wuwu\nwawa\n\nfufu").line_starts, [0, 5, 10, 11])
+
+    def test_get_position(self):
+        line_index = pt.LineIndex("wuwu\nwawa\n\nfufu")
+        self.assertEqual(line_index.get_position(0), (1, 1))
+        self.assertEqual(line_index.get_position(4), (1, 5))
+        self.assertEqual(line_index.get_position(5), (2, 1))
+        self.assertEqual(line_index.get_position(10), (3, 1))
+        self.assertEqual(line_index.get_position(14), (4, 4))
+        # the end of the template:
+        self.assertEqual(line_index.get_position(15), (4, 5))
+
+    def test_get_line(self):
+        line_index = pt.LineIndex("wuwu\nwawa\n\nfufu")
+        self.assertEqual([line_index.get_line(i) for i in range(1, 5)], ["wuwu", "wawa", "", "fufu"])
+        self.assertEqual(pt.LineIndex("wuwu\n").get_line(2), "")
+
+
 class TestGRParser(unittest.TestCase):
 
     def test_parse_gr_template_from_str(self):
@@ -311,6 +334,33 @@ class TestGRParser(unittest.TestCase):
         # test error: tag closes without ever being opened:
         self.assertRaises(err.SyntaxError, lambda: pt.GRParser.parse_gr_template_from_str("wuwu}"))
 
+        # syntax errors carry the line and column (both starting at 1) they occur at:
+        with self.assertRaises(err.SyntaxError) as context:
+            pt.GRParser.parse_gr_template_from_str("wuwu\n{wawa:} fufu")
+        self.assertEqual(context.exception.args[1], ("unknown file", 2, 7, "{wawa:} fufu"))
+        # (and details on what went wrong, if there are any):
+        self.assertEqual(context.exception.args[0], "The given gender*render template has invalid syntax.")
+        self.assertIsInstance(context.exception.details, str)
+        with self.assertRaises(err.SyntaxError) as context:
+            pt.GRParser.parse_gr_template_from_str("wuwu {wawa")
+        self.assertIsNone(context.exception.details)
+
+    def test_try_to_parse_gr_template_from_str(self):
+        self.assertEqual(pt.GRParser.try_to_parse_gr_template_from_str("text {wuwu} test"),
+                         (["text ", [("", ["wuwu"])], " test"], None, 16, None))
+
+        # errors are returned with their message, the index they occur at and their details, along with what could be
+        #  parsed:
+        parsed_template, error_message, error_index, error_details = \
+            pt.GRParser.try_to_parse_gr_template_from_str("text {wuwu:}")
+        self.assertEqual((parsed_template, error_index), (["text ", [("wuwu", [])]], 11))
+        with self.assertRaises(err.SyntaxError) as context:
+            pt.GRParser.parse_gr_template_from_str("text {wuwu:}")
+        self.assertEqual((error_message, error_details), (context.exception.args[0], context.exception.details))
+
+        # errors that only show at the end of the template occur at its end:
+        self.assertEqual(pt.GRParser.try_to_parse_gr_template_from_str("wuwu {wawa")[2], 10)
+
     def test_assign_types_to_all_sections(self):
         # classic untyped single-section-tag:
         self.assertEqual(pt.GRParser.assign_types_to_all_sections(
@@ -652,6 +702,37 @@ class TestGRParser(unittest.TestCase):
             self.assertEqual(pt.GRParser.full_parsing_pipeline("{maid}"),
                              ["", {"context": gn.GenderedNoun("maid"), "capitalization": "lower-case"}, ""])
 
+    def test_to_compact_template(self):
+        parsed_template = pt.GRParser.full_parsing_pipeline("a {id:foo*They} b {Carpenter} c")
+        compact_template = pt.GRParser.to_compact_template(parsed_template)
+        self.assertEqual(compact_template, ["a ", pt.Tag("foo", "subject", "capitalized"), " b ",
+                                            pt.Tag(None, gn.GenderedNoun("carpenter"), "capitalized"), " c"])
+        # the original is not modified:
+        self.assertEqual(parsed_template[1], {"id": "foo", "context": "subject", "capitalization": "capitalized"})
+        self.assertEqual(pt.GRParser.to_compact_template(["text"]), ["text"])
+
+    def test_from_compact_template(self):
+        for template in ("a {id:foo*They} b {Carpenter} c", "text", "{them}{id:bar*THEIR}"):
+            parsed_template = pt.GRParser.full_parsing_pipeline(template)
+            self.assertEqual(pt.GRParser.from_compact_template(pt.GRParser.to_compact_template(parsed_template)),
+                             parsed_template)
+
+    def test_get_required_properties(self):
+        # test for template without tags:
+        self.assertEqual(pt.GRParser.get_required_properties(["woohoo"]), dict())
+
+        # context values that map directly to pronoun data are required as they are, by id (None for no id):
+        self.assertEqual(pt.GRParser.get_required_properties(
+            ["", {"id": "a", "context": "subject"}, "", {"id": "a", "context": "object"}, "",
+             {"id": "b", "context": "subject"}, "", {"context": "object"}, ""]),
+            {"a": frozenset({"subject", "object"}), "b": frozenset({"subject"}), None: frozenset({"object"})})
+
+        # addressing also requires the gender-addressing property, and gendered nouns the gender-nouns property:
+        self.assertEqual(pt.GRParser.get_required_properties(["", {"id": "a", "context": "address"}, ""]),
+                         {"a": frozenset({"address", "gender-addressing"})})
+        self.assertEqual(pt.GRParser.get_required_properties(["", {"context": gn.GenderedNoun("actor")}, ""]),
+                         {None: frozenset({"gender-nouns"})})
+
     def test_get_all_specified_id_values(self):
         # test for template without tags:
         self.assertEqual(pt.GRParser.get_all_specified_id_values(["woohoo"]), frozenset())
@@ -760,3 +841,40 @@ class TestReGRParser(unittest.TestCase):
 
         # test if special characters "\", "{", "}" in text are properly escaped, but whitespace, "*" and ":" are not:
         self.assertEqual(pt.ReGRParser.unparse_gr_template(["wuwu oo*l:ll{uu}o\\ "]), "wuwu oo*l:ll\\{uu\\}o\\\\ ")
+
+
+class TestTag(unittest.TestCase):
+
+    def test__init__(self):
+        tag = pt.Tag("f" + "oo", "sub" + "ject", "lower-case")
+        self.assertEqual((tag.id, tag.context, tag.capitalization), ("foo", "subject", "lower-case"))
+        # strings are interned:
+        self.assertIs(tag.context, pt.Tag(None, "subj" + "ect", "lower-case").context)
+        self.assertIs(tag.id, pt.Tag("fo" + "o", "object", "lower-case").id)
+        # gendered nouns are kept as they are:
+        noun = gn.GenderedNoun("actor")
+        self.assertIs(pt.Tag(None, noun, "lower-case").context, noun)
+        # tags are compact:
+        self.assertFalse(hasattr(tag, "__dict__"))
+
+    def test__setattr__(self):
+        tag = pt.Tag("foo", "subject", "lower-case")
+        for name in ("id", "context", "capitalization", "foo"):
+            with self.assertRaises(AttributeError):
+                setattr(tag, name, "bar")
+        self.assertEqual(tag, pt.Tag("foo", "subject", "lower-case"))
+        # tags can still be pickled and copied:
+        self.assertEqual(pickle.loads(pickle.dumps(tag)), tag)
+        self.assertEqual(copy.deepcopy(pt.Tag(None, gn.GenderedNoun("actor"), "capitalized")),
+                         pt.Tag(None, gn.GenderedNoun("actor"), "capitalized"))
+
+    def test__eq__(self):
+        self.assertEqual(pt.Tag("foo", "subject", "lower-case"), pt.Tag("foo", "subject", "lower-case"))
+        self.assertNotEqual(pt.Tag("foo", "subject", "lower-case"), pt.Tag(None, "subject", "lower-case"))
+        self.assertNotEqual(pt.Tag("foo", "subject", "lower-case"), pt.Tag("foo", "object", "lower-case"))
+        self.assertNotEqual(pt.Tag("foo", "subject", "lower-case"), pt.Tag("foo", "subject", "capitalized"))
+        self.assertNotEqual(pt.Tag("foo", "subject", "lower-case"), {"id": "foo", "context": "subject",
+                                                                     "capitalization": "lower-case"})
+
+    def test__repr__(self):
+        self.assertEqual(repr(pt.Tag("foo", "subject", "lower-case")), "Tag('foo', 'subject', 'lower-case')")
@@ -2,9 +2,12 @@
 import unittest
 import os
 import warnings
+import pickle
+import copy
 
 import src.warnings as ws
 import src.errors as err
+import src.pronoun_data_interface as pdi
 from src.pronoun_data_interface import PronounData
 
 
@@ -102,7 +105,53 @@ class TestPronounData(unittest.TestCase):
         # ^ this is only necessary because we use functions that should not be exposed to the user; otherwise, we could
         # just leave it because the next user-exposed function we call will cancel it out anyways.
 
+    def test__setattr__(self):
+        pd = PronounData({"subject": "xe"})
+        for name in ("grpd", "foo"):
+            with self.assertRaises(AttributeError):
+                setattr(pd, name, dict())
+        self.assertEqual(pd.get_pd(), {"": {"subject": "xe"}})
+        # pronoun data created from other pronoun data shares its data:
+        self.assertIs(PronounData(pd).grpd, pd.grpd)
+        # pronoun data can still be pickled and copied:
+        self.assertEqual(pickle.loads(pickle.dumps(pd)).get_pd(), pd.get_pd())
+        self.assertEqual(copy.deepcopy(pd).get_pd(), pd.get_pd())
+
     def test_get_pd(self):
-        # there are no tests for this since the tests for the initialisation test exactly this; whether the input to
-        # `__init__` and the output of `get_pd` match.
-        pass
+        # most tests for this are in the tests for the initialisation, which test whether the input to `__init__` and
+        # the output of `get_pd` match.
+        # modifying the returned pronoun data does not modify the pronoun data itself, nor its resolved version:
+        pd = PronounData({"foo": {"subject": "xe", "gender-addressing": "f", "gender-nouns": "male"}})
+        returned_pd = pd.get_pd()
+        returned_pd["foo"]["subject"] = "she"
+        returned_pd["bar"] = dict()
+        self.assertEqual(pd.get_pd(), {"foo": {"subject": "xe", "gender-addressing": "f", "gender-nouns": "male"}})
+        self.assertEqual(pd.get_resolved_pd()["foo"]["subject"], "xe")
+
+    def test_get_resolved_pd(self):
+        pd = PronounData({"foo": {"subject": "xe"}, "bar": {"gender-addressing": "f", "gender-nouns": "male"}})
+        self.assertEqual(pd.get_resolved_pd(), {"foo": {"subject": "xe", "gender-addressing": "t",
+                                                        "gender-nouns": "neutral"},
+                                                "bar": {"gender-addressing": "f", "gender-nouns": "male"}})
+        self.assertEqual(pd.defaulted_properties, {"foo": frozenset({"gender-addressing", "gender-nouns"})})
+        # resolving default values does not modify the pronoun data itself:
+        self.assertEqual(pd.get_pd()["foo"], {"subject": "xe"})
+        # and is shared by pronoun data created from other pronoun data, and kept when pickling it:
+        self.assertIs(PronounData(pd).get_resolved_pd(), pd.get_resolved_pd())
+        self.assertEqual(pickle.loads(pickle.dumps(pd)).defaulted_properties, pd.defaulted_properties)
+        self.assertEqual(pickle.loads(pickle.dumps(pd)).get_resolved_pd(), pd.get_resolved_pd())
+        # it cannot be modified:
+        with self.assertRaises(TypeError):
+            pd.get_resolved_pd()["foo"]["subject"] = "she"
+        with self.assertRaises(TypeError):
+            pd.get_resolved_pd()["baz"] = dict()
+
+    def test_make_read_only(self):
+        grpd = {"foo": {"subject": "xe"}}
+        read_only_grpd = pdi.make_read_only(grpd)
+        self.assertEqual(read_only_grpd, grpd)
+        with self.assertRaises(TypeError):
+            read_only_grpd["foo"]["subject"] = "she"
+        # (it is a view, not a copy):
+        grpd["foo"]["subject"] = "she"
+        self.assertEqual(read_only_grpd["foo"]["subject"], "she")
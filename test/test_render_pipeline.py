@@ -7,6 +7,7 @@ import src.warnings as ws
 import src.errors as err
 import src.gender_nouns as gn
 from src.render_pipeline import GRenderer
+import src.parse_templates as pt
 
 
 class TestGRenderer(unittest.TestCase):
@@ -45,6 +46,70 @@ class TestGRenderer(unittest.TestCase):
         self.assertEqual(pd1, pd1_original)
         self.assertEqual(template1, template1_original)
 
+    def test_resolve_ids(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            # individual pronoun data:
+            self.assertEqual(GRenderer.resolve_ids(frozenset(), True, {"": {"subject": "xe"}}), "usr")
+            self.assertEqual(GRenderer.resolve_ids(frozenset({"foo"}), False, {"": {"subject": "xe"}}), None)
+            self.assertTrue(len(w) == 2 and all(issubclass(x.category, ws.IdMatchingNecessaryWarning) for x in w))
+            self.assertRaises(err.IdResolutionError,
+                              lambda: GRenderer.resolve_ids(frozenset({"foo"}), True, {"": {"subject": "xe"}}))
+
+            # pronoun data with one id:
+            self.assertEqual(GRenderer.resolve_ids(frozenset(), True, {"foo": {"subject": "xe"}}), "foo")
+            self.assertEqual(len(w), 3)
+            self.assertEqual(GRenderer.resolve_ids(frozenset({"foo"}), False, {"foo": {"subject": "xe"}}), None)
+            self.assertEqual(len(w), 3)
+            self.assertRaises(err.IdResolutionError,
+                              lambda: GRenderer.resolve_ids(frozenset({"bar"}), False, {"foo": {"subject": "xe"}}))
+
+            # pronoun data with several ids:
+            grpd = {"foo": {"subject": "xe"}, "bar": {"subject": "she"}}
+            self.assertEqual(GRenderer.resolve_ids(frozenset({"foo", "bar"}), False, grpd), None)
+            self.assertEqual(GRenderer.resolve_ids(frozenset({"foo"}), True, grpd), "bar")
+            self.assertEqual(len(w), 4)
+            self.assertRaises(err.IdResolutionError, lambda: GRenderer.resolve_ids(frozenset({"baz"}), False, grpd))
+            self.assertRaises(err.IdResolutionError, lambda: GRenderer.resolve_ids(frozenset(), True, grpd))
+
+    def test_try_to_resolve_ids(self):
+        grpd = {"foo": {"subject": "xe"}, "bar": {"subject": "she"}}
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            # returns what `resolve_ids` returns, along with no error message:
+            self.assertEqual(GRenderer.try_to_resolve_ids(frozenset({"foo"}), True, grpd), ("bar", None))
+            self.assertEqual(GRenderer.try_to_resolve_ids(frozenset({"foo", "bar"}), False, grpd), (None, None))
+            self.assertEqual(len(w), 1)
+            # and returns the message of the error `resolve_ids` raises instead of raising it:
+            for ids_used_in_template, template_contains_unspecified_ids in ((frozenset({"baz"}), False),
+                                                                            (frozenset(), True)):
+                id_for_tags_without_id, error_message = GRenderer.try_to_resolve_ids(
+                    ids_used_in_template, template_contains_unspecified_ids, grpd)
+                self.assertIsNone(id_for_tags_without_id)
+                with self.assertRaises(err.IdResolutionError) as context:
+                    GRenderer.resolve_ids(ids_used_in_template, template_contains_unspecified_ids, grpd)
+                self.assertEqual(error_message, str(context.exception))
+
+    def test_give_idpd_its_id(self):
+        idpd = {"subject": "xe"}
+        self.assertEqual(GRenderer.give_idpd_its_id(frozenset(), "usr", {"": idpd}), {"usr": idpd})
+        self.assertIs(GRenderer.give_idpd_its_id(frozenset({"foo"}), None, {"": idpd})["foo"], idpd)
+        # other pronoun data is returned as it is:
+        grpd = {"foo": idpd, "bar": idpd}
+        self.assertIs(GRenderer.give_idpd_its_id(frozenset({"foo"}), "bar", grpd), grpd)
+
+    def test_copy_template_and_grpd(self):
+        noun = gn.GenderedNoun("actor")
+        template = ["a ", {"id": "foo", "context": "subject", "capitalization": "lower-case"}, " b ",
+                    {"id": "bar", "context": noun, "capitalization": "capitalized"}, ""]
+        grpd = {"foo": {"subject": "xe"}, "bar": {"gender-nouns": "female"}}
+        new_template, new_grpd = GRenderer.copy_template_and_grpd(template, grpd)
+        self.assertEqual((new_template, new_grpd), (template, grpd))
+        self.assertTrue(self.templates_are_different(template, new_template))
+        self.assertTrue(self.grpd_are_different(grpd, new_grpd))
+        # immutable values are shared:
+        self.assertIs(new_template[3]["context"], noun)
+
     def test_id_resolution(self):
         # we make one test case for every cell of the table that defines the workings of id resolution.
         # we only test inputs that could've validly come out of the template- and pronoun data parsing pipeline.
@@ -364,6 +429,14 @@ class TestGRenderer(unittest.TestCase):
             # make sure the default value used warning was raised:
             self.assertTrue(len(w) == 1 and issubclass(w[-1].category, ws.DefaultValueUsedWarning))
 
+    def test_resolve_addressing_of_context_value(self):
+        grpd = {"foo": {"gender-addressing": "f"}, "bar": {"gender-addressing": "true"}}
+        self.assertEqual(GRenderer.resolve_addressing_of_context_value("address", grpd, "foo"), "personal-name")
+        self.assertEqual(GRenderer.resolve_addressing_of_context_value("address", grpd, "bar"), "address")
+        self.assertEqual(GRenderer.resolve_addressing_of_context_value("subject", grpd, "foo"), "subject")
+        noun = gn.GenderedNoun("actor")
+        self.assertIs(GRenderer.resolve_addressing_of_context_value(noun, grpd, "foo"), noun)
+
     def test_actually_render_context_values(self):
         # render tag with canonical properties:
         grpd = {"foo": {"subject": "they", "object": "them"}, "bar": {"object": "zen"}}
@@ -399,6 +472,13 @@ class TestGRenderer(unittest.TestCase):
             (["test ", {"id": "foo", "context": "actress"}, " text ",
              {"id": "bar", "context": "zen"}, " test ", {"id": "bar", "context": "wawa"}, " test"], grpd))
 
+    def test_render_context_value(self):
+        grpd = {"foo": {"subject": "they", "<wawawa>": "wuwu", "gender-nouns": "female"}}
+        self.assertEqual(GRenderer.render_context_value("subject", grpd, "foo"), "they")
+        self.assertEqual(GRenderer.render_context_value("<wawawa>", grpd, "foo"), "wuwu")
+        self.assertEqual(GRenderer.render_context_value(gn.GenderedNoun("actor"), grpd, "foo"), "actress")
+        self.assertRaises(err.MissingInformationError, lambda: GRenderer.render_context_value("object", grpd, "foo"))
+
     def test_apply_capitalization(self):
         # test all capitalization types, that capitalization is really changed, and that non-capitalizable letters are
         # skipped (and that it is okay if nothing changes at all, and if the word that needs to be capitalized is
@@ -427,6 +507,98 @@ class TestGRenderer(unittest.TestCase):
                {"context": "  "}, " test3"]
         out = "test foo test2    test3"
         self.assertEqual(out, GRenderer.convert_to_string(inp, dict()))
+        # the input is not modified:
+        self.assertEqual(inp[1], {"context": "foo", "bar": "baz"})
+
+        # returning the parts instead:
+        self.assertEqual(GRenderer.convert_to_string(inp, dict(), return_parts=True),
+                         ["test ", "foo", " test2 ", "  ", " test3"])
+        # templates without tags:
+        self.assertEqual(GRenderer.convert_to_string(["text"], dict()), "text")
+        self.assertEqual(GRenderer.convert_to_string(["text"], dict(), return_parts=True), ["text"])
+
+    def test_render_compact_template(self):
+        # renders like the full rendering pipeline:
+        for template, grpd in [
+            ("{id:foo*They} {id:bar*them} {Actor}", {"foo": {"subject": "xe"}, "bar": {"object": "her"},
+                                                     "baz": {"gender-nouns": "male"}}),
+            ("{id:foo*Address} {id:foo*they}", {"": {"address": "Mx", "gender-addressing": "f",
+                                                    "personal-name": "Avery", "subject": "xe"}}),
+            ("{Mr_s} {DOE}", {"": {"address": "Mx", "surname": "Doe"}}),
+            ("{Mr_s} {DOE}", {"foo": {"address": "Mx", "surname": "Doe"}}),
+            ("text", {"": {}})
+        ]:
+            parsed_template = pt.GRParser.full_parsing_pipeline(template)
+            args = (pt.GRParser.get_all_specified_id_values(parsed_template),
+                    pt.GRParser.template_contains_unspecified_ids(parsed_template), grpd)
+            grpd_original = copy.deepcopy(grpd)
+            with warnings.catch_warnings(record=True) as w1:
+                warnings.simplefilter("always")
+                expected = GRenderer.render_with_full_rendering_pipeline(parsed_template, *args)
+            with warnings.catch_warnings(record=True) as w2:
+                warnings.simplefilter("always")
+                self.assertEqual(GRenderer.render_compact_template(pt.GRParser.to_compact_template(parsed_template),
+                                                                   *args), expected)
+            self.assertEqual([w.category for w in w1], [w.category for w in w2])
+            self.assertEqual(grpd, grpd_original)
+
+        # raises the same errors:
+        parsed_template = pt.GRParser.full_parsing_pipeline("{id:foo*they} {them}")
+        compact_template = pt.GRParser.to_compact_template(parsed_template)
+        self.assertRaises(err.IdResolutionError, lambda: GRenderer.render_compact_template(
+            compact_template, frozenset({"foo"}), True, {"foo": {"subject": "xe"}}))
+        self.assertRaises(err.MissingInformationError, lambda: GRenderer.render_compact_template(
+            compact_template, frozenset({"foo"}), True, {"foo": {"subject": "xe"}, "bar": {"subject": "xe"}}))
+
+    def test_render_compact_template_with_resolved_ids(self):
+        compact_template = pt.GRParser.to_compact_template(pt.GRParser.full_parsing_pipeline("{id:foo*They} {Actor}"))
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(GRenderer.render_compact_template_with_resolved_ids(
+                compact_template, "bar", {"foo": {"subject": "xe"}, "bar": {"gender-nouns": "female"}}), "Xe Actress")
+            # (no id resolution, so no warnings):
+            self.assertEqual(w, [])
+
+    def test_try_to_render_compact_template_with_resolved_ids(self):
+        compact_template = pt.GRParser.to_compact_template(pt.GRParser.full_parsing_pipeline(
+            "{id:foo*They} {id:foo*Address} {Actor}"))
+        grpd = {"foo": {"subject": "xe", "gender-addressing": "f", "personal-name": "avery", "gender-nouns": "neutral"},
+                "bar": {"gender-nouns": "female", "gender-addressing": "t"}}
+        # renders like `render_compact_template_with_resolved_ids`:
+        self.assertEqual(GRenderer.try_to_render_compact_template_with_resolved_ids(compact_template, "bar", grpd),
+                         GRenderer.render_compact_template_with_resolved_ids(compact_template, "bar", grpd))
+        self.assertEqual(GRenderer.try_to_render_compact_template_with_resolved_ids(compact_template, "bar", grpd),
+                         "Xe Avery Actress")
+        # but returns None if properties are missing:
+        del grpd["foo"]["personal-name"]
+        self.assertIsNone(GRenderer.try_to_render_compact_template_with_resolved_ids(compact_template, "bar", grpd))
+
+    def test_get_missing_properties(self):
+        def get_missing_properties(template, grpd):
+            parsed_template = pt.GRParser.full_parsing_pipeline(template)
+            used_ids = pt.GRParser.get_all_specified_id_values(parsed_template)
+            id_for_tags_without_id = GRenderer.resolve_ids(
+                used_ids, pt.GRParser.template_contains_unspecified_ids(parsed_template), grpd)
+            return GRenderer.get_missing_properties(pt.GRParser.get_required_properties(parsed_template),
+                                                    id_for_tags_without_id,
+                                                    GRenderer.give_idpd_its_id(used_ids, id_for_tags_without_id, grpd))
+
+        # nothing is missing:
+        self.assertEqual(get_missing_properties("{id:foo*They} {id:bar*them} {Actor}",
+                                                {"foo": {"subject": "xe"}, "bar": {"object": "her"},
+                                                 "baz": {"gender-nouns": "male"}}), dict())
+        # missing properties are listed under the ids they are missing for (tags without ids and individual pronoun
+        #  data use the id they are rendered with):
+        self.assertEqual(get_missing_properties("{id:foo*They} {id:bar*them} {Actor} {their}",
+                                                {"foo": {"subject": "xe"}, "bar": {}, "baz": {"gender-nouns": "male"}}),
+                         {"bar": frozenset({"object"}), "baz": frozenset({"dpossessive"})})
+        self.assertEqual(get_missing_properties("{id:foo*they} {id:foo*them}", {"": {"subject": "xe"}}),
+                         {"foo": frozenset({"object"})})
+        self.assertEqual(get_missing_properties("{they} {them}", {"": {"subject": "xe"}}),
+                         {"usr": frozenset({"object"})})
+        # addressing is resolved:
+        self.assertEqual(get_missing_properties("{Address}", {"": {"address": "Mx", "gender-addressing": "f"}}),
+                         {"usr": frozenset({"personal-name"})})
 
     def test_render_with_full_rendering_pipeline(self):
         # test to confirm that id matching is properly done:
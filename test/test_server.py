@@ -0,0 +1,368 @@
+import unittest
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import asyncio
+import tempfile
+import subprocess
+import threading
+import io
+import contextlib
+from unittest import mock
+
+import src.warnings as ws
+import src.server as server
+from src.template_bundle import TemplateBundle
+from src.server import ServerMetrics, RenderServer, RenderClient, UnixHTTPConnection
+
+# templates served in the tests:
+
+TEMPLATES = {
+    "welcome.gr": "Hello {Mr_s} {Name}, {they} {actor}!",
+    "emails/short.gr": "{They}.",
+}
+PD = {"they": "xe", "address": "Mx", "name": "Doe", "gender-nouns": "female"}
+
+
+def make_template_directory(directory: str) -> str:
+    templates_dir = os.path.join(directory, "templates")
+    for path, template in TEMPLATES.items():
+        path = os.path.join(templates_dir, *path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(template)
+    return templates_dir
+
+
+def render_when_listening(unix_path: str, requests: list) -> list:
+    """Renders the given requests with a new client of the server at `unix_path` as soon as the server accepts
+    connections (its socket file exists before it does)."""
+    for _ in range(300):
+        client = RenderClient(unix_path=unix_path, timeout=30)
+        try:
+            return client.render(requests)
+        except (FileNotFoundError, ConnectionRefusedError):
+            time.sleep(0.1)
+        finally:
+            client.close()
+    raise TimeoutError("The server at " + unix_path + " does not accept connections.")
+
+
+class TestServerFunctions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.bundle_path = os.path.join(self.directory.name, "templates.grb")
+        TemplateBundle.build(make_template_directory(self.directory.name), self.bundle_path, processes=1)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def test_init_worker(self):
+        server.init_worker(self.bundle_path, 2, ws.DISABLE_ALL_WARNINGS)
+        self.assertEqual(sorted(server.worker_bundle.names()), ["emails/short", "welcome"])
+        self.assertIs(server.worker_get_renderer('{"they": "xe"}'), server.worker_get_renderer('{"they": "xe"}'))
+        self.assertEqual(server.worker_warning_settings, ws.DISABLE_ALL_WARNINGS)
+
+    def test_render_batch(self):
+        server.init_worker(self.bundle_path, 2, ws.DISABLE_ALL_WARNINGS)
+        results = server.render_batch([("welcome", json.dumps(PD)), ("emails/short", '{"they": "she"}'),
+                                       ("welcome", '{"they": "she"}'), ("missing", '{"they": "she"}'),
+                                       ("welcome", "[]")])
+        self.assertEqual(results[:2], [{"output": "Hello Mx Doe, xe actress!"}, {"output": "She."}])
+        self.assertEqual([r["error"] for r in results[2:]],
+                         ["MissingInformationError", "UnknownTemplateError", "InvalidPDError"])
+        self.assertEqual(results[3]["message"], "There is no template named \"missing\".")
+
+        # unexpected errors are reported as well, and only fail their own request:
+        get_renderer = server.worker_get_renderer
+
+        def get_renderer_or_fail(pronoun_data):
+            if pronoun_data == "fail":
+                raise RuntimeError("wuwu")
+            return get_renderer(pronoun_data)
+
+        with mock.patch.object(server, "worker_get_renderer", get_renderer_or_fail):
+            self.assertEqual(server.render_batch([("emails/short", "fail"), ("emails/short", '{"they": "she"}')]),
+                             [{"error": "RuntimeError", "message": "wuwu"}, {"output": "She."}])
+
+
+class TestServerMetrics(unittest.TestCase):
+
+    def test__init__(self):
+        metrics = ServerMetrics(2)
+        self.assertEqual((metrics.http_requests, metrics.render_requests, metrics.renders, metrics.errors),
+                         (0, 0, 0, 0))
+        self.assertEqual(metrics.latencies.maxlen, 2)
+
+    def test_record_render_request(self):
+        metrics = ServerMetrics(2)
+        metrics.record_render_request([{"output": "a"}, {"error": "b", "message": "c"}], 1)
+        metrics.record_render_request([{"output": "a"}], 2)
+        metrics.record_render_request([], 3)
+        self.assertEqual((metrics.render_requests, metrics.renders, metrics.errors), (3, 3, 1))
+        self.assertEqual(list(metrics.latencies), [2, 3])
+
+    def test_snapshot(self):
+        metrics = ServerMetrics()
+        self.assertEqual(metrics.snapshot()["latency_ms"], {"p50": None, "p90": None, "p99": None, "max": None})
+        for latency in (0.001, 0.002, 0.003, 0.004):
+            metrics.record_render_request([{"output": "a"}], latency)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["latency_ms"], {"p50": 2.0, "p90": 4.0, "p99": 4.0, "max": 4.0})
+        self.assertEqual((snapshot["renders"], snapshot["render_requests"]), (4, 4))
+        self.assertGreater(snapshot["renders_per_second"], 0)
+
+
+class TestRenderServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.templates_dir = make_template_directory(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test__init__(self):
+        render_server = RenderServer(self.templates_dir, processes=0)
+        self.assertEqual(sorted(render_server.template_names), ["emails/short", "welcome"])
+        self.assertTrue(os.path.exists(render_server.temporary_directory))
+        render_server.close()
+        self.assertFalse(os.path.exists(render_server.temporary_directory))
+
+        # from a packed template bundle:
+        bundle_path = os.path.join(self.directory.name, "templates.grb")
+        TemplateBundle.build(self.templates_dir, bundle_path, processes=1)
+        render_server = RenderServer(bundle_path, processes=0)
+        self.assertEqual(sorted(render_server.template_names), ["emails/short", "welcome"])
+        self.assertIsNone(render_server.temporary_directory)
+        render_server.close()
+
+    def test_render(self):
+        render_server = RenderServer(self.templates_dir, processes=0, chunk_size=2)
+        loop = asyncio.new_event_loop()
+        results = loop.run_until_complete(render_server.render(
+            [("welcome", json.dumps(PD)), ("emails/short", json.dumps(PD)), ("emails/short", '{"they": "she"}')]))
+        loop.close()
+        self.assertEqual(results, [{"output": "Hello Mx Doe, xe actress!"}, {"output": "Xe."}, {"output": "She."}])
+        self.assertEqual((render_server.metrics.render_requests, render_server.metrics.renders), (1, 3))
+        render_server.close()
+
+    def test_handle_request(self):
+        render_server = RenderServer(self.templates_dir, processes=0)
+        loop = asyncio.new_event_loop()
+        self.assertEqual(loop.run_until_complete(render_server.handle_request(
+            "POST", "/render", json.dumps({"requests": [{"template": "emails/short", "pronoun_data": {"they": "xe"}},
+                                                        {"template": "emails/short",
+                                                         "pronoun_data": '{"they": "she"}'}]}).encode())),
+            (200, {"results": [{"output": "Xe."}, {"output": "She."}]}))
+        self.assertEqual(loop.run_until_complete(render_server.handle_request("GET", "/templates", b"")),
+                         (200, {"templates": render_server.template_names}))
+        status, metrics = loop.run_until_complete(render_server.handle_request("GET", "/metrics", b""))
+        self.assertEqual((status, metrics["http_requests"], metrics["renders"]), (200, 3, 2))
+
+        # invalid requests:
+        for method, path, body, status in [
+            ("POST", "/render", b"{", 400), ("POST", "/render", b'{"requests": [{"template": 1}]}', 400),
+            ("POST", "/render", b'{"requests": [{"template": 1, "pronoun_data": {}}]}', 400),
+            ("GET", "/render", b"", 405), ("POST", "/metrics", b"", 405), ("GET", "/foo", b"", 404)
+        ]:
+            self.assertEqual(loop.run_until_complete(render_server.handle_request(method, path, body))[0], status)
+        loop.close()
+        render_server.close()
+
+    def test_handle_connection(self):
+        # also tests `start`, `start_in_background` and `close`, and the client:
+        render_server = RenderServer(self.templates_dir, processes=0)
+        port = render_server.start_in_background()
+        client = RenderClient(port=port)
+        # several requests on the same connection:
+        for _ in range(3):
+            self.assertEqual(client.render([("welcome", PD), ("emails/short", PD)]),
+                             [{"output": "Hello Mx Doe, xe actress!"}, {"output": "Xe."}])
+        self.assertEqual(client.request("GET", "/foo")[0], 404)
+
+        # malformed requests and requests that close the connection:
+        for request, status_line in [(b"GARBAGE\r\n\r\n", b"HTTP/1.1 400 Bad Request"),
+                                     (b"GET /templates HTTP/1.0\r\n\r\n", b"HTTP/1.1 200 OK")]:
+            with socket.create_connection(("127.0.0.1", port)) as s:
+                s.sendall(request)
+                response = b""
+                while True:
+                    data = s.recv(4096)
+                    if not data:
+                        break
+                    response += data
+                self.assertTrue(response.startswith(status_line))
+                self.assertIn(b"Connection: close", response)
+
+        # connections that are closed in the middle of a request:
+        def wait_for_connections(number):
+            for _ in range(500):
+                if len(render_server.connections) == number:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(len(render_server.connections), number)
+
+        with socket.create_connection(("127.0.0.1", port)) as s:
+            s.sendall(b"POST /render HTTP/1.1\r\nContent-Length: 100\r\n\r\n{")
+            wait_for_connections(2)
+        wait_for_connections(1)
+        client.close()
+        render_server.close()
+
+    def test_start(self):
+        # with several worker processes and on a Unix socket:
+        render_server = RenderServer(self.templates_dir, processes=2, chunk_size=1)
+        unix_path = os.path.join(self.directory.name, "server.sock")
+        self.assertEqual(render_server.start_in_background(unix_path=unix_path), unix_path)
+        client = RenderClient(unix_path=unix_path, timeout=30)
+        self.assertEqual(client.render([("welcome", PD), ("emails/short", PD)] * 4),
+                         [{"output": "Hello Mx Doe, xe actress!"}, {"output": "Xe."}] * 4)
+        client.close()
+        render_server.close()
+
+    def test_start_in_background(self):
+        render_server = RenderServer(self.templates_dir, processes=0)
+        port = render_server.start_in_background(port=0)
+        self.assertIsInstance(port, int)
+        client = RenderClient(port=port)
+        self.assertEqual(sorted(client.templates()), ["emails/short", "welcome"])
+        client.close()
+        render_server.close()
+
+    def test_stop(self):
+        # open connections are closed:
+        render_server = RenderServer(self.templates_dir, processes=0)
+        client = RenderClient(port=render_server.start_in_background())
+        client.templates()
+        self.assertEqual(len(render_server.connections), 1)
+        asyncio.run_coroutine_threadsafe(render_server.stop(), render_server.background_loop).result()
+        self.assertEqual(render_server.connections, dict())
+        self.assertRaises(OSError, client.templates)
+        client.close()
+        render_server.close()
+
+        # servers that were never started can be stopped, too:
+        render_server = RenderServer(self.templates_dir, processes=0)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(render_server.stop())
+        loop.close()
+        render_server.close()
+
+    def test_close(self):
+        render_server = RenderServer(self.templates_dir, processes=0)
+        client = RenderClient(port=render_server.start_in_background())
+        client.templates()
+        render_server.close()
+        self.assertFalse(render_server.background_thread.is_alive())
+        self.assertTrue(render_server.background_loop.is_closed())
+        client.close()
+
+
+class TestUnixHTTPConnection(unittest.TestCase):
+
+    def test__init__(self):
+        connection = UnixHTTPConnection("server.sock", timeout=2)
+        self.assertEqual((connection.unix_path, connection.timeout, connection.host), ("server.sock", 2, "localhost"))
+        self.assertIsNone(connection.sock)
+
+    def test_connect(self):
+        connection = UnixHTTPConnection("/nonexistent/server.sock", timeout=1)
+        self.assertEqual(connection.unix_path, "/nonexistent/server.sock")
+        self.assertRaises(OSError, connection.connect)
+
+
+class TestRenderClient(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.render_server = RenderServer(make_template_directory(self.directory.name), processes=0)
+        self.client = RenderClient(port=self.render_server.start_in_background())
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.render_server.close()
+        self.directory.cleanup()
+
+    def test__init__(self):
+        self.assertEqual(RenderClient("localhost", 1234).connection.port, 1234)
+        self.assertIsInstance(RenderClient(unix_path="foo.sock").connection, UnixHTTPConnection)
+
+    def test_request(self):
+        self.assertEqual(self.client.request("GET", "/templates"),
+                         (200, {"templates": self.render_server.template_names}))
+        self.assertEqual(self.client.request("POST", "/render", {"requests": []}), (200, {"results": []}))
+
+    def test_render(self):
+        self.assertEqual(self.client.render([("emails/short", '{"they": "xe"}')]), [{"output": "Xe."}])
+        self.assertRaises(ValueError, lambda: self.client.render([(1, {})]))
+
+    def test_templates(self):
+        self.assertEqual(sorted(self.client.templates()), ["emails/short", "welcome"])
+
+    def test_metrics(self):
+        self.client.render([("emails/short", '{"they": "xe"}')] * 3)
+        metrics = self.client.metrics()
+        self.assertEqual((metrics["http_requests"], metrics["render_requests"], metrics["renders"], metrics["errors"]),
+                         (2, 1, 3, 0))
+
+    def test_close(self):
+        self.client.templates()
+        self.client.close()
+        self.assertIsNone(self.client.connection.sock)
+
+
+class TestMain(unittest.TestCase):
+
+    def test_main(self):
+        # in this process, stopping the server like Ctrl+C would:
+        loops = list()
+        new_event_loop = asyncio.new_event_loop
+
+        def make_loop():
+            loops.append(new_event_loop())
+            return loops[-1]
+
+        def interrupt():
+            raise KeyboardInterrupt
+
+        results = list()
+
+        def render(unix_path):
+            try:
+                results.append(render_when_listening(unix_path, [("emails/short", {"they": "xe"})]))
+            finally:
+                loops[0].call_soon_threadsafe(interrupt)
+
+        with tempfile.TemporaryDirectory() as directory:
+            unix_path = os.path.join(directory, "server.sock")
+            thread = threading.Thread(target=render, args=(unix_path,))
+            stderr = io.StringIO()
+            with mock.patch("asyncio.new_event_loop", make_loop), contextlib.redirect_stderr(stderr):
+                thread.start()
+                self.assertEqual(server.main([make_template_directory(directory), "--unix", unix_path,
+                                              "--processes", "0"]), 0)
+            thread.join()
+        self.assertEqual(results, [[{"output": "Xe."}]])
+        self.assertIn("listening on " + unix_path, stderr.getvalue())
+        self.assertTrue(loops[0].is_closed())
+
+        # as its own process:
+        with tempfile.TemporaryDirectory() as directory:
+            unix_path = os.path.join(directory, "server.sock")
+            process = subprocess.Popen([sys.executable, "-W", "ignore", "-m", "src.server",
+                                        make_template_directory(directory), "--unix", unix_path, "--processes", "0"],
+                                       stderr=subprocess.PIPE)
+            try:
+                self.assertEqual(render_when_listening(unix_path, [("emails/short", {"they": "xe"})]),
+                                 [{"output": "Xe."}])
+            finally:
+                process.send_signal(signal.SIGINT)
+                _, stderr = process.communicate(timeout=30)
+            self.assertEqual(process.returncode, 0)
+            self.assertIn(b"listening on " + unix_path.encode(), stderr)
@@ -0,0 +1,123 @@
+import unittest
+import os
+import tempfile
+import json
+
+import src.warnings as ws
+import src.errors as err
+import src.gender_nouns as gn
+from src.template_interface import Template
+from src.template_bundle import TemplateBundle, encode_parsed_template, decode_parsed_template, parse_template_file,\
+    find_template_files
+
+# templates to bundle, by their path relative to the bundled directory:
+
+TEMPLATES = {
+    "welcome.gr": "Hello {Mr_s} {Name}, {they} {actor}!",
+    "emails/reminder.gr": "{id:foo*They} and {id:bar*them}.",
+    "emails/nested/plain.gr": "no tags at all",
+    "emails/ignored.txt": "{they}",
+}
+
+
+class TestTemplateBundle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.templates_dir = os.path.join(self.directory.name, "templates")
+        for path, template in TEMPLATES.items():
+            path = os.path.join(self.templates_dir, *path.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(template)
+        self.bundle_path = os.path.join(self.directory.name, "templates.grb")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_encode_parsed_template(self):
+        # gendered nouns are stored by their word:
+        parsed_template = Template("{actor}").parsed_template
+        self.assertEqual(json.loads(encode_parsed_template(parsed_template).decode("utf-8"))[1]["context"],
+                         {"gendered-noun": "actor"})
+        # encoding does not modify the template in-place:
+        self.assertIsInstance(parsed_template[1]["context"], gn.GenderedNoun)
+        # entries are compact:
+        self.assertNotIn(b" ", encode_parsed_template(Template("{they}").parsed_template))
+
+    def test_decode_parsed_template(self):
+        # decoding an encoded template returns the template:
+        for template in TEMPLATES.values():
+            parsed_template = Template(template, warning_settings=ws.DISABLE_ALL_WARNINGS).parsed_template
+            self.assertEqual(decode_parsed_template(encode_parsed_template(parsed_template)), parsed_template)
+        # gendered nouns are restored as gendered nouns:
+        decoded_template = decode_parsed_template(b'["",{"id":null,"context":{"gendered-noun":"actor"},'
+                                                  b'"capitalization":"lower-case"},""]')
+        self.assertEqual(decoded_template[1]["context"], gn.GenderedNoun("actor"))
+
+    def test_parse_template_file(self):
+        path = os.path.join(self.templates_dir, "welcome.gr")
+        self.assertEqual(decode_parsed_template(parse_template_file(path, ws.DISABLE_ALL_WARNINGS)),
+                         Template(path, takes_file_path=True).parsed_template)
+
+    def test_find_template_files(self):
+        self.assertEqual(find_template_files(self.templates_dir), [
+            ("welcome", os.path.join(self.templates_dir, "welcome.gr")),
+            ("emails/reminder", os.path.join(self.templates_dir, "emails", "reminder.gr")),
+            ("emails/nested/plain", os.path.join(self.templates_dir, "emails", "nested", "plain.gr"))
+        ])
+
+    def test_build(self):
+        for processes in (1, 2):
+            bundle = TemplateBundle.build(self.templates_dir, self.bundle_path, processes=processes)
+            # only .gr-files are bundled, by their relative path without file extension:
+            self.assertEqual(sorted(bundle.names()), ["emails/nested/plain", "emails/reminder", "welcome"])
+            # the packed file can be loaded again:
+            self.assertEqual(TemplateBundle(self.bundle_path).names(), bundle.names())
+
+        # errors in templates are raised:
+        with open(os.path.join(self.templates_dir, "invalid.gr"), "w") as f:
+            f.write("{id:foo}")
+        for processes in (1, 2):
+            self.assertRaises(err.SyntaxError,
+                              lambda: TemplateBundle.build(self.templates_dir, self.bundle_path, processes=processes))
+
+    def test_names(self):
+        bundle = TemplateBundle.build(self.templates_dir, self.bundle_path, processes=1)
+        # names are in the order of `find_template_files`:
+        self.assertEqual(bundle.names(), ["welcome", "emails/reminder", "emails/nested/plain"])
+        # and are returned as a new list every time:
+        bundle.names().append("foo")
+        self.assertEqual(len(bundle.names()), 3)
+
+    def test__init__(self):
+        TemplateBundle.build(self.templates_dir, self.bundle_path, processes=1)
+        bundle = TemplateBundle(self.bundle_path)
+        # nothing is materialized before it is needed:
+        self.assertEqual(bundle.templates, dict())
+
+        # files that are not packed template bundles are rejected:
+        with open(self.bundle_path, "w") as f:
+            f.write(json.dumps({"format-version": 0, "templates": {}}) + "\n")
+        self.assertRaises(ValueError, lambda: TemplateBundle(self.bundle_path))
+
+    def test__getitem__(self):
+        bundle = TemplateBundle.build(self.templates_dir, self.bundle_path, processes=1)
+        pd = {"they": "xe", "address": "Mx", "name": "Doe", "gender-nouns": "female"}
+        for path, template in TEMPLATES.items():
+            if path.endswith(".gr"):
+                t = bundle[path[:-len(".gr")]]
+                expected = Template(template)
+                self.assertEqual(t.parsed_template, expected.parsed_template)
+                self.assertEqual(t.used_ids, expected.used_ids)
+                self.assertEqual(t.contains_unspecified_ids, expected.contains_unspecified_ids)
+        self.assertEqual(bundle["welcome"].render(pd), "Hello Mx Doe, xe actress!")
+        # materialized templates are re-used:
+        self.assertIs(bundle["welcome"], bundle["welcome"])
+        self.assertRaises(KeyError, lambda: bundle["missing"])
+
+    def test__contains__and__len__(self):
+        bundle = TemplateBundle.build(self.templates_dir, self.bundle_path, processes=1)
+        self.assertIn("emails/reminder", bundle)
+        self.assertNotIn("emails/reminder.gr", bundle)
+        self.assertEqual(len(bundle), 3)
@@ -3,12 +3,17 @@ import unittest
 import os
 import warnings
 import copy
+import threading
+import pickle
 
 import src.warnings as ws
 import src.errors as err
 import src.gender_nouns as gn
 from src.pronoun_data_interface import PronounData
-from src.template_interface import Template
+from src.template_interface import Template, RenderResult
+from src.parse_templates import Tag
+from src.instrumentation import InstrumentationManager
+import src.parse_cache as pc
 
 
 class TestTemplate(unittest.TestCase):
@@ -45,6 +50,17 @@ class TestTemplate(unittest.TestCase):
         self.assertEqual(tr.contains_unspecified_ids, False)
         self.assertEqual(tr.used_ids, frozenset({"foo", "bar"}))
         # ^ the tests above also confirm that the template parsing pipeline is applied correctly.
+
+        # templates are parsed once and then taken from the cache:
+        template = "uncached {id:baz*they}"
+        hits = pc.template_cache.stats()["hits"]
+        tr = Template(template)
+        self.assertIs(Template(template).compact_template, tr.compact_template)
+        self.assertEqual(pc.template_cache.stats()["hits"], hits + 1)
+        # unless the cache is not used:
+        self.assertIsNot(Template(template, use_cache=False).compact_template, tr.compact_template)
+        self.assertEqual(Template(template, use_cache=False).compact_template, tr.compact_template)
+        self.assertEqual(pc.template_cache.stats()["hits"], hits + 1)
         # raise the warnings you are supposed to raise:
         with self.assertWarns(ws.NotAWordWarning):
             template = "text test {wuwuwu} wuwu"
@@ -52,6 +68,14 @@ class TestTemplate(unittest.TestCase):
             self.assertEqual(tr.parsed_template,
                              ["text test ",
                               {"context": gn.GenderedNoun("wuwuwu"), "capitalization": "lower-case"}, " wuwu"])
+        # ...also if the template is taken from the cache, as far as the warning settings enable them:
+        with self.assertWarns(ws.NotAWordWarning):
+            Template("text test {wuwuwu} wuwu")
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            Template("text test {wuwuwu} wuwu", warning_settings=ws.DISABLE_ALL_WARNINGS)
+            self.assertEqual(w, [])
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
         # raise an error for invalid input:
         self.assertRaises(err.SyntaxError, lambda: Template("fufufu \\"))
         self.assertRaises(err.SyntaxPostprocessingError, lambda: Template("{fufu*fufa*wuwu}"))
@@ -87,6 +111,47 @@ class TestTemplate(unittest.TestCase):
             self.assertTrue(len(w) == 0)
         ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
 
+    def test_from_parsed_template(self):
+        tr = Template("text {they} {Carpenter}")
+        tr2 = Template.from_parsed_template(tr.parsed_template)
+        self.assertEqual(tr2.parsed_template, tr.parsed_template)
+        self.assertEqual(tr2.compact_template, tr.compact_template)
+        self.assertEqual(tr2.used_ids, tr.used_ids)
+        self.assertEqual(tr2.contains_unspecified_ids, tr.contains_unspecified_ids)
+        self.assertEqual(tr2.render({"they": "xe"}), tr.render({"they": "xe"}))
+
+    def test_initialize(self):
+        tr = Template.__new__(Template)
+        tr.initialize(pc.CachedTemplate(("a ", Tag("foo", "object", "capitalized"), " b"), frozenset({"foo"}), False,
+                                        {"foo": frozenset({"object"})}))
+        self.assertEqual(tr.compact_template, ("a ", Tag("foo", "object", "capitalized"), " b"))
+        self.assertEqual((tr.used_ids, tr.contains_unspecified_ids), (frozenset({"foo"}), False))
+        self.assertEqual(tr.required_properties, {"foo": frozenset({"object"})})
+        # templates can only be initialized once:
+        self.assertRaises(AttributeError, lambda: tr.initialize(pc.parse("{they}")))
+        self.assertEqual(tr.used_ids, frozenset({"foo"}))
+
+    def test__setattr__(self):
+        tr = Template("{they}")
+        for name in ("compact_template", "used_ids", "contains_unspecified_ids", "foo"):
+            with self.assertRaises(AttributeError):
+                setattr(tr, name, None)
+        self.assertEqual(tr.render({"they": "xe"}), "xe")
+        # templates can still be pickled and copied:
+        tr = Template("{id:foo*They} {Actor}")
+        for tr_copy in (pickle.loads(pickle.dumps(tr)), copy.deepcopy(tr), copy.copy(tr)):
+            self.assertEqual((tr_copy.compact_template, tr_copy.used_ids, tr_copy.contains_unspecified_ids),
+                             (tr.compact_template, tr.used_ids, tr.contains_unspecified_ids))
+
+    def test_parsed_template(self):
+        tr = Template("a {id:foo*They} b")
+        self.assertEqual(tr.compact_template, ("a ", Tag("foo", "subject", "capitalized"), " b"))
+        self.assertEqual(tr.parsed_template, ["a ", {"id": "foo", "context": "subject",
+                                                     "capitalization": "capitalized"}, " b"])
+        # modifying the returned parsed template does not modify the template:
+        tr.parsed_template[1]["context"] = "object"
+        self.assertEqual(tr.render({"they": "xe"}), "a Xe b")
+
     def test_render(self):
         tr = Template("wuwu wawa {id:foo * context:They} tsts {them}")
         # ^ this is chosen in a way that proves that we walk through the rendering pipeline directly as it requires
@@ -142,3 +207,208 @@ class TestTemplate(unittest.TestCase):
             tr.render(pd, warning_settings=ws.DISABLE_ALL_WARNINGS)
             self.assertEqual(w, [])
         ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+        # with instrumentation hooks, templates are rendered stage by stage, and every stage is reported:
+        timings = list()
+        with InstrumentationManager.hooked(timings.append):
+            self.assertEqual(tr.render(pd, warning_settings=ws.DISABLE_ALL_WARNINGS), "wuwu wawa Ze tsts zen")
+            # (parsing stages are only reported if the template is actually parsed, not looked up in the cache):
+            Template("wuwu wawa {id:foo * context:They} tsts {them}", warning_settings=ws.DISABLE_ALL_WARNINGS)
+            self.assertEqual(len(timings), 5)
+            Template("{they}", use_cache=False)
+        self.assertEqual([(t.pipeline, t.stage, t.template_size, t.tag_count) for t in timings[:5]], [
+            ("render", "id_resolution", 5, 2),
+            ("render", "resolve_addressing", 5, 2),
+            ("render", "actually_render_context_values", 5, 2),
+            ("render", "apply_capitalization", 5, 2),
+            ("render", "convert_to_string", 5, 2)
+        ])
+        self.assertEqual([t.pipeline for t in timings[5:]], ["parse"] * 7)
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def test_render_with_default_values(self):
+        # default values are resolved when the pronoun data is created, and a single warning about all default values
+        #  a template requires is raised whenever it is rendered:
+        tr = Template("{id:foo*Address} is an {id:foo*actor} and {id:bar*their} {id:bar*actor}.")
+        pd = PronounData({"foo": {"they": "xe", "address": "doe"}, "bar": {"their": "xyr", "gender-nouns": "female"}})
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(tr.render(pd), "Doe is an actor and xyr actress.")
+            self.assertEqual(tr.render(pd), "Doe is an actor and xyr actress.")
+            self.assertEqual([x.category for x in w], [ws.DefaultValueUsedWarning] * 2)
+            self.assertIn("\"gender-addressing\"-property of individuum \"foo\", \"gender-nouns\"-property of "
+                          + "individuum \"foo\"", str(w[0].message))
+
+        # templates that do not need the default values do not raise the warning:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(Template("{id:foo*they} {id:bar*actor}").render(pd), "xe actress")
+            self.assertEqual(w, [])
+
+        # neither does pronoun data that defines all properties that have default values:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            pd = {"foo": {"gender-addressing": "t", "gender-nouns": "female"}}
+            self.assertEqual(Template("{id:foo*Actor}").render(pd), "Actress")
+            self.assertEqual(w, [])
+
+    def test_render_from_several_threads(self):
+        # many threads render one shared template with different pronoun data and warning settings at once:
+        tr = Template("{id:foo*They} met {id:bar*them} and {id:foo*their} {id:bar*Actor}. {id:foo*Name}!")
+        pronoun_data = [PronounData({"foo": {"subject": s, "dposs": d, "name": "Doe" + str(i)},
+                                     "bar": {"object": o, "gender-nouns": g}})
+                        for i, (s, d, o, g) in enumerate([("xe", "xyr", "her", "female"), ("he", "his", "them", "male"),
+                                                          ("they", "their", "xem", "neutral")] * 4)]
+        expected = [tr.render(pd, warning_settings=ws.DISABLE_ALL_WARNINGS) for pd in pronoun_data]
+        compact_template = tr.compact_template
+        pds = [copy.deepcopy(pd.get_pd()) for pd in pronoun_data]
+        errors = list()
+
+        def render_all(thread_no):
+            try:
+                warning_settings = ws.DISABLE_ALL_WARNINGS if thread_no % 2 else ws.ENABLE_DEFAULT_WARNINGS
+                for _ in range(50):
+                    for pd, result in zip(pronoun_data, expected):
+                        self.assertEqual(tr.render(pd, warning_settings=warning_settings), result)
+                        self.assertIs(ws.WarningManager.warning_settings_by_thread_id[threading.get_ident()],
+                                      warning_settings)
+            except Exception as e:
+                errors.append(e)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            threads = [threading.Thread(target=render_all, args=(i,)) for i in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        # neither the template nor the pronoun data were modified:
+        self.assertIs(tr.compact_template, compact_template)
+        self.assertEqual([pd.get_pd() for pd in pronoun_data], pds)
+        ws.WarningManager.set_warning_settings(ws.ENABLE_DEFAULT_WARNINGS)
+
+    def test_check(self):
+        tr = Template("{id:foo*Address} gave {id:bar*them} {id:foo*their} {id:foo*reflexive}.")
+        # pronoun data that the template can be rendered with passes the check:
+        pd = {"foo": {"address": "doe", "their": "xyr", "reflexive": "xyrself"}, "bar": {"them": "her"}}
+        self.assertIsNone(tr.check(pd))
+        self.assertEqual(tr.render(pd), "Doe gave her xyr xyrself.")
+
+        # otherwise, the errors rendering would raise are raised, but with all missing properties at once:
+        pd = {"foo": {"address": "doe"}, "bar": {"them": "her"}}
+        with self.assertRaises(err.MissingInformationError) as context:
+            tr.check(pd)
+        self.assertIn("\"dpossessive\"-attribute of individual \"foo\", \"reflexive\"-attribute of individual \"foo\"",
+                      str(context.exception))
+        self.assertRaises(err.MissingInformationError, lambda: tr.render(pd))
+        self.assertRaises(err.IdResolutionError, lambda: tr.check({"foo": {"address": "doe"}}))
+
+        # addressing without gendered addressing requires the personal name instead of the address:
+        pd = {"foo": {"gender-addressing": "f", "first-name": "doe", "their": "xyr", "reflexive": "xyrself"},
+              "bar": {"them": "her"}}
+        self.assertIsNone(tr.check(pd))
+        pd["foo"] = {"gender-addressing": "f", "address": "doe", "their": "xyr", "reflexive": "xyrself"}
+        self.assertRaises(err.MissingInformationError, lambda: tr.check(pd))
+        self.assertRaises(err.MissingInformationError, lambda: tr.render(pd))
+
+        # tags without ids and individual pronoun data are checked just like they would be rendered:
+        self.assertIsNone(Template("{they} {Actor}").check({"they": "xe"}))
+        self.assertIsNone(Template("{id:foo*they} {id:foo*Actor}").check(PronounData({"they": "xe"})))
+        self.assertRaises(err.MissingInformationError, lambda: Template("{they} {them}").check({"they": "xe"}))
+
+    def test_filter_renderable(self):
+        tr = Template("{id:foo*they} {id:foo*them}")
+        records = [{"foo": {"they": "xe", "them": "xem"}}, {"foo": {"they": "xe"}}, {"foo": {"they": 1}},
+                   {"bar": {"they": "xe", "them": "xem"}}, """{"foo": {"they": "he", "them": "him"}}"""]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            renderable = tr.filter_renderable(records)
+        self.assertEqual(renderable, [records[0], records[4]])
+        self.assertEqual([tr.render(pd) for pd in renderable], ["xe xem", "he him"])
+
+    def test_get_needed_properties(self):
+        self.assertEqual(Template("text").get_needed_properties(), frozenset())
+        self.assertEqual(Template("{id:foo*they} {id:bar*Actor} {Address}").get_needed_properties(),
+                         frozenset({"subject", "gender-nouns", "address", "gender-addressing", "personal-name"}))
+
+    def test_try_to_render(self):
+        tr = Template("{id:foo*They} met {id:bar*them}.")
+        # renders like `render` does:
+        pd = {"foo": {"they": "xe"}, "bar": {"them": "her"}}
+        result = tr.try_to_render(pd)
+        self.assertTrue(result.succeeded())
+        self.assertEqual(result.output, tr.render(pd))
+        self.assertEqual(tr.try_to_render(PronounData(pd)).output, "Xe met her.")
+        # but only checks if told to:
+        result = tr.try_to_render(pd, check_only=True)
+        self.assertTrue(result.succeeded())
+        self.assertIsNone(result.output)
+
+        # returns the errors rendering raises instead of raising them:
+        for pd in ({"foo": {"they": "xe"}}, {"foo": {"they": "xe"}, "bar": {"they": "she"}}, {"foo": {"they": 1}}):
+            result = tr.try_to_render(pd)
+            self.assertFalse(result.succeeded())
+            self.assertIsNone(result.output)
+            with self.assertRaises(result.error) as context:
+                tr.render(pd)
+            self.assertIsInstance(context.exception, (err.RenderingError, err.InvalidPDError))
+            self.assertRaises(result.error, result.raise_error)
+        self.assertIs(tr.try_to_render({"foo": {"they": "xe"}}).error, err.IdResolutionError)
+        self.assertIs(tr.try_to_render({"foo": {"they": "xe"}, "bar": {"they": "she"}}).error,
+                      err.MissingInformationError)
+
+        # default values are warned about just like `render` does:
+        with self.assertWarns(ws.DefaultValueUsedWarning):
+            self.assertEqual(Template("{Actor}").try_to_render({"they": "xe"}).output, "Actor")
+        # ...but only if there are any:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            pd = {"foo": {"gender-addressing": "t", "gender-nouns": "female"}}
+            self.assertEqual(Template("{id:foo*Actor}").try_to_render(pd).output, "Actress")
+            self.assertEqual(w, [])
+
+    def test_render_batch(self):
+        tr = Template("{id:foo*they} {id:foo*them}")
+        records = [{"foo": {"they": "xe", "them": "xem"}}, {"foo": {"they": "xe"}}, {"foo": {"they": 1}},
+                   {"bar": {"they": "xe", "them": "xem"}}, """{"foo": {"they": "he", "them": "him"}}"""]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results = tr.render_batch(iter(records))
+            self.assertEqual(next(results).output, "xe xem")
+            self.assertEqual([(result.output, result.error) for result in results],
+                             [(None, err.MissingInformationError), (None, err.InvalidPDError),
+                              (None, err.IdResolutionError), ("he him", None)])
+
+
+class TestRenderResult(unittest.TestCase):
+
+    def test__init__(self):
+        result = RenderResult("foo")
+        self.assertEqual((result.output, result.error, result.details), ("foo", None, None))
+
+    def test_succeeded(self):
+        self.assertTrue(RenderResult("foo").succeeded())
+        self.assertTrue(RenderResult().succeeded())
+        self.assertFalse(RenderResult(error=err.IdResolutionError, details="foo").succeeded())
+
+    def test_get_message(self):
+        self.assertIsNone(RenderResult("foo").get_message())
+        self.assertEqual(RenderResult(error=err.IdResolutionError, details="foo").get_message(), "foo")
+        self.assertEqual(RenderResult(error=err.InvalidPDError, details=err.InvalidPDError("bar")).get_message(), "bar")
+        self.assertEqual(RenderResult(error=err.MissingInformationError,
+                                      details={"foo": frozenset({"subject", "object"}), "bar": frozenset({"object"})})
+                         .get_message(),
+                         "The template requires the \"object\"-attribute of individual \"bar\", \"object\"-attribute "
+                         + "of individual \"foo\", \"subject\"-attribute of individual \"foo\", but the pronoun data "
+                         + "does not define these attributes.")
+
+    def test_raise_error(self):
+        RenderResult("foo").raise_error()
+        with self.assertRaises(err.IdResolutionError) as context:
+            RenderResult(error=err.IdResolutionError, details="foo").raise_error()
+        self.assertEqual(str(context.exception), "foo")
+        error = err.InvalidPDError("bar")
+        with self.assertRaises(err.InvalidPDError) as context:
+            RenderResult(error=err.InvalidPDError, details=error).raise_error()
+        self.assertIs(context.exception, error)
@@ -62,6 +62,23 @@ class TestWarningManager(unittest.TestCase):
         self.assertEqual(gr_warnings.WarningManager.warning_settings_by_thread_id[threading.get_ident()],
                          {test_warning})
 
+    def test_is_enabled(self):
+        # before any warning settings are set, the default warnings are enabled:
+        for warning in gr_warnings.ENABLE_ALL_WARNINGS | gr_warnings.ENABLE_ALL_LOGGING:
+            self.assertEqual(gr_warnings.WarningManager.is_enabled(warning),
+                             warning in gr_warnings.ENABLE_DEFAULT_WARNINGS)
+
+        gr_warnings.WarningManager.set_warning_settings({test_warning})
+        self.assertTrue(gr_warnings.WarningManager.is_enabled(test_warning))
+        self.assertFalse(gr_warnings.WarningManager.is_enabled(test_warning2))
+
+        # warning settings of other threads are not affected:
+        results = list()
+        thread = threading.Thread(target=lambda: results.append(gr_warnings.WarningManager.is_enabled(test_warning2)))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [True])
+
     def check_if_warning_is_raised(self, text, warning):
         # tests if raise_warning actually raises a warning if it is given one:
         with warnings.catch_warnings(record=True) as w:
@@ -112,3 +129,111 @@ class TestWarningManager(unittest.TestCase):
         with warnings.catch_warnings(record=True) as w:
             gr_warnings.WarningManager.raise_warning(None, TestWarning3)
             self.assertTrue(len(w) == 1 and str(w[-1].message) == TestWarning3.__doc__)
+
+        # test if functions that return the text are only called if the warning is enabled:
+        calls = list()
+
+        def make_text():
+            calls.append(1)
+            return test_warning_text
+        gr_warnings.WarningManager.set_warning_settings({test_warning})
+        self.check_if_warning_is_raised(make_text, test_warning)
+        self.assertEqual(len(calls), 1)
+        self.check_if_warning_is_not_raised(make_text, test_warning2)
+        self.assertEqual(len(calls), 1)
+        gr_warnings.WarningManager.set_warning_settings(gr_warnings.ENABLE_DEFAULT_WARNINGS)
+
+    def test_collecting(self):
+        gr_warnings.WarningManager.set_warning_settings({test_warning})
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            with gr_warnings.WarningManager.collecting() as collector:
+                for _ in range(3):
+                    gr_warnings.WarningManager.raise_warning(test_warning_text, test_warning)
+                gr_warnings.WarningManager.raise_warning(lambda: "other text", test_warning)
+                # disabled warnings are not collected:
+                gr_warnings.WarningManager.raise_warning(test_warning_text, test_warning2)
+
+                # collectors can be nested:
+                own_collector = gr_warnings.WarningCollector()
+                with gr_warnings.WarningManager.collecting(own_collector) as inner_collector:
+                    self.assertIs(inner_collector, own_collector)
+                    gr_warnings.WarningManager.raise_warning(test_warning_text, test_warning)
+                gr_warnings.WarningManager.raise_warning(test_warning_text, test_warning)
+
+                # other threads are not affected:
+                thread = threading.Thread(
+                    target=lambda: gr_warnings.WarningManager.raise_warning(test_warning_text, test_warning2))
+                thread.start()
+                thread.join()
+
+            # nothing was collected after the with-block:
+            gr_warnings.WarningManager.raise_warning(test_warning_text, test_warning)
+
+        self.assertEqual(collector.get_warnings(), [
+            {"warning": "NotAWordWarning", "message": test_warning_text, "count": 4},
+            {"warning": "NotAWordWarning", "message": "other text", "count": 1}
+        ])
+        self.assertEqual(own_collector.total(), 1)
+        self.assertEqual([(x.category, str(x.message)) for x in w], [(test_warning2, test_warning_text),
+                                                                     (test_warning, test_warning_text)])
+        self.assertEqual(gr_warnings.WarningManager.collectors_by_thread_id, dict())
+
+        # the collector is removed if the block raises an error:
+        with self.assertRaises(KeyError):
+            with gr_warnings.WarningManager.collecting():
+                raise KeyError
+        self.assertEqual(gr_warnings.WarningManager.collectors_by_thread_id, dict())
+        gr_warnings.WarningManager.set_warning_settings(gr_warnings.ENABLE_DEFAULT_WARNINGS)
+
+
+class TestWarningCollector(unittest.TestCase):
+
+    def test__init__(self):
+        collector = gr_warnings.WarningCollector()
+        self.assertEqual((collector.get_warnings(), collector.total(), len(collector)), ([], 0, 0))
+
+    def test_add(self):
+        collector = gr_warnings.WarningCollector()
+        collector.add("a", test_warning)
+        collector.add("a", test_warning2)
+        collector.add("a", test_warning)
+        collector.add("b", test_warning)
+        self.assertEqual(collector.counts, {(test_warning, "a"): 2, (test_warning2, "a"): 1, (test_warning, "b"): 1})
+
+        # collectors can be shared between threads:
+        collector = gr_warnings.WarningCollector()
+        threads = [threading.Thread(target=lambda: [collector.add("a", test_warning) for _ in range(1000)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(collector.total(), 8000)
+
+    def test_get_warnings(self):
+        collector = gr_warnings.WarningCollector()
+        collector.add("b", test_warning2)
+        collector.add("a", test_warning)
+        collector.add("b", test_warning2)
+        self.assertEqual(collector.get_warnings(), [
+            {"warning": "NotAPersonNounWarning", "message": "b", "count": 2},
+            {"warning": "NotAWordWarning", "message": "a", "count": 1}
+        ])
+
+    def test_total(self):
+        collector = gr_warnings.WarningCollector()
+        collector.add("a", test_warning)
+        collector.add("a", test_warning)
+        collector.add("b", test_warning)
+        self.assertEqual((collector.total(), len(collector)), (3, 2))
+
+    def test_raise_all(self):
+        collector = gr_warnings.WarningCollector()
+        collector.add("a", test_warning)
+        collector.add("a", test_warning)
+        collector.add("b", test_warning2)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            collector.raise_all()
+        self.assertEqual([(x.category, str(x.message)) for x in w], [(test_warning, "a"), (test_warning2, "b")])
@@ -11,8 +11,37 @@ are still implemented for completeness.
 render_template  # unused function (src/__init__.py:27)
 FreeGenderedPersonNounWarning  # unused class (src/warnings.py:71)
 FreePronounFoundWarning  # unused class (src/warnings.py:96)
+GenderedNounsBuildFromWebWarning  # unused class (src/warnings.py:131)
+_.create_full_graph_from_web  # unused method (src/gender_nouns.py:649)
 ENABLE_ALL_LOGGING  # unused variable (src/warnings.py:147)
 DISABLE_ALL_WARNINGS  # unused variable (src/warnings.py:149)
+BoundRenderer  # unused import (src/__init__.py:33)
+_.specialize  # unused method (src/bound_renderer.py:79)
+TemplateBundle  # unused import (src/__init__.py:36)
+__getattr__  # unused function (src/__init__.py:46)
+__dir__  # unused function (src/__init__.py:58)
+_.build  # unused method (src/template_bundle.py:78)
+_.names  # unused method (src/template_bundle.py:120)
+_.hooked  # unused method (src/instrumentation.py:68)
+StageHistogram  # unused class (src/instrumentation.py:94)
+_.summary  # unused method (src/instrumentation.py:132)
+RenderClient  # unused class (src/server.py:290)
+_.start_in_background  # unused method (src/server.py:242)
+_.templates  # unused method (src/server.py:317)
+_.metrics  # unused method (src/server.py:321)
+_.clear  # unused method (src/parse_cache.py:153)
+_.stats  # unused method (src/parse_cache.py:160)
+render_columns  # unused function (src/columnar.py:66)
+_.total  # unused method (src/warnings.py:197)
+_.raise_all  # unused method (src/warnings.py:206)
+_.render_batch  # unused method (src/template_interface.py:187)
+_.check  # unused method (src/template_interface.py:196)
+_.filter_renderable  # unused method (src/template_interface.py:209)
+_.get_needed_properties  # unused method (src/template_interface.py:218)
+_.get_pd  # unused method (src/pronoun_data_interface.py:86)
+_.add_overlay  # unused method (src/gender_nouns.py:759)
+_.remove_overlay  # unused method (src/gender_nouns.py:770)
+_.get_overlay_names  # unused method (src/gender_nouns.py:775)
 
 # Things that are there for debugging:
 